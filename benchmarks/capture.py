@@ -0,0 +1,211 @@
+"""Capture loop / voice detection micro-benchmark with synthetic audio.
+
+Feeds synthetic 16 kHz int16 chunks through recorder.StreamCapture (the
+per-chunk work of record_audio: pre-roll window, chunk_amplitude/silence test,
+level meter, trailing-silence handling and the kept-frames list) without
+opening a device, and reports for each signal and recording length:
+
+  - chunks per second and the real-time factor (audio seconds per second)
+  - per-chunk latency percentiles (p50/p90/p99/max, microseconds)
+  - peak Python memory while capturing (tracemalloc, in a second pass)
+  - how many chunks were kept for transcription
+
+Signals (generated by src/audio_sources.py):
+  speech   syllable-like harmonic bursts with short and long pauses
+  noise    room noise hovering around the default silence threshold
+  silence  digital near-silence
+
+Usage (from the repository root):
+
+    python benchmarks/capture.py [--durations 60,3600,28800] [--signals speech,noise,silence]
+                                 [--json results.json] [--no-memory]
+                                 [--baseline old.json [--tolerance 0.15]]
+
+With --baseline, throughput and p99 latency are compared with an earlier
+--json file and the exit status is 1 if any run got slower than the tolerance.
+
+A chunk is 512 frames (32 ms), so 8 hours is 900,000 chunks; with speech the
+kept frames alone hold about 0.9 GB, which the memory pass reports.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import audio_sources, recorder  # noqa: E402
+
+CHUNK = recorder.CHUNK
+RATE = recorder.RATE
+CHUNK_SECONDS = CHUNK / float(RATE)
+
+
+# ---------------- Synthetic signals -----------------
+
+SIGNALS = ('speech', 'noise', 'silence')  # see audio_sources.synthetic_signal
+
+
+def chunk_pool(signal, seed=1):
+    """One cycle of the signal cut into CHUNK-sized int16 byte strings (replayed cyclically)."""
+    pcm = audio_sources.synthetic_pcm(signal, seed=seed)
+    size = CHUNK * 2
+    usable = len(pcm) - len(pcm) % size
+    return [pcm[i:i + size] for i in range(0, usable, size)]
+
+
+# ---------------- Runs -----------------
+
+def run_capture(pool, chunks, timings=True):
+    """Feed `chunks` chunks through a fresh StreamCapture.
+
+    Every chunk is a new bytes object, as stream.read() returns, created
+    outside the timed region.
+
+    Returns:
+        (StreamCapture, per-chunk nanoseconds as an int64 array or None)
+    """
+    capture = recorder.StreamCapture(os.devnull, primary=True)
+    feed = capture.feed
+    n = len(pool)
+    if not timings:
+        for i in range(chunks):
+            feed(memoryview(pool[i % n]).tobytes())
+        return capture, None
+    samples = np.empty(chunks, dtype=np.int64)
+    clock = time.perf_counter_ns
+    for i in range(chunks):
+        data = memoryview(pool[i % n]).tobytes()
+        t = clock()
+        feed(data)
+        samples[i] = clock() - t
+    return capture, samples
+
+
+def measure(signal, seconds, pool, memory=True):
+    chunks = max(1, int(round(seconds / CHUNK_SECONDS)))
+    gc.collect()
+    started = time.perf_counter()
+    capture, samples = run_capture(pool, chunks)
+    elapsed = time.perf_counter() - started
+    kept = len(capture.frames)
+    voice = capture.voice_percentage
+    del capture
+    gc.collect()
+
+    p50, p90, p99 = (float(v) / 1000 for v in np.percentile(samples, [50, 90, 99]))
+    feed_seconds = samples.sum() / 1e9
+    result = {
+        "signal": signal,
+        "audio_seconds": round(chunks * CHUNK_SECONDS, 1),
+        "chunks": chunks,
+        "chunks_per_sec": round(chunks / feed_seconds),
+        "realtime_factor": round(chunks * CHUNK_SECONDS / feed_seconds, 1),
+        "wall_seconds": round(elapsed, 2),
+        "latency_us": {"p50": round(p50, 2), "p90": round(p90, 2), "p99": round(p99, 2),
+                       "max": round(float(samples.max()) / 1000, 1)},
+        "kept_chunks": kept,
+        "voice_percentage": round(voice * 100, 1),
+        "peak_memory_mb": None,
+    }
+    del samples
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        capture, _ = run_capture(pool, chunks, timings=False)
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del capture
+        result["peak_memory_mb"] = round(peak / (1024 * 1024), 1)
+    return result
+
+
+def compare(results, baseline_path, tolerance):
+    """Print changes against a baseline report; returns the regressed runs."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r["signal"], r["audio_seconds"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        old = baseline.get((r["signal"], r["audio_seconds"]))
+        if old is None:
+            continue
+        speed = r["chunks_per_sec"] / float(old["chunks_per_sec"]) - 1
+        p99 = r["latency_us"]["p99"] / float(old["latency_us"]["p99"]) - 1
+        slower = speed < -tolerance or p99 > tolerance
+        print(f"  {r['signal']:8} {_duration_label(r['audio_seconds']):>7} chunks/s {speed:+.1%}, "
+              f"p99 {p99:+.1%}{'  REGRESSION' if slower else ''}")
+        if slower:
+            regressions.append(r)
+    return regressions
+
+
+def _duration_label(seconds):
+    if seconds >= 3600:
+        return f"{seconds / 3600:g} h"
+    if seconds >= 60:
+        return f"{seconds / 60:g} min"
+    return f"{seconds:g} s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the capture loop and voice detection.')
+    parser.add_argument('--durations', default='60,3600,28800', help='comma-separated audio lengths in seconds')
+    parser.add_argument('--signals', default=','.join(SIGNALS), help='comma-separated: ' + ', '.join(SIGNALS))
+    parser.add_argument('--threshold', type=float, default=recorder.SILENCE_THRESHOLD, help='silence threshold')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='earlier --json results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed slowdown for --baseline (fraction)')
+    args = parser.parse_args(argv)
+
+    recorder.SILENCE_THRESHOLD = args.threshold
+    durations = [float(d) for d in args.durations.split(',') if d]
+    signals = [s for s in args.signals.split(',') if s]
+    for signal in signals:
+        if signal not in SIGNALS:
+            parser.error(f"unknown signal: {signal}")
+
+    results = []
+    print(f"{'signal':8} {'length':>7} {'chunks/s':>10} {'x real':>8} {'p50 us':>8} {'p90 us':>8} "
+          f"{'p99 us':>8} {'max us':>9} {'kept':>8} {'peak MB':>8}")
+    for signal in signals:
+        pool = chunk_pool(signal)
+        for seconds in durations:
+            r = measure(signal, seconds, pool, memory=not args.no_memory)
+            results.append(r)
+            lat = r["latency_us"]
+            peak = '-' if r["peak_memory_mb"] is None else f"{r['peak_memory_mb']:.1f}"
+            print(f"{signal:8} {_duration_label(seconds):>7} {r['chunks_per_sec']:>10} {r['realtime_factor']:>8} "
+                  f"{lat['p50']:>8} {lat['p90']:>8} {lat['p99']:>8} {lat['max']:>9} "
+                  f"{r['kept_chunks']:>8} {peak:>8}", flush=True)
+
+    if args.json:
+        report = {
+            "benchmark": "capture",
+            "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "chunk": CHUNK,
+            "rate": RATE,
+            "silence_threshold": args.threshold,
+            "results": results,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.json}")
+    if args.baseline:
+        print(f"compared with {args.baseline}:")
+        if compare(results, args.baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Local stand-in for OpenRouter's OpenAI-compatible chat completions API.
+
+Answers POST <base>/chat/completions with a canned transcript after a
+configurable delay, so transcription latency can be measured reproducibly and
+offline. A profile sets:
+
+  latency     mean server time per request (ms)
+  jitter      standard deviation of that time (ms)
+  throughput  upload speed in KB/s; the request body "arrives" at this rate
+  error_rate  fraction of requests answered with HTTP 500
+  limit_rate  fraction of requests answered with HTTP 429 (rate limited)
+
+Used by benchmarks/latency.py; it can also run on its own and the app pointed
+at it with "openrouter_base_url": "http://127.0.0.1:8089/v1" in settings.json:
+
+    python benchmarks/fake_openrouter.py --profile typical --port 8089
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROFILES = {
+    # name: (latency ms, jitter ms, throughput KB/s, error rate, 429 rate)
+    "instant": (0, 0, 0, 0.0, 0.0),
+    "fast": (80, 20, 0, 0.0, 0.0),
+    "typical": (600, 200, 2000, 0.0, 0.0),
+    "slow": (1800, 600, 300, 0.0, 0.0),
+    "flaky": (600, 300, 2000, 0.05, 0.03),
+}
+
+
+class Profile:
+    def __init__(self, latency=0, jitter=0, throughput=0, error_rate=0.0, limit_rate=0.0, seed=1):
+        self.latency = latency / 1000.0
+        self.jitter = jitter / 1000.0
+        self.throughput = throughput * 1024.0  # bytes per second, 0 = unlimited
+        self.error_rate = error_rate
+        self.limit_rate = limit_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def named(cls, name, **overrides):
+        latency, jitter, throughput, error_rate, limit_rate = PROFILES[name]
+        values = dict(latency=latency, jitter=jitter, throughput=throughput,
+                      error_rate=error_rate, limit_rate=limit_rate)
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**values)
+
+    def draw(self, body_bytes):
+        """(seconds to wait, HTTP status) for one request."""
+        with self._lock:
+            delay = max(0.0, self._random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            roll = self._random.random()
+        if self.throughput:
+            delay += body_bytes / self.throughput
+        if roll < self.error_rate:
+            return delay, 500
+        if roll < self.error_rate + self.limit_rate:
+            return min(delay, 0.05), 429
+        return delay, 200
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+    def log_message(self, *_args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            return self._reply(404, {"error": {"message": "not found"}})
+        delay, status = server.profile.draw(len(body))
+        time.sleep(delay)
+        server.count(status)
+        if status != 200:
+            message = "rate limited" if status == 429 else "upstream error"
+            return self._reply(status, {"error": {"message": message, "code": status}})
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return self._reply(400, {"error": {"message": "invalid JSON"}})
+        text = f"Synthetic transcript of {len(body)} request bytes."
+        self._reply(200, {
+            "id": f"gen-{server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": len(body) // 4, "completion_tokens": len(text) // 4,
+                      "total_tokens": (len(body) + len(text)) // 4},
+        })
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeOpenRouter(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, profile, host='127.0.0.1', port=0):
+        super().__init__((host, port), _Handler)
+        self.profile = profile
+        self.requests = 0
+        self.statuses = {}
+        self._count_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, status):
+        with self._count_lock:
+            self.requests += 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-openrouter', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a local fake OpenRouter endpoint.')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='typical')
+    parser.add_argument('--latency', type=float, help='mean latency (ms)')
+    parser.add_argument('--jitter', type=float, help='latency standard deviation (ms)')
+    parser.add_argument('--throughput', type=float, help='upload speed (KB/s, 0 = unlimited)')
+    parser.add_argument('--error-rate', type=float, help='fraction of HTTP 500 answers')
+    parser.add_argument('--limit-rate', type=float, help='fraction of HTTP 429 answers')
+    parser.add_argument('--port', type=int, default=8089)
+    args = parser.parse_args(argv)
+
+    profile = Profile.named(args.profile, latency=args.latency, jitter=args.jitter, throughput=args.throughput,
+                            error_rate=args.error_rate, limit_rate=args.limit_rate)
+    server = FakeOpenRouter(profile, port=args.port)
+    print(f"fake OpenRouter ({args.profile}) at {server.base_url}; Ctrl+C to stop", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"{server.requests} requests: {server.statuses}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""History store scaling benchmark: every history operation at 10k / 100k / 1M entries.
+
+Generates a synthetic history of each size in a temporary folder (history.json
+plus its search index, built on first load) and times the operations the UI
+and recorder perform through the real code paths:
+
+  load         first load: parse history.json, build the in-memory indexes and
+               the full-text index (as on the first start after an upgrade)
+  reload       load again with the search index already in sync (a restart)
+  get_history  recorder.get_history(), the whole list
+  page_first   recorder.get_history_page(), newest 50
+  page_next    the page after that, from its cursor
+  page_deep    get_history_page() from a cursor in the middle of the history
+  search       recorder.search_history() for a common and a rare word
+  save         recorder.save_recording_to_history() with a fresh WAV
+  transcribe   recorder.transcribe_history_item() with a stand-in transcriber
+  delete       recorder.delete_history_item() of an entry anywhere in the list
+  persist      history_store.flush() after each mutation: the rewrite of
+               history.json (save/transcribe/delete rows report it separately)
+
+Every result is also serialized the way eel sends it to the UI (json.dumps
+with a None default), reported as eel ms and payload KB, since that is
+what the user waits for.
+
+Usage (from the repository root):
+
+    python benchmarks/history_scaling.py [--sizes 10000,100000,1000000] [--repeat 5]
+                                         [--mutations 5] [--json results.json]
+                                         [--baseline old.json [--tolerance 0.25]]
+
+With --baseline, median times are compared with an earlier --json file and the
+exit status is 1 if any operation got slower than the tolerance (differences
+under --min-ms are ignored as noise). 1M entries need about 2 GB of memory and
+400 MB of disk.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import wave
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import history_store, recorder, transcriber  # noqa: E402
+
+WORDS = ("the a to and of I it that you is in this we for on so just with meeting note call "
+         "tomorrow email project send please review update next week team idea remember check "
+         "draft budget report client design schedule follow up about think maybe today").split()
+RARE_WORD = 'quixotic'  # in roughly one entry in ten thousand
+PAGE_SIZE = 50
+
+
+# ---------------- Synthetic history -----------------
+
+def synthetic_entry(i, start, rng):
+    """History entry number i (0 = oldest), shaped like the ones the recorder writes."""
+    when = start + timedelta(seconds=45 * i)
+    words = [WORDS[j] for j in rng.integers(0, len(WORDS), int(rng.integers(4, 40)))]
+    if i % 10000 == 7:
+        words.append(RARE_WORD)
+    digest = f"{rng.integers(0, 2**63):016x}{i:016x}"
+    return {
+        "filename": f"recording_{when:%Y%m%d_%H%M%S}.wav",
+        "timestamp": when.isoformat(),
+        "transcript": ' '.join(words).capitalize() + '.',
+        "audio_hash": digest,
+        "audio": f"audio_{digest[:16]}.wav",
+    }
+
+
+def write_history(directory, size, seed=1):
+    """Write a history.json of `size` entries (newest first) without holding them all."""
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    start = datetime(2020, 1, 1)
+    path = os.path.join(directory, 'history.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        for i in range(size - 1, -1, -1):
+            f.write(json.dumps(synthetic_entry(i, start, rng), ensure_ascii=False, indent=2))
+            f.write(',\n' if i else '\n')
+        f.write(']')
+    return os.path.getsize(path)
+
+
+def write_wav(path, seconds, seed):
+    """A short 16 kHz mono WAV with unique content (so saves are not deduplicated)."""
+    rng = np.random.default_rng(seed)
+    samples = (rng.normal(0, 1000, int(seconds * 16000))).astype(np.int16)
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(samples.tobytes())
+
+
+# ---------------- Measurement -----------------
+
+def eel_payload(result):
+    """Serialize a result as eel does before sending it to the UI."""
+    return json.dumps(result, default=lambda o: None)
+
+
+class Timings:
+    def __init__(self):
+        self.ops = {}
+
+    def add(self, op, seconds, result=None, serialize=True):
+        row = self.ops.setdefault(op, {"ms": [], "eel_ms": [], "kb": []})
+        row["ms"].append(seconds * 1000)
+        if serialize:
+            t = time.perf_counter()
+            payload = eel_payload(result)
+            row["eel_ms"].append((time.perf_counter() - t) * 1000)
+            row["kb"].append(len(payload) / 1024.0)
+
+    def time(self, op, func, *args, serialize=True):
+        t = time.perf_counter()
+        result = func(*args)
+        self.add(op, time.perf_counter() - t, result, serialize)
+        return result
+
+    def persist(self, op):
+        t = time.perf_counter()
+        history_store.flush()
+        self.add(f"{op} persist", time.perf_counter() - t, serialize=False)
+
+    def summary(self):
+        out = {}
+        for op, row in self.ops.items():
+            out[op] = {
+                "n": len(row["ms"]),
+                "p50_ms": _round(np.percentile(row["ms"], 50)),
+                "p90_ms": _round(np.percentile(row["ms"], 90)),
+                "max_ms": _round(max(row["ms"])),
+                "eel_ms": _round(np.percentile(row["eel_ms"], 50)) if row["eel_ms"] else None,
+                "payload_kb": _round(np.median(row["kb"])) if row["kb"] else None,
+            }
+        return out
+
+
+def _round(value):
+    return round(float(value), 3)
+
+
+def _transcribe_stub(path):
+    return f"Re-transcribed {os.path.basename(path)}."
+
+
+def measure(size, workdir, repeat, mutations, seed=1):
+    directory = os.path.join(workdir, f'history_{size}')
+    started = time.perf_counter()
+    file_bytes = write_history(directory, size, seed)
+    generate_seconds = time.perf_counter() - started
+    gc.collect()
+    timings = Timings()
+    rng = random.Random(seed)
+
+    history_store.set_history_dir(directory)
+    timings.time('load', history_store.load, serialize=False)
+    for _ in range(repeat):
+        history_store.set_history_dir(directory)
+        timings.time('reload', history_store.load, serialize=False)
+
+    for _ in range(repeat):
+        timings.time('get_history', recorder.get_history)
+        gc.collect()  # the copies are large; keep their cleanup out of the next sample
+    cursor = timings.time('page_first', recorder.get_history_page, None, PAGE_SIZE)["next_cursor"]
+    count = history_store.count()
+    picked = pick_entries([count // 2] + rng.sample(range(count), min(mutations, count)))
+    middle, doomed = picked[0], picked[1:]
+    mid_cursor = f"{middle['timestamp']}|{middle['filename']}"  # as get_history_page encodes it
+    for _ in range(repeat):
+        timings.time('page_first', recorder.get_history_page, None, PAGE_SIZE)
+        timings.time('page_next', recorder.get_history_page, cursor, PAGE_SIZE)
+        timings.time('page_deep', recorder.get_history_page, mid_cursor, PAGE_SIZE)
+        timings.time('search common', recorder.search_history, 'meeting', 20)
+        timings.time('search rare', recorder.search_history, RARE_WORD, 20)
+
+    # Mutations: each is timed on its own, then the history.json rewrite it triggers
+    saved = []
+    for i in range(mutations):
+        wav = os.path.join(workdir, f'take_{i}.wav')
+        write_wav(wav, 0.5, seed * 1000 + i)
+        before = history_store.get_version()
+        timings.time('save', recorder.save_recording_to_history, wav, f"Benchmark take {i}.", serialize=False)
+        timings.persist('save')
+        saved += [c["filename"] for c in history_store.get_changes(before)["changes"] if "entry" in c]
+
+    transcriber.transcribe_with_gemini = _transcribe_stub
+    for filename in saved:
+        timings.time('transcribe', recorder.transcribe_history_item, filename)
+        timings.persist('transcribe')
+
+    for filename in saved + [entry["filename"] for entry in doomed]:
+        timings.time('delete', recorder.delete_history_item, filename)
+        timings.persist('delete')
+
+    result = {
+        "entries": size,
+        "file_mb": round(file_bytes / (1024 * 1024), 1),
+        "generate_seconds": round(generate_seconds, 1),
+        "ops": timings.summary(),
+    }
+    history_store.set_history_dir(os.path.join(workdir, 'empty'))
+    gc.collect()
+    shutil.rmtree(directory, ignore_errors=True)
+    return result
+
+
+def pick_entries(positions):
+    """Entries at the given positions (oldest first), in the order given, in one pass."""
+    wanted = {pos: n for n, pos in enumerate(positions)}
+    picked = [None] * len(positions)
+    for pos, entry in enumerate(history_store.iter_entries()):
+        if pos in wanted:
+            picked[wanted[pos]] = entry
+    return picked
+
+
+# ---------------- Report -----------------
+
+def print_result(r):
+    print(f"\n{r['entries']:,} entries ({r['file_mb']} MB history.json, generated in {r['generate_seconds']} s)")
+    print(f"  {'operation':20} {'p50 ms':>10} {'p90 ms':>10} {'max ms':>10} {'eel ms':>10} {'payload KB':>11}")
+    for op, s in r["ops"].items():
+        eel = '-' if s["eel_ms"] is None else f"{s['eel_ms']:.3f}"
+        kb = '-' if s["payload_kb"] is None else f"{s['payload_kb']:.1f}"
+        print(f"  {op:20} {s['p50_ms']:>10.3f} {s['p90_ms']:>10.3f} {s['max_ms']:>10.3f} {eel:>10} {kb:>11}",
+              flush=True)
+
+
+def print_curve(results):
+    """p50 of every operation across sizes, so the growth rate is visible at a glance."""
+    if len(results) < 2:
+        return
+    sizes = [r["entries"] for r in results]
+    print(f"\n  {'p50 ms':20}" + ''.join(f"{size:>12,}" for size in sizes))
+    for op in results[0]["ops"]:
+        row = [r["ops"].get(op, {}).get("p50_ms") for r in results]
+        print(f"  {op:20}" + ''.join(f"{v:>12.3f}" if v is not None else f"{'-':>12}" for v in row))
+
+
+def compare(results, baseline_path, tolerance, min_ms):
+    """Print changes against a baseline report; returns the regressed (entries, op) pairs."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {r["entries"]: r["ops"] for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        old_ops = baseline.get(r["entries"])
+        if old_ops is None:
+            continue
+        for op, s in r["ops"].items():
+            old = old_ops.get(op)
+            if old is None:
+                continue
+            new_ms = s["p50_ms"] + (s["eel_ms"] or 0)
+            old_ms = old["p50_ms"] + (old.get("eel_ms") or 0)
+            change = new_ms / old_ms - 1 if old_ms else 0.0
+            slower = change > tolerance and new_ms - old_ms > min_ms
+            print(f"  {r['entries']:>9,} {op:20} {old_ms:>10.3f} -> {new_ms:>10.3f} ms {change:+.1%}"
+                  f"{'  REGRESSION' if slower else ''}")
+            if slower:
+                regressions.append((r["entries"], op))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark history operations at growing history sizes.')
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='comma-separated entry counts')
+    parser.add_argument('--repeat', type=int, default=5, help='samples per read operation')
+    parser.add_argument('--mutations', type=int, default=5, help='saves, transcriptions and deletes per size')
+    parser.add_argument('--workdir', help='folder for the synthetic histories (default: a temporary one)')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline', help='earlier --json results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown for --baseline (fraction)')
+    parser.add_argument('--min-ms', type=float, default=1.0, help='ignore slowdowns smaller than this (ms)')
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    workdir = args.workdir or tempfile.mkdtemp(prefix='history_scaling_')
+    os.makedirs(workdir, exist_ok=True)
+    # Everything, even a run that fails early, stays under workdir; never the real history
+    recorder.TEMP_DIRECTORY = workdir
+    history_store.set_history_dir(os.path.join(workdir, 'empty'))
+
+    results = []
+    try:
+        for size in sizes:
+            results.append(measure(size, workdir, max(1, args.repeat), max(1, args.mutations)))
+            print_result(results[-1])
+    finally:
+        history_store.flush()
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    print_curve(results)
+
+    if args.json:
+        report = {
+            "benchmark": "history_scaling",
+            "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "page_size": PAGE_SIZE,
+            "results": results,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.json}")
+    if args.baseline:
+        print(f"compared with {args.baseline}:")
+        if compare(results, args.baseline, args.tolerance, args.min_ms):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
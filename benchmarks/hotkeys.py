@@ -0,0 +1,121 @@
+"""Hold-key dispatcher overhead benchmark.
+
+Replays synthetic keyboard traffic through HoldKeyDispatcher (no real
+keyboard hook is installed) and reports:
+
+  - cost of the hook-side callbacks per key event (what runs on keyboard's
+    listener thread): a fresh key-down, an autorepeat key-down, a release
+  - for autorepeat storms (key held with OS autorepeat at --repeat-hz), how
+    many events reached the dispatcher thread and how many holds started
+  - latency from min_hold elapsing to on_start running on the dispatcher thread
+  - that taps and ctrl+<key> chords never start a recording
+
+Usage (from the repository root):
+
+    python benchmarks/hotkeys.py [--events 200000] [--holds 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.hotkeys import HoldKeyDispatcher  # noqa: E402
+
+
+def hook_cost(events):
+    """Nanoseconds per call of press (fresh and repeat) and release."""
+    d = HoldKeyDispatcher(lambda: None, lambda: None, min_hold=3600)
+    t = time.perf_counter_ns()
+    for _ in range(events // 2):
+        d.press()
+        d.release()
+    fresh_pair = (time.perf_counter_ns() - t) / (events // 2)
+    d.press()
+    t = time.perf_counter_ns()
+    for _ in range(events):
+        d.press()
+    repeat = (time.perf_counter_ns() - t) / events
+    d.release()
+    d.close()
+    return fresh_pair, repeat
+
+
+def storms(holds, hold_seconds, repeat_hz, min_hold):
+    starts, stops, latencies = [], [], []
+    started = threading.Event()
+    state = {}
+
+    def on_start():
+        latencies.append(time.monotonic() - state['due'])
+        starts.append(1)
+        started.set()
+
+    d = HoldKeyDispatcher(on_start, lambda: stops.append(1), min_hold=min_hold)
+    sent = 0
+    for _ in range(holds):
+        started.clear()
+        t0 = time.monotonic()
+        state['due'] = t0 + min_hold
+        d.press()
+        sent += 1
+        while time.monotonic() - t0 < hold_seconds:
+            time.sleep(1.0 / repeat_hz)
+            d.press()  # autorepeat
+            sent += 1
+        d.release()
+        sent += 1
+        started.wait(1.0)
+    time.sleep(0.05)
+    d.close()
+    forwarded = sent - d.stats["repeats_dropped"]
+    return d.stats, sent, forwarded, len(starts), len(stops), latencies
+
+
+def taps_and_chords(count, min_hold):
+    starts = []
+    d = HoldKeyDispatcher(lambda: starts.append(1), lambda: None, min_hold=min_hold)
+    for i in range(count):
+        d.press()
+        if i % 2:
+            d.other_key()  # ctrl+c while the hold key is down
+            time.sleep(min_hold * 1.5)
+        else:
+            time.sleep(min_hold * 0.3)  # quick tap
+        d.release()
+    time.sleep(min_hold * 2)
+    d.close()
+    return d.stats, len(starts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure hold-key dispatcher overhead.')
+    parser.add_argument('--events', type=int, default=200000, help='events for the hook cost loop')
+    parser.add_argument('--holds', type=int, default=20, help='held-key storms to replay')
+    parser.add_argument('--hold-seconds', type=float, default=0.5)
+    parser.add_argument('--repeat-hz', type=float, default=33.0, help='OS autorepeat rate')
+    parser.add_argument('--min-hold', type=float, default=0.1, help='dispatcher min_hold (s)')
+    args = parser.parse_args(argv)
+
+    fresh_pair, repeat = hook_cost(args.events)
+    print(f"hook cost: press+release {fresh_pair:.0f} ns/pair, autorepeat press {repeat:.0f} ns")
+
+    stats, sent, forwarded, starts, stops, latencies = storms(args.holds, args.hold_seconds,
+                                                             args.repeat_hz, args.min_hold)
+    print(f"storms: {args.holds} holds, {sent} key events, {forwarded} reached the dispatcher "
+          f"({stats['repeats_dropped']} autorepeats dropped), {starts} starts / {stops} stops")
+    if latencies:
+        print(f"start latency after min_hold: median {statistics.median(latencies) * 1000:.2f} ms, "
+              f"max {max(latencies) * 1000:.2f} ms")
+
+    stats, starts = taps_and_chords(10, args.min_hold)
+    print(f"taps/chords: {stats['taps_ignored']} taps and {stats['chords_ignored']} chords ignored, "
+          f"{starts} recordings started")
+    return 0 if starts == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""End-to-end dictation latency: from stop to paste, stage by stage.
+
+Runs hundreds of complete dictation sessions through the public recorder API
+only: recorder.start_recording() hands the session to the controller's
+capture worker, which reads a file-backed audio source (src/audio_sources.py)
+until recorder.stop_recording(); the worker then starts a transcribe-<id>
+thread that transcribes, pastes and saves the capture, exactly as for a
+hotkey-driven recording. Transcription uses the real OpenAI client talking to
+a local fake OpenRouter (benchmarks/fake_openrouter.py) through the
+openrouter_base_url setting. Every session is timed at:
+
+  stop       stop_recording() called
+  captured   capture loop ended, WAV written, transcription thread started
+  request    transcription request started
+  response   transcription returned
+  paste      on_transcription_done callback reached (where run.py pastes)
+  saved      history entry stored (on_recording_completed)
+
+and the per-stage distribution is reported (p50/p90/p99/max, ms) along with
+stop-to-paste totals and failures. History and temp files go to a temporary
+folder; nothing is pasted.
+
+Usage (from the repository root):
+
+    python benchmarks/latency.py [--sessions 200] [--profile fast]
+                                 [--wav speech.wav | --replay capture.chunks]
+                                 [--seconds 4] [--speed 10] [--json results.json]
+
+Profiles and their knobs (--latency/--jitter/--throughput/--error-rate/
+--limit-rate) are described in fake_openrouter.py. Without --wav or --replay
+(a chunk file recorded with the audio_chunk_recording_dir setting) a
+synthetic speech-like signal is used.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from src import audio_sources, history_store, recorder, transcriber  # noqa: E402
+from fake_openrouter import PROFILES, FakeOpenRouter, Profile  # noqa: E402
+
+STAGES = ('captured', 'request', 'response', 'paste', 'saved')
+
+
+# ---------------- Sessions -----------------
+
+class Timeline:
+    """Timestamps of the session being measured, filled in from recorder events."""
+
+    def __init__(self):
+        self.marks = {}
+        self.done = threading.Event()
+
+    def mark(self, name):
+        self.marks.setdefault(name, time.perf_counter())
+
+    def on_event(self, event, data):
+        if event == 'recording_state' and data.get('phase') == 'transcribing':
+            self.mark('captured')
+        elif event == 'transcription' and data.get('session_id') is not None:
+            self.mark('request' if data.get('stage') == 'started' else 'response')
+            if data.get('stage') == 'failed':
+                self.marks['failed'] = True
+
+
+def run_session(timeline, record_seconds, timeout):
+    timeline.marks.clear()
+    timeline.done.clear()
+    if recorder.start_recording() is None:
+        raise RuntimeError('recorder was not idle')
+    time.sleep(record_seconds)
+    timeline.mark('stop')
+    recorder.stop_recording()
+    finished = timeline.done.wait(timeout) and recorder.controller.wait_idle(timeout)
+    marks = dict(timeline.marks)
+    if not finished:
+        marks['failed'] = True
+    return marks
+
+
+def summarize(sessions):
+    ok = [m for m in sessions if not m.get('failed') and 'paste' in m]
+    report = {"sessions": len(sessions), "failed": len(sessions) - len(ok), "stages_ms": {}}
+    previous = 'stop'
+    for stage in STAGES:
+        values = [(m[stage] - m[previous]) * 1000 for m in ok if stage in m and previous in m]
+        report["stages_ms"][f"{previous}->{stage}"] = _stats(values)
+        previous = stage
+    report["stop_to_paste_ms"] = _stats([(m['paste'] - m['stop']) * 1000 for m in ok])
+    report["stop_to_saved_ms"] = _stats([(m['saved'] - m['stop']) * 1000 for m in ok if 'saved' in m])
+    return report
+
+
+def _stats(values):
+    if not values:
+        return None
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"p50": round(float(p50), 2), "p90": round(float(p90), 2), "p99": round(float(p99), 2),
+            "max": round(float(max(values)), 2), "mean": round(float(np.mean(values)), 2)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure stop-to-paste latency against a fake OpenRouter.')
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='fast')
+    parser.add_argument('--latency', type=float, help='override the profile: mean server latency (ms)')
+    parser.add_argument('--jitter', type=float, help='override the profile: latency std deviation (ms)')
+    parser.add_argument('--throughput', type=float, help='override the profile: upload KB/s (0 = unlimited)')
+    parser.add_argument('--error-rate', type=float, help='override the profile: fraction of HTTP 500')
+    parser.add_argument('--limit-rate', type=float, help='override the profile: fraction of HTTP 429')
+    parser.add_argument('--wav', help='16 kHz mono WAV to dictate (default: synthetic speech)')
+    parser.add_argument('--replay', help='recorded chunk file to dictate')
+    parser.add_argument('--seconds', type=float, default=4.0,
+                        help='seconds of synthetic audio per session (default: the whole --wav/--replay)')
+    parser.add_argument('--speed', type=float, default=10.0, help='capture speed relative to real time')
+    parser.add_argument('--timeout', type=float, default=60.0, help='per-session timeout (s)')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args(argv)
+
+    profile = Profile.named(args.profile, latency=args.latency, jitter=args.jitter, throughput=args.throughput,
+                            error_rate=args.error_rate, limit_rate=args.limit_rate)
+    server = FakeOpenRouter(profile)
+    base_url = server.start()
+
+    tmp = tempfile.mkdtemp(prefix='latency_')
+    settings_path = os.path.join(tmp, 'settings.json')
+    with open(settings_path, 'w', encoding='utf-8') as f:
+        json.dump({"openrouter_api_key": "benchmark", "openrouter_base_url": base_url,
+                   "model": "fake/model"}, f)
+    transcriber.SETTINGS_FILE = settings_path
+    recorder.TEMP_DIRECTORY = tmp
+    history_store.set_history_dir(os.path.join(tmp, 'history'))
+
+    # After the audio the source returns silence, as a microphone in a quiet room would
+    if args.replay:
+        source = audio_sources.ReplaySource(args.replay, args.speed, end='silence')
+    elif args.wav:
+        source = audio_sources.WavFileSource(args.wav, args.speed, end='silence')
+    else:
+        source = audio_sources.SyntheticSource('speech', args.seconds, args.speed, end='silence')
+    audio_seconds = getattr(source, 'seconds', args.seconds)
+    recorder.set_audio_source(source)
+    recorder.MIN_RECORDING_DURATION = 0  # sessions are shortened by --speed, not accidental
+    record_seconds = audio_seconds / args.speed
+
+    timeline = Timeline()
+    recorder.subscribe(timeline.on_event)
+
+    def on_paste(_text):
+        timeline.mark('paste')
+
+    def on_completed():
+        timeline.mark('saved')
+        timeline.done.set()
+
+    recorder.set_callbacks(on_transcription_done=on_paste, on_recording_completed=on_completed)
+    transcriber.warm_up()
+
+    sessions = []
+    started = time.perf_counter()
+    for i in range(args.sessions):
+        sessions.append(run_session(timeline, record_seconds, args.timeout))
+        if (i + 1) % 50 == 0:
+            print(f"  {i + 1}/{args.sessions} sessions", flush=True)
+    elapsed = time.perf_counter() - started
+    recorder.controller.shutdown(timeout=5)
+    recorder.flush_history(timeout=10)
+    server.stop()
+
+    report = summarize(sessions)
+    print(f"{args.sessions} sessions ({args.profile} profile, {audio_seconds:g} s audio each) in {elapsed:.1f} s; "
+          f"{report['failed']} failed; server saw {server.requests} requests {server.statuses}")
+    print(f"{'stage':22} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}  (ms)")
+    rows = list(report["stages_ms"].items()) + [("stop->paste (total)", report["stop_to_paste_ms"]),
+                                                ("stop->saved (total)", report["stop_to_saved_ms"])]
+    for name, s in rows:
+        if s:
+            print(f"{name:22} {s['p50']:>9.2f} {s['p90']:>9.2f} {s['p99']:>9.2f} {s['max']:>9.2f}")
+    if args.json:
+        report.update(
+            benchmark="latency",
+            created=time.strftime('%Y-%m-%dT%H:%M:%S'),
+            python=platform.python_version(),
+            profile=dict(name=args.profile, latency_ms=profile.latency * 1000, jitter_ms=profile.jitter * 1000,
+                         throughput_kbps=profile.throughput / 1024, error_rate=profile.error_rate,
+                         limit_rate=profile.limit_rate),
+            audio_seconds=audio_seconds,
+            server_requests=server.requests,
+            server_statuses={str(k): v for k, v in server.statuses.items()},
+        )
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
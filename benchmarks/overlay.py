@@ -0,0 +1,48 @@
+"""Overlay time-to-visible benchmark (needs a display).
+
+Starts the overlay's Tk thread, then shows and hides the pill repeatedly and
+reports how long each show_overlay() call took to get the window mapped, as
+recorded by overlay_manager.overlay_stats().
+
+Usage (from the repository root):
+
+    python benchmarks/overlay.py [--cycles 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import overlay_manager  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure overlay time-to-visible.')
+    parser.add_argument('--cycles', type=int, default=20, help='show/hide cycles')
+    parser.add_argument('--visible', type=float, default=0.2, help='seconds each cycle stays visible')
+    args = parser.parse_args(argv)
+
+    noop = lambda: None  # noqa: E731
+    t0 = time.perf_counter()
+    overlay_manager.init_overlay(noop, noop, noop, noop)
+    while overlay_manager._overlay is None:
+        if not overlay_manager._thread.is_alive():
+            print('Overlay thread exited (no display?)', file=sys.stderr)
+            return 1
+        time.sleep(0.005)
+    print(f"init_overlay -> window built: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    for _ in range(args.cycles):
+        overlay_manager.show_overlay()
+        time.sleep(args.visible)
+        overlay_manager.hide_overlay()
+        time.sleep(0.05)
+    stats = overlay_manager.overlay_stats()
+    print(f"time-to-visible over {stats['count']} shows: median {stats['median_ms']} ms, max {stats['max_ms']} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
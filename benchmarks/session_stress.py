@@ -0,0 +1,199 @@
+"""Stress test for the recording session controller.
+
+Fires thousands of start/stop/restart/cancel/pause events at
+recorder.controller from several threads at once (as hotkey hooks, eel,
+the overlay and the tray would), then checks that:
+
+  - no more than one session's input streams were ever open at a time (one
+    stream, or one per device with --devices N)
+  - every PyAudio instance and stream that was opened got closed
+  - no capture or transcription threads are left behind
+  - the controller ends idle
+  - every stream of the speech sessions got its own history entry (with
+    --devices N the N streams save within the same second)
+
+PyAudio and the transcription request are replaced by in-process fakes so the
+run needs no microphone or network; history writes go to a temporary folder.
+
+Usage (from the repository root):
+
+    python benchmarks/session_stress.py [--events 5000] [--threads 8] [--devices 1]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import history_store, recorder, transcriber  # noqa: E402
+
+
+class FakeAudio:
+    """Stands in for the pyaudio module: counts open instances and streams."""
+
+    paInt16 = 8
+
+    def __init__(self, loud=False):
+        self.lock = threading.Lock()
+        self.instances = 0
+        self.streams = 0
+        self.max_streams = 0
+        self.opened = 0
+        self.loud = loud
+
+    def PyAudio(self):
+        with self.lock:
+            self.instances += 1
+        return _FakePyAudio(self)
+
+
+class _FakePyAudio:
+    def __init__(self, audio):
+        self.audio = audio
+        self.alive = True
+
+    def open(self, **kwargs):
+        audio = self.audio
+        with audio.lock:
+            audio.streams += 1
+            audio.opened += 1
+            audio.max_streams = max(audio.max_streams, audio.streams)
+        return _FakeStream(audio, kwargs['frames_per_buffer'])
+
+    def get_sample_size(self, _fmt):
+        return 2
+
+    def terminate(self):
+        if self.alive:
+            self.alive = False
+            with self.audio.lock:
+                self.audio.instances -= 1
+
+
+class _FakeStream:
+    RATE = 16000 * 4  # frames per second delivered when polled (faster than real time)
+
+    def __init__(self, audio, frames):
+        self.audio = audio
+        self.frames = frames
+        self.closed = False
+        self.opened_at = time.monotonic()
+        self.delivered = 0
+
+    def read(self, frames, exception_on_overflow=True):
+        time.sleep(0.0005)
+        self.delivered += frames
+        value = 8000 if self.audio.loud else 0
+        return (value.to_bytes(2, 'little', signed=True)) * frames
+
+    def get_read_available(self):
+        return int((time.monotonic() - self.opened_at) * self.RATE) - self.delivered
+
+    def stop_stream(self):
+        pass
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            with self.audio.lock:
+                self.audio.streams -= 1
+
+
+ACTIONS = (
+    (recorder.start_recording, 4),
+    (recorder.stop_recording, 3),
+    (recorder.restart_recording, 2),
+    (recorder.cancel_recording, 2),
+    (lambda: recorder.set_paused(not recorder.is_paused()), 1),
+)
+
+
+def _fire(n, seed, errors):
+    rng = random.Random(seed)
+    functions = [fn for fn, weight in ACTIONS for _ in range(weight)]
+    for _ in range(n):
+        try:
+            rng.choice(functions)()
+        except Exception as e:  # any exception here is a bug
+            errors.append(repr(e))
+        # Jitter, so that some sessions get as far as opening a stream
+        time.sleep(rng.random() * 0.003)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Stress the recording session controller.')
+    parser.add_argument('--events', type=int, default=5000, help='events in total')
+    parser.add_argument('--threads', type=int, default=8, help='threads firing events concurrently')
+    parser.add_argument('--devices', type=int, default=1, help='input devices recorded in parallel')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix='session_stress_')
+    recorder.TEMP_DIRECTORY = tmp
+    history_store.set_history_dir(os.path.join(tmp, 'history'))
+    audio = FakeAudio()
+    recorder._pyaudio = lambda: audio
+    if args.devices > 1:
+        recorder._devices_cache = [{'index': i, 'name': f'Fake {i}', 'max_inputs': 1} for i in range(args.devices)]
+        recorder.set_audio_devices(list(range(args.devices)))
+    transcriptions = []
+    transcriber.transcribe_with_gemini = lambda path: transcriptions.append(path) or 'stress transcript'
+
+    errors = []
+    started = time.perf_counter()
+    workers = [threading.Thread(target=_fire, args=(args.events // args.threads, args.seed + i, errors))
+               for i in range(args.threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    recorder.cancel_recording()
+
+    # A few real-length sessions with speech, to run the transcription path too
+    audio.loud = True
+    entries_before = history_store.count()
+    for _ in range(3):
+        recorder.start_recording()
+        time.sleep(recorder.MIN_RECORDING_DURATION + 0.1)
+        recorder.stop_recording()
+        recorder.controller.wait_idle(timeout=10)
+    elapsed = time.perf_counter() - started
+
+    idle = recorder.controller.wait_idle(timeout=10)
+    leftover = [t for t in threading.enumerate() if t.name.startswith('transcribe-')]
+    recorder.controller.shutdown(timeout=5)
+    worker_gone = not any(t.name == 'capture' for t in threading.enumerate())
+    flushed = recorder.flush_history(timeout=5)
+    entries = history_store.get_entries()
+    saved = len(entries) - entries_before
+    filenames = {e['filename'] for e in entries}
+
+    print(f"{args.events} events on {args.threads} threads in {elapsed:.2f} s; "
+          f"{audio.opened} streams opened, {len(transcriptions)} transcriptions, {saved} history entries")
+    checks = {
+        'controller idle': idle and recorder.controller.state == 'idle',
+        'at most one session open at a time': audio.max_streams <= args.devices,
+        'all streams closed': audio.streams == 0,
+        'all PyAudio instances terminated': audio.instances == 0,
+        'no capture/transcription threads left': not leftover,
+        'capture worker stopped on shutdown': worker_gone,
+        'speech sessions transcribed (one per stream)': len(transcriptions) == 3 * args.devices,
+        'one history entry per stream': saved == 3 * args.devices and len(filenames) == len(entries),
+        'no exceptions from transitions': not errors,
+        'history flushed': flushed,
+    }
+    for name, ok in checks.items():
+        print(f"  [{'ok' if ok else 'FAIL'}] {name}")
+    if leftover:
+        print('  leftover threads:', ', '.join(t.name for t in leftover))
+    if errors:
+        print('  errors:', errors[:5])
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
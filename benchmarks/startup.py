@@ -0,0 +1,108 @@
+"""Startup time benchmark for run.py.
+
+Reports, each measured in a fresh interpreter:
+  - the import-time breakdown of `import run` (from `python -X importtime`),
+    grouped by top-level package
+  - time to hotkey-ready: process start until run._start_core() returns, the
+    sequence main() runs before anything else (logging, settings, silence
+    threshold, global hotkeys)
+
+Usage (from the repository root):
+
+    python benchmarks/startup.py [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HOTKEY_READY_SCRIPT = """
+import time
+t0 = time.perf_counter()
+import run
+t_import = time.perf_counter()
+run._start_core()
+t_ready = time.perf_counter()
+try:
+    import keyboard
+    keyboard.unhook_all()
+except Exception:
+    pass
+run.logs.shutdown()
+print('RESULT', t_import - t0, t_ready - t0)
+"""
+
+
+def _python(args, **kwargs):
+    return subprocess.run([sys.executable] + args, cwd=REPO_DIR, capture_output=True, text=True, **kwargs)
+
+
+def import_breakdown():
+    """Import time of `import run`, split by the modules run.py imports directly.
+
+    Returns:
+        (total seconds, list of (package, seconds) sorted by cost)
+    """
+    proc = _python(['-X', 'importtime', '-c', 'import run'])
+    if proc.returncode != 0:
+        raise RuntimeError(f"import run failed:\n{proc.stderr[-2000:]}")
+    rows = []  # (depth, module, cumulative seconds) in completion order
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", nesting shown by indentation
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, name.strip(), int(cumulative_us) / 1e6))
+    end = max(i for i, row in enumerate(rows) if row[:2] == (0, 'run'))
+    packages = defaultdict(float)
+    # A module is reported after everything it imported, so run's direct
+    # imports are the depth-1 rows between the previous top-level row and run
+    for depth, name, seconds in reversed(rows[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            packages[name.split('.')[0] if not name.startswith('src.') else name] += seconds
+    return rows[end][2], sorted(packages.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def hotkey_ready(runs):
+    """(import seconds, hotkey-ready seconds) per run."""
+    results = []
+    for _ in range(runs):
+        proc = _python(['-c', HOTKEY_READY_SCRIPT], timeout=60)
+        line = next((l for l in proc.stdout.splitlines() if l.startswith('RESULT')), None)
+        if line is None:
+            raise RuntimeError(f"hotkey-ready run failed:\n{proc.stderr[-2000:]}")
+        _tag, t_import, t_ready = line.split()
+        results.append((float(t_import), float(t_ready)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure run.py startup time.')
+    parser.add_argument('--runs', type=int, default=5, help='hotkey-ready measurements to take')
+    parser.add_argument('--top', type=int, default=15, help='packages to list in the import breakdown')
+    args = parser.parse_args(argv)
+
+    total, packages = import_breakdown()
+    print(f"import run: {total * 1000:.0f} ms (cumulative, -X importtime)")
+    for name, seconds in packages[:args.top]:
+        print(f"  {name:<28} {seconds * 1000:8.1f} ms")
+
+    results = hotkey_ready(args.runs)
+    imports = [r[0] for r in results]
+    ready = [r[1] for r in results]
+    print(f"\nimport run      median {statistics.median(imports) * 1000:7.1f} ms  "
+          f"min {min(imports) * 1000:7.1f} ms  ({args.runs} runs)")
+    print(f"hotkey-ready    median {statistics.median(ready) * 1000:7.1f} ms  "
+          f"min {min(ready) * 1000:7.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
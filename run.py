@@ -1,19 +1,44 @@
 """Eel-based application entry point (replaces CustomTkinter UI)."""
+import time
+STARTUP_T0 = time.perf_counter()
+
 import os
-import os
+import sys
+import argparse
 import threading
 import json
-import eel
-import pyautogui
-import pyperclip
+import logging
+import queue
+from collections import deque
 from dotenv import load_dotenv
-from src import recorder
-from src.alert_popup import show_missing_api_key_popup
+from src import recorder, jobs, logs
+from src.hotkeys import HoldKeyDispatcher
 import keyboard
-from src.overlay_manager import init_overlay, show_overlay, set_paused_overlay, destroy_overlay
+from src.overlay_manager import init_overlay, show_overlay, set_paused_overlay, hide_overlay
 from src.tray import init_tray, shutdown_tray
 load_dotenv()
 
+# Startup budget: only what the hotkeys need is imported up front. eel (and
+# gevent), the sound engine, history export/import/meta, pyautogui and the
+# overlay's customtkinter are imported where first used or warmed up in the
+# background by main(); benchmarks/startup.py reports the breakdown.
+eel = None  # imported by _start_web_ui()
+log = logging.getLogger('app')
+_startup_marks = {}
+
+def _mark_startup(name):
+    """Record seconds since process start for a startup milestone."""
+    _startup_marks[name] = time.perf_counter() - STARTUP_T0
+    log.info("Startup: %s after %.0f ms", name, _startup_marks[name] * 1000)
+
+# Functions callable from the page. They are collected here and handed to
+# eel.expose() once eel has been imported.
+_exposed = []
+
+def expose(fn):
+    _exposed.append(fn)
+    return fn
+
 WEB_DIR = 'web'
 SETTINGS_FILE = 'settings.json'
 
@@ -23,10 +48,22 @@ settings = {
     "shortcut_mode": "toggle",           # toggle | hold
     "shortcut_key_toggle": "ctrl+shift+space",  # combination for toggle mode
     "shortcut_key_hold": "ctrl",         # single key for hold mode
+    "shortcut_hold_min_ms": 200,         # hold mode: key must be held this long to start
     "auto_paste": True,
     "silence_threshold": 50,
     "audio_device_index": None,          # None for default device
+    "audio_device_indexes": [],          # record several devices in parallel, one transcript each
+    "audio_chunk_recording_dir": "",     # save raw capture chunks here for replay ("" = off)
+    "history_archive_after_days": 30,    # re-encode older recordings (0 disables)
+    "history_archive_format": "flac",    # flac | opus
+    "history_audio_quota_mb": 0,         # evict oldest audio above this (0 = unlimited)
+    "log_levels": {"": "INFO"},          # logger name ("" = all) -> level, see src/logs.py
+    "server_enabled": False,             # local HTTP/WebSocket service, see src/server.py
+    "server_port": 8765,
+    "server_token": "",                  # if set, clients must send it (Bearer token or ?token=)
+    "server_workers": 2,                 # concurrent file transcriptions for server clients
     "openrouter_api_key": "",
+    "openrouter_base_url": "",           # OpenAI-compatible endpoint; empty = https://openrouter.ai/api/v1
     "model": "google/gemini-2.5-flash-lite",
     "transcri_brain": {
         "enabled": True,
@@ -34,8 +71,99 @@ settings = {
     }
 }
 
+# ---------------- UI push channel -----------------
+# Eel runs on gevent without monkey-patching: its websocket may only be used from
+# the gevent loop, not from recorder/worker threads. Those queue calls here and
+# a greenlet forwards them to the browser. Until _start_web_ui() runs (and for
+# good with --server) there is no page and no pump, so nothing is queued.
+UI_PUMP_INTERVAL = 0.02
+_ui_calls = queue.Queue()
+_ui_active = False
+
+def _push_to_ui(name, *args):
+    """Call the JS function `name` (registered with eel.expose) from any thread."""
+    if _ui_active:
+        _ui_calls.put((name, args))
+
+# Recorder events (see recorder.subscribe) reach the page in batches, at most
+# UI_EVENT_RATE per second. Level, state and job progress events keep only their
+# latest value per batch; playback and transcription events are all delivered,
+# in order.
+UI_EVENT_RATE = 20
+COALESCED_EVENTS = ('vad_level', 'recording_state')
+LOG_PUSH_LIMIT = 500  # newest log records kept per batch
+_events_lock = threading.Lock()
+_queued_events = []
+_latest_events = {}
+_queued_logs = deque(maxlen=LOG_PUSH_LIMIT)
+
+def _on_recorder_event(event, data):
+    if not _ui_active:
+        return
+    item = dict(data, type=event)
+    with _events_lock:
+        if event in COALESCED_EVENTS:
+            _latest_events[event] = item
+        else:
+            _queued_events.append(item)
+
+def _on_log_record(item):
+    # Sent with the recorder events as one "logs" event per batch (see the Logs view)
+    if not _ui_active:
+        return
+    with _events_lock:
+        _queued_logs.append(item)
+
+def _take_events():
+    with _events_lock:
+        batch = _queued_events + list(_latest_events.values())
+        if _queued_logs:
+            batch.append({"type": "logs", "records": list(_queued_logs)})
+        _queued_events.clear()
+        _latest_events.clear()
+        _queued_logs.clear()
+    return batch
+
+def _ui_pump():
+    next_events = 0.0
+    while True:
+        while True:
+            try:
+                name, args = _ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                getattr(eel, name)(*args)
+            except Exception as e:
+                log.error("UI push %s failed: %s", name, e)
+        now = time.monotonic()
+        if now >= next_events:
+            batch = _take_events()
+            if batch:
+                try:
+                    eel.appEvents(batch)
+                except Exception as e:
+                    log.error("UI event push failed: %s", e)
+                next_events = now + 1.0 / UI_EVENT_RATE
+        eel.sleep(UI_PUMP_INTERVAL)
+
+def _on_job_progress(status):
+    # Sent with the recorder events as "job_progress", keeping the latest per job
+    if not _ui_active:
+        return
+    with _events_lock:
+        _latest_events[('job_progress', status['id'])] = dict(status, type='job_progress')
+
+# Background jobs report progress to the page and announce when they finish
+# (see watchJob and jobFinished in script.js)
+jobs.add_progress_listener(_on_job_progress)
+jobs.add_listener(lambda status: _push_to_ui('jobFinished', status))
+logs.add_listener(_on_log_record)
+
 _hold_registered_key = None
 _toggle_registered_combo = None
+_hold_dispatcher = None
+_server = None
 
 def load_settings():
     if os.path.exists(SETTINGS_FILE):
@@ -45,7 +173,7 @@ def load_settings():
             with _settings_lock:
                 settings.update(data)
         except Exception as e:
-            print('Failed to load settings:', e)
+            log.error('Failed to load settings: %s', e)
 
 def save_settings():
     try:
@@ -53,15 +181,18 @@ def save_settings():
             with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
                 json.dump(settings, f, ensure_ascii=False, indent=2)
     except Exception as e:
-        print('Failed to save settings:', e)
+        log.error('Failed to save settings: %s', e)
 
 
 def _unregister_hotkeys():
-    global _hold_registered_key, _toggle_registered_combo
+    global _hold_registered_key, _toggle_registered_combo, _hold_dispatcher
     try:
         keyboard.unhook_all()
     except Exception:
         pass
+    if _hold_dispatcher is not None:
+        _hold_dispatcher.close()
+        _hold_dispatcher = None
     _hold_registered_key = None
     _toggle_registered_combo = None
 
@@ -73,120 +204,123 @@ def _register_hotkeys():
     if mode == 'toggle':
         combo = settings.get('shortcut_key_toggle', 'ctrl+alt+shift+r')
         try:
-            keyboard.add_hotkey(combo, lambda: (start_recording() if not recorder.recording else stop_recording()))
+            keyboard.add_hotkey(combo, lambda: (start_recording() if not recorder.is_recording() else stop_recording()))
             global _toggle_registered_combo
             _toggle_registered_combo = combo
-            print('Registered toggle hotkey:', combo)
+            log.info('Registered toggle hotkey: %s', combo)
         except Exception as e:
-            print('Failed to register toggle hotkey:', e)
+            log.error('Failed to register toggle hotkey: %s', e)
     else:  # hold
         key = settings.get('shortcut_key_hold', 'ctrl')
-        def _on_press():
-            if not recorder.recording:
-                start_recording()
-        def _on_release():
-            if recorder.recording:
-                stop_recording()
+        # One hook for all keys: autorepeat of the hold key is dropped and other keys
+        # (ctrl+c, ...) cancel a hold in the dispatcher, before recording is touched
+        global _hold_dispatcher
+        _hold_dispatcher = HoldKeyDispatcher(
+            on_start=start_recording,
+            on_stop=lambda: recorder.is_recording() and stop_recording(),
+            min_hold=float(settings.get('shortcut_hold_min_ms', 200) or 0) / 1000.0,
+        )
+        dispatcher = _hold_dispatcher
         try:
-            keyboard.on_press_key(key, lambda _e: _on_press())
-            keyboard.on_release_key(key, lambda _e: _on_release())
+            scan_codes = set(keyboard.key_to_scan_codes(key))
+            def _on_key_event(e):
+                if e.scan_code in scan_codes:
+                    if e.event_type == keyboard.KEY_DOWN:
+                        dispatcher.press()
+                    else:
+                        dispatcher.release()
+                elif e.event_type == keyboard.KEY_DOWN:
+                    dispatcher.other_key()
+            keyboard.hook(_on_key_event)
             global _hold_registered_key
             _hold_registered_key = key
-            print('Registered hold key:', key)
+            log.info('Registered hold key: %s', key)
         except Exception as e:
-            print('Failed to register hold key:', e)
+            log.error('Failed to register hold key: %s', e)
 
 # ---------------- Core Recording Actions -----------------
 
-@eel.expose
+def _missing_api_key():
+    """Error result (after telling the user) if no API key is configured, else None."""
+    api_key = (settings.get('openrouter_api_key') or os.environ.get('OPENROUTER_API_KEY') or '').strip()
+    if api_key:
+        return None
+    try:
+        from src.alert_popup import show_missing_api_key_popup
+        show_missing_api_key_popup()
+    except Exception:
+        pass
+    return {"status": "error", "error": "missing_api_key"}
+
+@expose
 def start_recording():
     # Validate API key BEFORE starting capture so user gets immediate feedback.
-    api_key = (settings.get('openrouter_api_key') or os.environ.get('OPENROUTER_API_KEY') or '').strip()
-    if not api_key:
-        try:
-            show_missing_api_key_popup()
-        except Exception:
-            pass
-        return {"status": "error", "error": "missing_api_key"}
-    if recorder.recording:
+    error = _missing_api_key()
+    if error:
+        return error
+    # The capture worker picks the session up at once, before the start sound plays,
+    # so early speech is not missed
+    if recorder.start_recording() is None:
         return {"status": "already_recording"}
-    recorder.stop_event.clear()
-    recorder.pause_event.clear()
-    recorder.cancelled = False
-    recorder.recording = True
-    recorder.set_paused(False)
-    # Bump session id so older threads become stale
-    import time
-    recorder.active_session_id = time.time_ns()
-    # Start capture thread BEFORE playing start sound to avoid missing early speech
-    threading.Thread(target=recorder.process_speech, kwargs={'session_id': recorder.active_session_id}, daemon=True).start()
     try:
         recorder.play_audio("audio/start.wav")
     except Exception as e:
-        print("Audio feedback (start) failed:", e)
+        log.error("Audio feedback (start) failed: %s", e)
     show_overlay()
     return {"status": "started"}
 
-@eel.expose
+@expose
 def stop_recording():
-    if not recorder.recording:
+    if not recorder.stop_recording():
         return {"status": "not_recording"}
-    recorder.stop_event.set()
-    recorder.recording = False
     try:
         recorder.play_audio("audio/stop.wav")
     except Exception as e:
-        print("Audio feedback (stop) failed:", e)
-    destroy_overlay()
+        log.error("Audio feedback (stop) failed: %s", e)
+    hide_overlay()
     return {"status": "stopping"}
 
-@eel.expose
+@expose
 def cancel_recording():
-    if not recorder.recording:
+    if not recorder.cancel_recording():
         return {"status": "not_recording"}
-    recorder.cancelled = True
-    recorder.stop_event.set()
-    recorder.recording = False
     try:
         recorder.play_audio("audio/cancel.wav")
     except Exception as e:
-        print("Audio feedback (cancel) failed:", e)
-    destroy_overlay()
+        log.error("Audio feedback (cancel) failed: %s", e)
+    hide_overlay()
     return {"status": "cancelled"}
 
-@eel.expose
+@expose
 def restart_recording():
     """Discard current recording (no transcription) and immediately start a fresh capture."""
-    if not recorder.recording:
-        # If not already recording just start
-        return start_recording()
-    # Mark current as cancelled so process_speech skips transcription
-    recorder.cancelled = True
-    recorder.stop_event.set()
-    recorder.recording = False
+    error = _missing_api_key()
+    if error:
+        return error
+    # Cancel and start in one transition, so no other caller can slip in between
+    recorder.restart_recording()
     try:
-        recorder.play_audio("audio/stop.wav")
-    except Exception:
-        pass
-    # Start new one
-    return start_recording()
+        recorder.play_audio("audio/start.wav")
+    except Exception as e:
+        log.error("Audio feedback (start) failed: %s", e)
+    show_overlay()
+    return {"status": "started"}
 
-@eel.expose
+@expose
 def toggle_pause():
-    current = recorder.pause_event.is_set()
-    recorder.set_paused(not current)
-    set_paused_overlay(recorder.pause_event.is_set())
+    paused = recorder.set_paused(not recorder.is_paused())
+    set_paused_overlay(paused)
     try:
         recorder.play_audio("audio/pause.wav")
     except Exception as e:
-        print("Audio feedback (pause) failed:", e)
-    return {"paused": recorder.pause_event.is_set()}
+        log.error("Audio feedback (pause) failed: %s", e)
+    return {"paused": paused}
 
-@eel.expose
+@expose
 def get_state():
     return {
-        "recording": recorder.recording,
-        "paused": recorder.pause_event.is_set(),
+        "recording": recorder.is_recording(),
+        "paused": recorder.is_paused(),
     }
 
 def _on_transcription_done(text: str):
@@ -198,31 +332,45 @@ def _on_transcription_done(text: str):
     auto_paste = settings.get('auto_paste', True)
     if auto_paste:
         try:
+            import pyautogui
+            import pyperclip
             pyperclip.copy(text + ' ')
             pyautogui.hotkey('ctrl', 'v')
         except Exception:
             pass
-    eel.transcriptionResult(text)
+    _push_to_ui('transcriptionResult', text)
     try:
         recorder.play_audio("audio/done.wav")
     except Exception as e:
-        print("Audio feedback (done) failed:", e)
+        log.error("Audio feedback (done) failed: %s", e)
 
 def _on_recording_completed():
-    eel.recordingCompleted()
+    _push_to_ui('recordingCompleted')
 
 recorder.set_callbacks(
     on_transcription_done=_on_transcription_done,
     on_recording_completed=_on_recording_completed,
 )
+recorder.subscribe(_on_recorder_event)
+
+def _apply_archive_settings():
+    from src import history_archive
+    try:
+        history_archive.configure(
+            after_days=settings.get('history_archive_after_days', 30),
+            fmt=settings.get('history_archive_format', 'flac'),
+            quota_mb=settings.get('history_audio_quota_mb', 0),
+        )
+    except Exception as e:
+        log.warning('Invalid history archive settings: %s', e)
 
 # ---------------- Eel Exposed Settings APIs -----------------
-@eel.expose
+@expose
 def get_settings():
     with _settings_lock:
         return settings
 
-@eel.expose
+@expose
 def update_settings(new_values: dict):
     changed_keys = []
     with _settings_lock:
@@ -245,11 +393,23 @@ def update_settings(new_values: dict):
             recorder.set_audio_device(new_values.get('audio_device_index'))
         except Exception:
             pass
+    if 'audio_device_indexes' in new_values:
+        recorder.set_audio_devices(settings.get('audio_device_indexes'))
+    if 'audio_chunk_recording_dir' in new_values:
+        recorder.set_chunk_recording(settings.get('audio_chunk_recording_dir'))
+    if 'log_levels' in changed_keys:
+        logs.set_levels(settings.get('log_levels'))
+    if any(k.startswith('history_') for k in changed_keys):
+        _apply_archive_settings()
     if any(k.startswith('shortcut_') or k == 'shortcut_mode' for k in changed_keys):
         _register_hotkeys()
+    if any(k.startswith('server_') for k in changed_keys):
+        _stop_server()
+        if settings.get('server_enabled'):
+            _start_server()
     return {"updated": changed_keys}
 
-@eel.expose
+@expose
 def set_silence_threshold(value):
     """Directly set silence threshold and persist to settings."""
     try:
@@ -261,12 +421,7 @@ def set_silence_threshold(value):
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
-@eel.expose
-def calibrate_silence_threshold(duration_sec: float = 2.0):
-    """Listen to ambient noise and compute a suggested silence threshold.
-
-    Returns result dict with ambient stats and chosen threshold; applies and persists it.
-    """
+def _calibrate(duration_sec):
     try:
         result = recorder.calibrate_noise_floor(duration_sec)
         threshold = int(float(result.get('threshold', 50)))
@@ -278,105 +433,301 @@ def calibrate_silence_threshold(duration_sec: float = 2.0):
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
-@eel.expose
-def get_audio_devices():
-    """Get list of available audio input devices."""
+@expose
+def calibrate_silence_threshold(duration_sec: float = 2.0):
+    """Listen to ambient noise and compute a suggested silence threshold.
+
+    Runs in the background; returns {"job_id"} at once. The job result (pushed via
+    jobFinished) has the ambient stats and chosen threshold, which is applied and persisted.
+    """
+    return {"job_id": jobs.run('calibrate', _calibrate, duration_sec).id}
+
+def _list_audio_devices():
     try:
-        devices = recorder.get_audio_devices()
-        return {"ok": True, "devices": devices}
+        return {"ok": True, "devices": recorder.get_audio_devices()}
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
+@expose
+def get_audio_devices():
+    """List audio input devices in the background; returns {"job_id"} at once."""
+    return {"job_id": jobs.run('audio_devices', _list_audio_devices).id}
+
 # ---------------- Eel Exposed History APIs -----------------
-@eel.expose
+@expose
 def get_history():
     """Get the list of all recordings from history."""
     try:
         return recorder.get_history()
     except Exception as e:
-        print(f"Error getting history: {e}")
+        log.error("Error getting history: %s", e)
         return []
 
-@eel.expose
+@expose
+def get_history_page(cursor=None, limit=50, sort='newest'):
+    """Get one cursor-paginated page of history (newest first, or by length)."""
+    try:
+        return recorder.get_history_page(cursor, limit, sort)
+    except Exception as e:
+        log.error("Error getting history page: %s", e)
+        return {"items": [], "next_cursor": None, "total": 0}
+
+@expose
+def get_history_waveform(filename, buckets=400):
+    """Get precomputed waveform peaks for a history recording."""
+    try:
+        return recorder.get_history_waveform(filename, buckets)
+    except Exception as e:
+        log.error("Error getting waveform: %s", e)
+        return None
+
+@expose
+def search_history(query, limit=20, offset=0):
+    """Full-text search over history transcripts (ranked, with highlighted snippets)."""
+    try:
+        return recorder.search_history(query, limit, offset)
+    except Exception as e:
+        log.error("Error searching history: %s", e)
+        return {"total": 0, "results": []}
+
+@expose
+def get_history_changes(since_version):
+    """Get history mutations since a version (entries and delete tombstones)."""
+    try:
+        return recorder.get_history_changes(since_version)
+    except Exception as e:
+        log.error("Error getting history changes: %s", e)
+        return {"version": since_version, "changes": [], "reset": True}
+
+@expose
 def delete_history_item(filename):
-    """Delete a recording from history."""
+    """Delete a recording from history; returns a tombstone change."""
     try:
         return recorder.delete_history_item(filename)
     except Exception as e:
-        print(f"Error deleting history item: {e}")
-        return []
+        log.error("Error deleting history item: %s", e)
+        return None
 
-@eel.expose
+@expose
 def play_history_item(filename):
     """Play a recording from history."""
     try:
         return recorder.play_history_item(filename)
     except Exception as e:
-        print(f"Error playing history item: {e}")
+        log.error("Error playing history item: %s", e)
         return False
 
-@eel.expose
+@expose
 def stop_audio():
     """Stop any currently playing audio."""
     try:
         recorder.stop_audio()
     except Exception as e:
-        print(f"Error stopping audio: {e}")
+        log.error("Error stopping audio: %s", e)
 
-@eel.expose
+@expose
 def is_audio_playing():
     """Check if audio is currently playing."""
     try:
         return recorder.is_audio_playing()
     except Exception as e:
-        print(f"Error checking audio state: {e}")
+        log.error("Error checking audio state: %s", e)
         return False
 
-@eel.expose
-def transcribe_history_item(filename):
-    """Transcribe a recording from history and update the JSON."""
+def _transcribe_history_item(filename):
     try:
         return recorder.transcribe_history_item(filename)
     except Exception as e:
-        print(f"Error transcribing history item: {e}")
+        log.error("Error transcribing history item: %s", e)
         return None
 
-def main():
-    # Always load persisted settings first
-    load_settings()
-    # Apply silence threshold to recorder
+@expose
+def transcribe_history_item(filename):
+    """Transcribe a recording from history in the background; returns {"job_id"} at once.
+
+    The job result is the updated entry as a change (None if transcription failed).
+    """
+    return {"job_id": jobs.run('transcribe', _transcribe_history_item, filename).id}
+
+@expose
+def start_history_export(fmt='jsonl', options=None):
+    """Start a background export of history (jsonl/csv/srt/zip); returns the job status."""
     try:
-        recorder.set_silence_threshold(settings.get('silence_threshold', 50))
-    except Exception:
-        pass
-    # Apply audio device to recorder
+        from src import history_export
+        return {"ok": True, "job": history_export.start_export(fmt, **(options or {}))}
+    except Exception as e:
+        log.error("Error starting history export: %s", e)
+        return {"ok": False, "error": str(e)}
+
+@expose
+def start_history_import(folder, options=None):
+    """Start a background import of the audio files in a folder; returns the job status."""
+    try:
+        from src import history_import
+        return {"ok": True, "job": history_import.start_import(folder, **(options or {}))}
+    except Exception as e:
+        log.error("Error starting history import: %s", e)
+        return {"ok": False, "error": str(e)}
+
+# ---------------- Eel Exposed Log APIs -----------------
+@expose
+def get_logs(after=0, limit=200, level=None, logger=None):
+    """Recent log records from the in-memory ring (newer than seq `after`).
+
+    Used to fill the Logs view when it opens or its filters change; new
+    records are pushed as "logs" events after that.
+    """
+    return logs.recent(after, limit, level, logger)
+
+# ---------------- Eel Exposed Job APIs -----------------
+@expose
+def get_job(job_id):
+    """Get progress/status of a background job (None if unknown); updates are pushed as job_progress."""
+    return jobs.get_job(job_id)
+
+@expose
+def cancel_job(job_id):
+    """Request cancellation of a background job."""
+    return jobs.cancel_job(job_id)
+
+def _warm_up(headless=False):
+    """Startup work that can finish after the hotkeys are live (background thread)."""
+    from src import history_archive, history_meta, sound, transcriber
+    # Apply audio device to recorder (enumerates devices once; later lookups use the cache)
     try:
         recorder.set_audio_device(settings.get('audio_device_index'))
+        recorder.set_audio_devices(settings.get('audio_device_indexes'))
     except Exception:
         pass
-    
-    # Check if API key is configured
-    if not settings.get("openrouter_api_key"):
-        print("WARNING: OpenRouter API key not set; please enter it in API Keys view")
-    
+    recorder.set_chunk_recording(settings.get('audio_chunk_recording_dir'))
+    # Decode feedback sounds once and open the persistent output stream
+    try:
+        sound.init()
+    except Exception as e:
+        log.error('Sound engine init failed: %s', e)
+    if not headless:
+        init_overlay(
+            pause_toggle_cb=lambda: toggle_pause(),
+            stop_cb=lambda: stop_recording(),
+            cancel_cb=lambda: cancel_recording(),
+            restart_cb=lambda: restart_recording(),
+        )
+    transcriber.warm_up()
+    # Background re-encoding of old recordings and audio quota
+    _apply_archive_settings()
+    history_archive.start_archiver()
+    # Duration / level / waveform peaks for history entries (backfills in a process pool)
+    history_meta.start()
+    _mark_startup('warm-up done')
+
+def _start_web_ui(on_closed):
+    """Import eel, register the exposed functions and open the page (non-blocking)."""
+    global eel, _ui_active
+    import eel as _eel
+    eel = _eel
+    for fn in _exposed:
+        eel.expose(fn)
     eel.init(WEB_DIR)
-    init_overlay(
-        pause_toggle_cb=lambda: toggle_pause(),
-        stop_cb=lambda: stop_recording(),
-        cancel_cb=lambda: cancel_recording(),
-        restart_cb=lambda: restart_recording(),
+    eel.start('index.html', size=(980, 640), port=0, block=False, close_callback=on_closed)
+    eel.spawn(_ui_pump)
+    _ui_active = True
+    _mark_startup('web UI started')
+
+def _start_server(port=None):
+    """Start the local HTTP/WebSocket service (src/server.py) with the app's recorder actions."""
+    global _server
+    from src.server import TranscriptionServer
+    server = TranscriptionServer(
+        port=port or settings.get('server_port', 8765),
+        workers=settings.get('server_workers', 2),
+        token=settings.get('server_token') or None,
+        actions={
+            "start": start_recording,
+            "stop": stop_recording,
+            "cancel": cancel_recording,
+            "pause": toggle_pause,
+            "state": get_state,
+        },
     )
+    try:
+        server.start()
+    except Exception as e:
+        log.error("Could not start the transcription server: %s", e)
+        return None
+    _server = server
+    return server
+
+def _stop_server():
+    global _server
+    if _server is not None:
+        _server.stop()
+        _server = None
+
+def _shutdown():
+    """Stop capture, sound and the server and flush history and logs (before os._exit)."""
+    from src import sound
+    _stop_server()
+    recorder.controller.shutdown(timeout=1.0)
+    sound.shutdown()
+    # os._exit skips atexit/daemon threads: make sure queued history writes land first
+    if not recorder.flush_history(timeout=5.0):
+        log.warning('History flush timed out')
+    logs.shutdown()
+
+def _run_headless(port=None):
+    """Server mode: hotkeys and the local service, no window, overlay or tray."""
+    import src.overlay_manager as overlay_manager
+    overlay_manager.USE_OVERLAY = False
+    threading.Thread(target=_warm_up, args=(True,), name='warm-up', daemon=True).start()
+    if _start_server(port) is None:
+        _shutdown()
+        return 1
+    log.info('Running headless; press Ctrl+C to quit.')
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        log.info('Shutting down...')
+    _shutdown()
+    return 0
+
+def _start_core():
+    """Everything main() does before the app is usable: logging, settings, hotkeys.
+
+    Kept free of heavy imports (benchmarks/startup.py times exactly this).
+    """
+    # Logging first (console output goes through a queue), then persisted settings
+    logs.setup()
+    load_settings()
+    logs.set_levels(settings.get('log_levels'))
+    # Apply silence threshold to recorder
+    try:
+        recorder.set_silence_threshold(settings.get('silence_threshold', 50))
+    except Exception:
+        pass
+    # Hotkeys first: the app is usable from here on
     _register_hotkeys()
+    _mark_startup('hotkeys ready')
 
-    # System tray integration: run eel in non-blocking mode
-    def _on_closed(_path, _pages):
-        # Intercept window close -> just hide window; keep app alive in tray
-        print('Main window closed (hidden to tray).')
-        # There is no direct hide in eel; front-end window will close, user can re-open from tray
-        return False  # prevent eel from shutting down server
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Smart Audio Transcript')
+    parser.add_argument('--server', action='store_true',
+                        help='run headless: hotkeys plus the local HTTP/WebSocket service, no window or tray')
+    parser.add_argument('--port', type=int, help='port for the local service (default: server_port setting)')
+    args = parser.parse_args(argv)
+    _start_core()
 
-    # Launch eel (non-blocking)
-    eel.start('index.html', size=(980, 640), port=0, block=False, close_callback=_on_closed)
+    # Check if API key is configured
+    if not settings.get("openrouter_api_key"):
+        log.warning("OpenRouter API key not set; please enter it in API Keys view")
+
+    if args.server:
+        return _run_headless(args.port)
+
+    # Devices, sound engine, overlay, transcriber client and history services
+    threading.Thread(target=_warm_up, name='warm-up', daemon=True).start()
+    if settings.get('server_enabled') or args.port:
+        threading.Thread(target=_start_server, args=(args.port,), name='server-start', daemon=True).start()
 
     # Tray callbacks
     def show_ui():
@@ -391,8 +742,9 @@ def main():
                 pass
 
     def quit_app():
-        print('Quitting application from tray...')
+        log.info('Quitting application from tray...')
         shutdown_tray()
+        _shutdown()
         os._exit(0)
 
     def tray_start_record():
@@ -409,7 +761,17 @@ def main():
         stop_record=tray_stop_record,
     )
 
-    print('Application running in background (tray). Close the window or use tray menu to quit.')
+    # System tray integration: run eel in non-blocking mode
+    def _on_closed(_path, _pages):
+        # Intercept window close -> just hide window; keep app alive in tray
+        log.info('Main window closed (hidden to tray).')
+        # There is no direct hide in eel; front-end window will close, user can re-open from tray
+        return False  # prevent eel from shutting down server
+
+    # Launch eel (non-blocking)
+    _start_web_ui(_on_closed)
+
+    log.info('Application running in background (tray). Close the window or use tray menu to quit.')
     # Keep main thread alive
     try:
         while True:
@@ -418,5 +780,5 @@ def main():
         quit_app()
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
 
@@ -0,0 +1,335 @@
+"""Audio sources for the capture pipeline.
+
+record_audio() reads 16 kHz mono int16 chunks from whatever source is set
+with recorder.set_audio_source(); by default that is the microphone through
+PyAudio. The other sources make the voice detection, pre-roll and
+trailing-silence logic testable and profilable without a device:
+
+    WavFileSource   a 16 kHz mono 16-bit WAV file
+    SyntheticSource generated speech-like audio, room noise or silence
+    ReplaySource    a raw chunk stream recorded from a real capture
+    ChunkRecorder   wraps a stream and records the chunks it returns (the
+                    recorder does this when set_chunk_recording() is on)
+
+A source is opened once per recording; source.open(device_index) returns an
+input stream with read(frames), available() and close(), and source.close()
+releases the backend. The file, synthetic and replay streams deliver audio at
+`speed` times real time (0 = as fast as it is read) and, when the audio runs
+out, either raise EOFError (end='stop': the recording ends as if stopped),
+continue with silence (end='silence') or start over (end='loop').
+
+Chunk files are a small header followed by one record per chunk:
+
+    b'VTCHUNK1' + <rate:u32><channels:u16><sample width:u16>
+    <seconds since the stream opened:f64><length:u32><PCM bytes>   (repeated)
+"""
+import struct
+import time
+import wave
+
+RATE = 16000
+CHANNELS = 1
+SAMPLE_WIDTH = 2
+BLOCK_FRAMES = 512  # granularity of generated and file audio
+
+CHUNK_MAGIC = b'VTCHUNK1'
+_HEADER = struct.Struct('<IHH')
+_RECORD = struct.Struct('<dI')
+
+
+# ---------------- PyAudio -----------------
+
+class PyAudioSource:
+    """Microphone input through PyAudio (one PortAudio instance per recording)."""
+
+    sample_width = SAMPLE_WIDTH
+
+    def __init__(self, pyaudio_module, audio_format=8, frames_per_buffer=BLOCK_FRAMES):
+        self._pa = pyaudio_module.PyAudio()
+        self._format = audio_format
+        self._frames_per_buffer = frames_per_buffer
+        self.sample_width = self._pa.get_sample_size(audio_format)
+
+    def open(self, device_index=None):
+        return _PyAudioStream(self._pa.open(
+            format=self._format,
+            channels=CHANNELS,
+            rate=RATE,
+            input=True,
+            input_device_index=device_index,
+            frames_per_buffer=self._frames_per_buffer,
+        ))
+
+    def close(self):
+        self._pa.terminate()
+
+
+class _PyAudioStream:
+    def __init__(self, stream):
+        self._stream = stream
+
+    def read(self, frames):
+        return self._stream.read(frames, exception_on_overflow=False)
+
+    def available(self):
+        return self._stream.get_read_available()
+
+    def close(self):
+        try:
+            self._stream.stop_stream()
+        finally:
+            self._stream.close()
+
+
+# ---------------- Paced streams -----------------
+
+class _PacedStream:
+    """Delivers (due seconds, PCM bytes) blocks at `speed` times real time.
+
+    blocks() is called again for end='loop'; due times are relative to the
+    start of the stream.
+    """
+
+    def __init__(self, blocks, speed=1.0, end='stop'):
+        if end not in ('stop', 'silence', 'loop'):
+            raise ValueError(f"end must be 'stop', 'silence' or 'loop', not {end!r}")
+        self._make_blocks = blocks
+        self._blocks = blocks()
+        self._speed = float(speed or 0)
+        self._end = end
+        self._offset = 0.0      # due time of the last block pulled
+        self._loop_base = 0.0   # added to due times after a loop
+        self._silence_frames = 0
+        self._buffer = bytearray()
+        self._exhausted = False
+        self._t0 = time.perf_counter()
+
+    def _next_block(self):
+        """(due, data) of the next block, or None when the audio has ended (end='stop')."""
+        while True:
+            block = next(self._blocks, None)
+            if block is not None:
+                due, data = block
+                self._offset = self._loop_base + due
+                return self._offset, data
+            if self._end == 'loop' and self._offset > self._loop_base:
+                self._loop_base = self._offset
+                self._blocks = self._make_blocks()
+                continue
+            if self._end == 'silence':
+                self._silence_frames += BLOCK_FRAMES
+                return self._offset + self._silence_frames / float(RATE), bytes(BLOCK_FRAMES * SAMPLE_WIDTH)
+            return None
+
+    def _wait(self, due):
+        if self._speed > 0:
+            delay = self._t0 + due / self._speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def read(self, frames):
+        size = frames * SAMPLE_WIDTH
+        while len(self._buffer) < size:
+            if self._exhausted:
+                break
+            block = self._next_block()
+            if block is None:
+                self._exhausted = True
+                break
+            due, data = block
+            self._wait(due)
+            self._buffer += data
+        if not self._buffer and self._exhausted:
+            raise EOFError('audio source ended')
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data + bytes(size - len(data))  # the last chunk is padded with silence
+
+    def available(self):
+        if self._exhausted or self._speed <= 0:
+            # Let the reader call read(): it returns at once (or raises EOFError)
+            return max(len(self._buffer) // SAMPLE_WIDTH, BLOCK_FRAMES)
+        now = (time.perf_counter() - self._t0) * self._speed
+        elapsed_frames = int(now * RATE)
+        buffered = len(self._buffer) // SAMPLE_WIDTH
+        due_frames = int(self._offset * RATE)
+        return buffered + max(0, elapsed_frames - due_frames)
+
+    def close(self):
+        self._buffer.clear()
+
+
+def _frame_blocks(pcm):
+    """Blocks of BLOCK_FRAMES frames from a PCM byte string, due when their last frame is."""
+    step = BLOCK_FRAMES * SAMPLE_WIDTH
+    for start in range(0, len(pcm), step):
+        block = pcm[start:start + step]
+        yield (start + len(block)) / float(SAMPLE_WIDTH * RATE), block
+
+
+class _StaticSource:
+    sample_width = SAMPLE_WIDTH
+
+    def close(self):
+        pass
+
+
+# ---------------- WAV files -----------------
+
+def read_wav(path):
+    """PCM bytes of a 16 kHz mono 16-bit WAV (raises ValueError for other formats)."""
+    with wave.open(path, 'rb') as wf:
+        params = (wf.getnchannels(), wf.getsampwidth(), wf.getframerate())
+        if params != (CHANNELS, SAMPLE_WIDTH, RATE):
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit WAV, got {params[2]} Hz, "
+                             f"{params[0]} channel(s), {params[1] * 8}-bit")
+        return wf.readframes(wf.getnframes())
+
+
+class WavFileSource(_StaticSource):
+    """Plays a WAV file into the capture pipeline (every device reads the same file)."""
+
+    def __init__(self, path, speed=1.0, end='stop'):
+        self.path = path
+        self.speed = speed
+        self.end = end
+        self._pcm = read_wav(path)
+
+    @property
+    def seconds(self):
+        return len(self._pcm) / float(SAMPLE_WIDTH * RATE)
+
+    def open(self, device_index=None):
+        return _PacedStream(lambda: _frame_blocks(self._pcm), self.speed, self.end)
+
+
+# ---------------- Synthetic audio -----------------
+
+def synthetic_signal(kind, seconds, seed=1):
+    """Float samples (int16 scale) of a synthetic signal.
+
+    Args:
+        kind: 'speech' (harmonic syllables, ~4 per second, in 1-4 s phrases with
+            0.3-1.5 s pauses), 'noise' (room noise around the default silence
+            threshold) or 'silence' (digital near-silence)
+        seconds: length
+        seed: random seed; the same arguments always give the same signal
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    n = int(seconds * RATE)
+    t = np.arange(n) / float(RATE)
+    if kind == 'speech':
+        pitch = 140 + 40 * np.sin(2 * np.pi * 0.3 * t)  # slowly gliding fundamental
+        phase = 2 * np.pi * np.cumsum(pitch) / RATE
+        voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+        syllables = np.clip(np.sin(2 * np.pi * 4.0 * t), 0, None) ** 2
+        envelope = np.zeros(n)
+        pos = 0
+        while pos < n:
+            talk = int(rng.uniform(1.0, 4.0) * RATE)
+            envelope[pos:pos + talk] = 1.0
+            pos += talk + int(rng.uniform(0.3, 1.5) * RATE)
+        return 3000 * voice * syllables * envelope + rng.normal(0, 8, n)
+    if kind == 'noise':
+        level = 60 + 25 * np.sin(2 * np.pi * 0.5 * t)
+        return rng.normal(0, 1, n) * level
+    if kind == 'silence':
+        return rng.integers(-2, 3, n).astype(np.float64)
+    raise ValueError(f"unknown signal: {kind}")
+
+
+SIGNAL_CYCLES = {'speech': 30.0, 'noise': 8.0, 'silence': 2.0}  # seconds generated, then repeated
+
+
+def synthetic_pcm(kind, seconds=None, seed=1):
+    """int16 PCM bytes of a synthetic signal (one cycle when seconds is None)."""
+    import numpy as np
+    cycle = SIGNAL_CYCLES.get(kind, 10.0)
+    samples = synthetic_signal(kind, cycle, seed)
+    pcm = np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+    if seconds is None:
+        return pcm
+    size = int(seconds * RATE) * SAMPLE_WIDTH
+    return (pcm * (size // len(pcm) + 1))[:size]
+
+
+class SyntheticSource(_StaticSource):
+    """Generated audio: endless when seconds is None, else `seconds` long."""
+
+    def __init__(self, kind='speech', seconds=None, speed=1.0, end='stop', seed=1):
+        self.kind = kind
+        self.speed = speed
+        self.end = end
+        self._cycle = synthetic_pcm(kind, seed=seed)
+        self._pcm = None if seconds is None else synthetic_pcm(kind, seconds, seed)
+
+    def open(self, device_index=None):
+        if self._pcm is not None:
+            return _PacedStream(lambda: _frame_blocks(self._pcm), self.speed, self.end)
+        return _PacedStream(lambda: _frame_blocks(self._cycle), self.speed, 'loop')
+
+
+# ---------------- Record / replay -----------------
+
+class ChunkRecorder:
+    """Wraps an input stream and writes every chunk it returns to a chunk file."""
+
+    def __init__(self, stream, path):
+        self._stream = stream
+        self._file = open(path, 'wb')
+        self._file.write(CHUNK_MAGIC + _HEADER.pack(RATE, CHANNELS, SAMPLE_WIDTH))
+        self._t0 = time.perf_counter()
+        self.path = path
+
+    def read(self, frames):
+        data = self._stream.read(frames)
+        self._file.write(_RECORD.pack(time.perf_counter() - self._t0, len(data)))
+        self._file.write(data)
+        return data
+
+    def available(self):
+        return self._stream.available()
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._file.close()
+
+
+def read_chunks(path):
+    """Yield (seconds since the stream opened, PCM bytes) from a chunk file."""
+    with open(path, 'rb') as f:
+        head = f.read(len(CHUNK_MAGIC) + _HEADER.size)
+        if not head.startswith(CHUNK_MAGIC):
+            raise ValueError(f"{path}: not a chunk file")
+        rate, channels, width = _HEADER.unpack(head[len(CHUNK_MAGIC):])
+        if (rate, channels, width) != (RATE, CHANNELS, SAMPLE_WIDTH):
+            raise ValueError(f"{path}: unsupported format {rate} Hz/{channels} ch/{width * 8}-bit")
+        while True:
+            record = f.read(_RECORD.size)
+            if len(record) < _RECORD.size:
+                return
+            seconds, length = _RECORD.unpack(record)
+            data = f.read(length)
+            if len(data) < length:
+                return  # cut short (the capture was killed); stop at the last whole chunk
+            yield seconds, data
+
+
+class ReplaySource(_StaticSource):
+    """Plays a recorded chunk file back with its original timing, scaled by speed."""
+
+    def __init__(self, path, speed=1.0, end='stop'):
+        self.path = path
+        self.speed = speed
+        self.end = end
+        self._chunks = list(read_chunks(path))
+
+    @property
+    def seconds(self):
+        return sum(len(data) for _due, data in self._chunks) / float(SAMPLE_WIDTH * RATE)
+
+    def open(self, device_index=None):
+        return _PacedStream(lambda: iter(self._chunks), self.speed, self.end)
@@ -0,0 +1,301 @@
+"""Headless batch transcription of a directory of recordings.
+
+Runs the same transcription request as the app (transcriber.transcribe_with_gemini)
+over every audio file under a directory, with a bounded number of requests in
+flight, and appends one JSON line per file to the output:
+
+    {"source": "2026/call.wav", "size": 81964, "mtime": 1760000000.0,
+     "status": "ok", "transcript": "...", "duration": 2.56, "seconds": 1.84}
+
+The output doubles as the resume manifest: a file whose last line has status
+"ok" (for the same size and mtime) is skipped when the command is run again,
+so after a crash or Ctrl+C the run simply continues. Failed files are retried.
+
+Only modules without audio-device or GUI dependencies are imported (no
+recorder, pyaudio, winsound, pyautogui or pyperclip), so this runs on a plain
+Linux box. WAV files are sent as they are; other formats are converted to
+16 kHz mono WAV first (needs numpy, plus soundfile or ffmpeg).
+
+    python -m src.batch ~/calls --output calls.jsonl --workers 8
+    python -m src.batch ~/calls --output calls.jsonl --history   # also add to history
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from . import history_archive, history_store, jobs, logs, transcriber
+
+log = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.aac', '.flac', '.ogg', '.opus', '.webm')
+DEFAULT_WORKERS = 4
+
+
+# ---------------- Manifest -----------------
+
+def _file_key(path):
+    stat = os.stat(path)
+    return stat.st_size, round(stat.st_mtime, 3)
+
+
+def read_manifest(path):
+    """Sources already transcribed according to an output file.
+
+    A line cut short by a crash is dropped from the file so that appending
+    continues on a clean line.
+
+    Returns:
+        {source: (size, mtime)} for sources whose latest line has status "ok"
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            keep = data.rfind(b'\n') + 1
+            log.warning("Dropping a partial line at the end of %s", path)
+            f.truncate(keep)
+            data = data[:keep]
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        source = record.get('source')
+        if record.get('status') == 'ok':
+            done[source] = (record.get('size'), record.get('mtime'))
+        else:
+            done.pop(source, None)
+    return done
+
+
+def find_files(root, recursive=True):
+    """Audio files under root, sorted, skipping hidden directories."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if recursive and not d.startswith('.'))
+        for name in sorted(filenames):
+            if name.lower().endswith(AUDIO_EXTENSIONS):
+                found.append(os.path.join(dirpath, name))
+    return found
+
+
+# ---------------- Per-file work (runs on the worker pool) -----------------
+
+def _wav_duration(path):
+    try:
+        with wave.open(path, 'rb') as wf:
+            return wf.getnframes() / float(wf.getframerate())
+    except Exception:
+        return None
+
+
+def _as_wav(src, tmp_dir):
+    """Path of a WAV with src's audio, converting non-WAV input into tmp_dir."""
+    if src.lower().endswith('.wav'):
+        return src
+    from .history_import import _prepare  # numpy/soundfile only when needed
+    staged = os.path.join(tmp_dir, hashlib.sha1(src.encode('utf-8')).hexdigest()[:16] + '.wav')
+    _src, staged, _digest, error = _prepare((src, staged))
+    if error:
+        raise RuntimeError(error)
+    return staged
+
+
+def _transcribe_one(src, source, size, mtime, tmp_dir):
+    started = time.perf_counter()
+    record = {"source": source, "size": size, "mtime": mtime}
+    wav = None
+    try:
+        wav = _as_wav(src, tmp_dir)
+        record["duration"] = _wav_duration(wav)
+        text = transcriber.transcribe_with_gemini(wav)
+        if not text:
+            record.update(status="error", error='no transcript')
+        elif transcriber.is_error(text):
+            record.update(status="error", error=text[len(transcriber.ERROR_PREFIX):].strip())
+        else:
+            record.update(status="ok", transcript=text)
+    except Exception as e:
+        record.update(status="error", error=str(e))
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record, wav
+
+
+def _add_to_history(src, wav, record, tmp_dir):
+    """Register a transcribed file as a history entry (audio copied, deduplicated)."""
+    mtime = datetime.fromtimestamp(record['mtime'])
+    key = hashlib.sha1(f"{os.path.abspath(src)}|{record['size']}".encode('utf-8')).hexdigest()[:10]
+    filename = f"batch_{mtime.strftime('%Y%m%d_%H%M%S')}_{key}.wav"
+    if history_store.get_entry(filename) is not None:
+        return
+    staged = os.path.join(tmp_dir, filename)
+    if wav == src:
+        shutil.copyfile(src, staged)
+    else:
+        os.replace(wav, staged)
+    history_archive.store_audio_file(staged, {
+        "filename": filename,
+        "timestamp": mtime.isoformat(),
+        "transcript": record['transcript'],
+        "source": record['source'],
+    })
+
+
+# ---------------- Batch -----------------
+
+def transcribe_directory(root, output, workers=DEFAULT_WORKERS, recursive=True, history=False, job=None):
+    """Transcribe every audio file under root, appending results to output (JSONL).
+
+    Args:
+        root: directory to walk
+        output: JSONL file; also read on start to skip files already transcribed
+        workers: concurrent transcription requests
+        recursive: also walk subdirectories
+        history: also add successful transcriptions to the history store
+        job: optional jobs.Job for progress and cancellation
+
+    Returns:
+        dict with keys: found, skipped, transcribed, failed, seconds,
+        files_per_minute, audio_minutes
+    """
+    root = os.path.abspath(root)
+    if not os.path.isdir(root):
+        raise ValueError(f"Not a directory: {root}")
+    workers = max(1, int(workers or DEFAULT_WORKERS))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    done = read_manifest(output)
+
+    todo = []
+    stats = {"found": 0, "skipped": 0, "transcribed": 0, "failed": 0}
+    for src in find_files(root, recursive):
+        stats["found"] += 1
+        source = os.path.relpath(src, root).replace(os.sep, '/')
+        try:
+            size, mtime = _file_key(src)
+        except OSError as e:
+            log.warning("Cannot read %s: %s", src, e)
+            stats["failed"] += 1
+            continue
+        previous = done.get(source)
+        if previous and previous[0] == size and previous[1] == mtime:
+            stats["skipped"] += 1
+        else:
+            todo.append((src, source, size, mtime))
+    log.info("%d files found, %d already transcribed, %d to do", stats["found"], stats["skipped"], len(todo))
+    if job:
+        job.update(done=0, total=len(todo), message='Transcribing')
+    if history:
+        history_store.load()
+        tmp_dir = tempfile.mkdtemp(dir=history_store.HISTORY_DIR, prefix='.batch_')
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix='batch_')
+
+    audio_seconds = 0.0
+    started = time.perf_counter()
+    queued = iter(todo)
+    pending = set()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-transcribe')
+    try:
+        with open(output, 'a', encoding='utf-8') as out:
+            while True:
+                # Keep the pool busy without queueing the whole directory up front
+                while len(pending) < workers * 2:
+                    item = next(queued, None)
+                    if item is None:
+                        break
+                    pending.add(pool.submit(_transcribe_one, *item, tmp_dir))
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record, wav = future.result()
+                    src = os.path.join(root, record["source"])
+                    if record["status"] == 'ok':
+                        stats["transcribed"] += 1
+                        audio_seconds += record.get("duration") or 0.0
+                        if history:
+                            try:
+                                _add_to_history(src, wav, record, tmp_dir)
+                            except Exception as e:
+                                log.error("Could not add %s to history: %s", record["source"], e)
+                    else:
+                        stats["failed"] += 1
+                        log.warning("Failed %s: %s", record["source"], record.get("error"))
+                    if wav and wav != src and os.path.exists(wav):
+                        os.remove(wav)
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    out.flush()  # every finished line survives a crash
+                    completed = stats["transcribed"] + stats["failed"]
+                    log.info("[%d/%d] %s %s (%.1f s)", completed, len(todo), record["status"],
+                             record["source"], record["seconds"])
+                if job:
+                    job.update(done=stats["transcribed"] + stats["failed"])
+                    job.check()
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if history:
+            history_store.flush()
+
+    elapsed = time.perf_counter() - started
+    processed = stats["transcribed"] + stats["failed"]
+    stats.update(
+        seconds=round(elapsed, 2),
+        files_per_minute=round(processed * 60.0 / elapsed, 1) if elapsed > 0 else 0.0,
+        audio_minutes=round(audio_seconds / 60.0, 2),
+    )
+    log.info("Batch transcription of %s: %s", root, stats)
+    return stats
+
+
+# ---------------- CLI -----------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.batch', description='Transcribe a directory of recordings.')
+    parser.add_argument('folder', help='directory with audio files')
+    parser.add_argument('--output', '-o', help='JSONL output and resume manifest (default: <folder>/transcripts.jsonl)')
+    parser.add_argument('--workers', '-j', type=int, default=DEFAULT_WORKERS, help='concurrent transcription requests')
+    parser.add_argument('--no-recursive', action='store_true', help='do not walk subdirectories')
+    parser.add_argument('--history', action='store_true', help='also add transcriptions to history')
+    parser.add_argument('--history-dir', help='history folder for --history (default: ./history)')
+    parser.add_argument('--settings', help='settings.json with the API key, model and prompt (default: ./settings.json)')
+    args = parser.parse_args(argv)
+    logs.setup()
+
+    if args.settings:
+        transcriber.SETTINGS_FILE = os.path.abspath(args.settings)
+    if not transcriber._load_api_key():
+        print(f"No openrouter_api_key in {transcriber.SETTINGS_FILE}", file=sys.stderr)
+        return 1
+    if args.history_dir:
+        history_store.set_history_dir(os.path.abspath(args.history_dir))
+    output = args.output or os.path.join(args.folder, 'transcripts.jsonl')
+
+    job = jobs.Job('batch')
+    try:
+        stats = transcribe_directory(args.folder, output, args.workers, not args.no_recursive, args.history, job)
+    except KeyboardInterrupt:
+        print('\nBatch interrupted; run again to resume', file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"Batch failed: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(stats))
+    return 0 if stats["failed"] == 0 else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
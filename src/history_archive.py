@@ -0,0 +1,366 @@
+"""Audio storage for history: deduplicated blobs and a cold storage tier.
+
+New recordings are content-hashed and stored once as audio_<hash>.wav; entries
+with the same (or near-identical) audio share the file, which is deleted only
+when the last entry referencing it goes away.
+
+A background archiver re-encodes recordings older than a configurable number of
+days from 16-bit PCM WAV to FLAC (or Opus) and enforces a total audio quota by
+evicting the audio of the oldest entries. Transcripts are always kept.
+Evicted entries carry "audio": None and "audio_evicted": True.
+
+Archived audio is decoded on demand into a small LRU directory of WAV files,
+so playback and re-transcription keep working on plain WAV paths.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import wave
+from datetime import datetime, timedelta
+
+from . import history_store
+from .history_store import audio_name  # re-exported
+
+log = logging.getLogger(__name__)
+
+# format name -> (soundfile container, subtype, extension)
+ARCHIVE_FORMATS = {
+    'flac': ('FLAC', 'PCM_16', '.flac'),
+    'opus': ('OGG', 'OPUS', '.opus'),
+}
+DECODED_DIRNAME = '.decoded'
+DECODED_CACHE_FILES = 8  # decoded WAVs kept around for replay/re-transcription
+ARCHIVE_INTERVAL = 3600  # seconds between archiver passes
+
+_config = {
+    'after_days': 30,     # re-encode audio older than this; None disables archiving
+    'format': 'flac',
+    'quota_mb': None,     # total audio budget; None/0 means unlimited
+}
+# Held while an audio file is created, swapped or deleted, so reference
+# checks and file operations happen atomically
+audio_lock = threading.RLock()
+EDGE_SILENCE = 32  # |sample| below this at either end is ignored when hashing
+_wake = threading.Event()
+_thread = None
+_sf = False  # soundfile module once imported; None if unavailable
+
+
+def _soundfile():
+    """soundfile, imported on first use (it loads numpy and libsndfile); None if missing."""
+    global _sf
+    if _sf is False:
+        try:
+            import soundfile
+            _sf = soundfile
+        except Exception:
+            _sf = None
+    return _sf
+
+
+def configure(after_days=None, fmt=None, quota_mb=None):
+    """Update archiver settings (values left as None keep their current setting)."""
+    if after_days is not None:
+        _config['after_days'] = float(after_days) if float(after_days) > 0 else None
+    if fmt is not None:
+        if fmt not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format: {fmt}")
+        _config['format'] = fmt
+    if quota_mb is not None:
+        _config['quota_mb'] = float(quota_mb) if float(quota_mb) > 0 else None
+    _wake.set()
+
+
+def audio_path(entry):
+    name = audio_name(entry)
+    return os.path.join(history_store.HISTORY_DIR, name) if name else None
+
+
+def _decoded_dir():
+    return os.path.join(history_store.HISTORY_DIR, DECODED_DIRNAME)
+
+
+def _decoded_path(name):
+    return os.path.join(_decoded_dir(), os.path.splitext(name)[0] + '.wav')
+
+
+def playable_path(filename):
+    """Return a WAV path for a history entry's audio, decoding archived audio if needed.
+
+    Returns None when the entry is unknown, its audio was evicted or is missing.
+    """
+    entry = history_store.get_entry(filename)
+    if entry is None:
+        return None
+    with audio_lock:
+        # Re-read under the lock: the archiver may have just swapped the file
+        entry = history_store.get_entry(filename) or entry
+        path = audio_path(entry)
+        if path is None or not os.path.exists(path):
+            return None
+        if path.lower().endswith('.wav'):
+            return path
+        return _decode_cached(path)
+
+
+def _decode_cached(path):
+    sf = _soundfile()
+    if sf is None:
+        log.warning('soundfile not available; cannot decode archived audio')
+        return None
+    cached = _decoded_path(os.path.basename(path))
+    if os.path.exists(cached):
+        os.utime(cached)  # mark as recently used
+        return cached
+    os.makedirs(_decoded_dir(), exist_ok=True)
+    data, rate = sf.read(path, dtype='int16')
+    tmp = cached + '.tmp'
+    sf.write(tmp, data, rate, format='WAV', subtype='PCM_16')
+    os.replace(tmp, cached)
+    _trim_decoded_cache()
+    return cached
+
+
+def _trim_decoded_cache():
+    try:
+        files = [os.path.join(_decoded_dir(), n) for n in os.listdir(_decoded_dir()) if n.endswith('.wav')]
+    except OSError:
+        return
+    files.sort(key=lambda p: os.path.getmtime(p), reverse=True)
+    for stale in files[DECODED_CACHE_FILES:]:
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+
+
+def discard_decoded(name):
+    """Drop a decoded copy (called when the underlying audio is deleted)."""
+    if not name:
+        return
+    try:
+        os.remove(_decoded_path(name))
+    except OSError:
+        pass
+
+
+# ---------------- Deduplicated storage -----------------
+
+def content_hash(path):
+    """SHA-256 of a WAV's PCM content, ignoring near-silent samples at either end.
+
+    Retried or re-imported takes of the same audio that differ only in leading or
+    trailing silence therefore hash the same.
+    """
+    import numpy as np
+    with wave.open(path, 'rb') as wf:
+        params = (wf.getnchannels(), wf.getsampwidth(), wf.getframerate())
+        frames = wf.readframes(wf.getnframes())
+    digest = hashlib.sha256(repr(params).encode('ascii'))
+    if params[1] == 2:
+        samples = np.frombuffer(frames, dtype=np.int16)
+        loud = np.flatnonzero(np.abs(samples.astype(np.int32)) >= EDGE_SILENCE)
+        if len(loud):
+            samples = samples[loud[0]:loud[-1] + 1]
+        else:
+            samples = samples[:0]
+        digest.update(samples.tobytes())
+    else:
+        digest.update(frames)
+    return digest.hexdigest()
+
+
+def store_audio_file(src_path, entry):
+    """Move a new WAV into history storage and register entry as using it.
+
+    If identical content is already stored, the new file is discarded and the
+    entry shares the existing one.
+
+    Args:
+        src_path: WAV file to take ownership of (moved or deleted)
+        entry: new history entry dict; "audio" and "audio_hash" are filled in
+
+    Returns:
+        the change from history_store.add_entry
+    """
+    return store_audio_files([(src_path, entry, None)])[0]
+
+
+def store_audio_files(items):
+    """Batch version of store_audio_file, registering all entries in one store call.
+
+    Args:
+        items: iterable of (src_path, entry, digest); digest may be None to hash here
+
+    Returns:
+        list of changes from history_store.add_entries
+    """
+    prepared = [(src_path, entry, digest or content_hash(src_path)) for src_path, entry, digest in items]
+    entries = []
+    with audio_lock:
+        batch_names = {}  # hash -> name, for duplicates within this batch
+        for src_path, entry, digest in prepared:
+            entry = dict(entry, audio_hash=digest)
+            existing = batch_names.get(digest) or history_store.find_audio_by_hash(digest)
+            if existing and os.path.exists(os.path.join(history_store.HISTORY_DIR, existing)):
+                os.remove(src_path)
+                entry['audio'] = existing
+                log.debug("Duplicate audio, sharing %s", existing)
+            else:
+                name = f"audio_{digest[:16]}.wav"
+                shutil.move(src_path, os.path.join(history_store.HISTORY_DIR, name))
+                entry['audio'] = name
+            batch_names[digest] = entry['audio']
+            entries.append(entry)
+        return history_store.add_entries(entries)
+
+
+def delete_entry(filename):
+    """Remove a history entry, deleting its audio once no other entry uses it.
+
+    Returns:
+        tombstone change from history_store.remove_entry
+    """
+    with audio_lock:
+        entry = history_store.get_entry(filename)
+        change = history_store.remove_entry(filename)
+        name = audio_name(entry) if entry else None
+        if name and history_store.audio_refcount(name) == 0:
+            path = os.path.join(history_store.HISTORY_DIR, name)
+            try:
+                os.remove(path)
+                log.debug("Deleted history file: %s", path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.error("Error deleting file: %s", e)
+            discard_decoded(name)
+    return change
+
+
+# ---------------- Archiver -----------------
+
+def start_archiver():
+    """Start the background archiver thread (idempotent)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _thread = threading.Thread(target=_archiver_loop, name='history-archiver', daemon=True)
+    _thread.start()
+
+
+def _archiver_loop():
+    # Let startup finish before touching the disk
+    _wake.wait(30)
+    while True:
+        _wake.clear()
+        try:
+            run_archive_pass()
+        except Exception as e:
+            log.error("History archiver error: %s", e)
+        _wake.wait(ARCHIVE_INTERVAL)
+
+
+def run_archive_pass():
+    """Archive old recordings, then enforce the quota.
+
+    Returns:
+        dict with keys: archived, evicted, bytes_freed
+    """
+    archived = 0
+    after_days = _config['after_days']
+    sf = _soundfile() if after_days else None
+    entries = history_store.get_entries()  # newest first
+    if after_days and sf is not None:
+        cutoff = (datetime.now() - timedelta(days=after_days)).isoformat()
+        # An audio file is old once its newest user is past the cutoff
+        newest = {}
+        for entry in entries:
+            name = audio_name(entry)
+            if name and name not in newest:
+                newest[name] = entry.get('timestamp', '')
+        for name, timestamp in newest.items():
+            if name.lower().endswith('.wav') and timestamp < cutoff:
+                if _archive_audio(name):
+                    archived += 1
+    elif after_days and sf is None:
+        log.warning('soundfile not available; history audio archiving disabled')
+    evicted, freed = _enforce_quota()
+    if archived or evicted:
+        log.info("History archiver: archived %s, evicted %s (%.1f MB freed)", archived, evicted, freed / (1024 * 1024))
+    return {"archived": archived, "evicted": evicted, "bytes_freed": freed}
+
+
+def _archive_audio(name):
+    """Re-encode one WAV and repoint the entries using it. Returns True on success."""
+    sf = _soundfile()
+    container, subtype, ext = ARCHIVE_FORMATS[_config['format']]
+    src = os.path.join(history_store.HISTORY_DIR, name)
+    dest_name = os.path.splitext(name)[0] + ext
+    dest = os.path.join(history_store.HISTORY_DIR, dest_name)
+    try:
+        data, rate = sf.read(src, dtype='int16')
+        if container == 'OGG' and rate not in (8000, 12000, 16000, 24000, 48000):
+            raise ValueError(f"Opus does not support {rate} Hz")
+        sf.write(dest + '.tmp', data, rate, format=container, subtype=subtype)
+        os.replace(dest + '.tmp', dest)
+    except Exception as e:
+        log.error("Error archiving %s: %s", name, e)
+        try:
+            os.remove(dest + '.tmp')
+        except OSError:
+            pass
+        return False
+    with audio_lock:
+        try:
+            os.remove(src)
+        except OSError as e:
+            # Probably being played right now; retry on a later pass
+            log.warning("Could not replace %s with archived copy: %s", name, e)
+            os.remove(dest)
+            return False
+        # Re-read users under the lock: new entries may share this audio by now
+        for filename in history_store.audio_users(name):
+            history_store.update_entry(filename, audio=dest_name)
+    return True
+
+
+def _enforce_quota():
+    quota_mb = _config['quota_mb']
+    if not quota_mb:
+        return 0, 0
+    budget = int(quota_mb * 1024 * 1024)
+    entries = history_store.get_entries()
+    sizes = {}
+    for name in {audio_name(e) for e in entries} - {None}:
+        try:
+            sizes[name] = os.path.getsize(os.path.join(history_store.HISTORY_DIR, name))
+        except OSError:
+            sizes[name] = 0
+    total = sum(sizes.values())
+    evicted = 0
+    freed = 0
+    # Oldest entries first; several entries may share one audio file
+    for entry in sorted(entries, key=lambda e: e.get('timestamp', '')):
+        if total <= budget:
+            break
+        name = audio_name(entry)
+        if not name or name not in sizes:
+            continue
+        with audio_lock:
+            try:
+                os.remove(os.path.join(history_store.HISTORY_DIR, name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log.warning("Could not evict %s: %s", name, e)
+                continue
+            discard_decoded(name)
+            for filename in history_store.audio_users(name):
+                history_store.update_entry(filename, audio=None, audio_evicted=True)
+                evicted += 1
+        total -= sizes[name]
+        freed += sizes.pop(name)
+    return evicted, freed
@@ -0,0 +1,327 @@
+"""Streaming bulk export of history to JSONL, CSV, SRT or a ZIP with audio.
+
+Entries are pulled one at a time from the history store and written straight
+to the output file, so memory use stays flat no matter how large the history
+is. For ZIP exports the audio is (re-)encoded on a small thread pool with a
+bounded number of files in flight; finished files are streamed into the
+archive in history order and the transcript manifest is added at the end.
+
+Exports run as background jobs (see jobs.py) from the UI, or from the command
+line:
+
+    python -m src.history_export exports/2026.zip --since 2026-01-01 --audio flac
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import wave
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from . import history_archive, history_index, history_store, jobs, logs
+
+try:
+    import soundfile as sf
+except Exception:  # pragma: no cover
+    sf = None
+
+log = logging.getLogger(__name__)
+
+FORMATS = ('jsonl', 'csv', 'srt', 'zip')
+AUDIO_FORMATS = ('original',) + tuple(history_archive.ARCHIVE_FORMATS)
+CSV_COLUMNS = ('filename', 'timestamp', 'duration', 'transcript')
+BATCH_SIZE = 256          # entries per metadata lookup
+DEFAULT_CUE_SECONDS = 3.0  # SRT cue length when a recording's duration is unknown
+
+
+# ---------------- Entry stream -----------------
+
+def _wav_duration(path):
+    try:
+        with wave.open(path, 'rb') as wf:
+            return wf.getnframes() / float(wf.getframerate())
+    except Exception:
+        return None
+
+
+def _batched_records(entries):
+    durations = history_index.get_media_summaries(e['filename'] for e in entries)
+    for entry in entries:
+        row = durations.get(entry['filename'])
+        duration = row['duration'] if row else None
+        if duration is None:
+            path = history_archive.audio_path(entry)
+            if path and path.lower().endswith('.wav'):
+                duration = _wav_duration(path)
+        record = {
+            "filename": entry.get('filename'),
+            "timestamp": entry.get('timestamp', ''),
+            "duration": round(duration, 3) if duration is not None else None,
+            "transcript": entry.get('transcript', ''),
+        }
+        yield entry, record
+
+
+def iter_records(since=None, until=None, job=None):
+    """Yield (entry, record) pairs oldest first, optionally limited to a time range.
+
+    Args:
+        since: ISO date/time; entries before it are skipped
+        until: ISO date/time; entries at or after it are skipped
+        job: optional jobs.Job for progress (entries scanned) and cancellation
+    """
+    scanned = 0
+    batch = []
+    for entry in history_store.iter_entries():
+        scanned += 1
+        timestamp = entry.get('timestamp', '')
+        if (since and timestamp < since) or (until and timestamp >= until):
+            continue
+        batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            if job:
+                job.check()
+                job.update(done=scanned)
+            yield from _batched_records(batch)
+            batch = []
+    if job:
+        job.check()
+    yield from _batched_records(batch)
+    if job:
+        job.update(done=scanned)
+
+
+# ---------------- Writers -----------------
+
+def _write_jsonl(f, records):
+    count = 0
+    for _entry, record in records:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+def _write_csv(f, records):
+    writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    count = 0
+    for _entry, record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def _srt_time(seconds):
+    ms = int(round(seconds * 1000))
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{ms:03d}"
+
+
+def _write_srt(f, records):
+    """One cue per recording, laid end to end as if the recordings were concatenated."""
+    count = 0
+    offset = 0.0
+    for _entry, record in records:
+        text = (record['transcript'] or '').strip()
+        duration = record['duration'] or DEFAULT_CUE_SECONDS
+        if text:
+            count += 1
+            f.write(f"{count}\n{_srt_time(offset)} --> {_srt_time(offset + duration)}\n")
+            f.write(f"[{record['timestamp']}] {text}\n\n")
+        offset += duration
+    return count
+
+
+def _encode_audio(src, dest, audio_format):
+    """Copy or re-encode one audio file (runs on the encoder pool)."""
+    if audio_format == 'original':
+        shutil.copyfile(src, dest)
+        return dest
+    container, subtype, _ext = history_archive.ARCHIVE_FORMATS[audio_format]
+    data, rate = sf.read(src, dtype='int16')
+    sf.write(dest, data, rate, format=container, subtype=subtype)
+    return dest
+
+
+def _write_zip(path, records, audio_format, workers, job):
+    """Stream audio into a ZIP with a bounded encoder pipeline, then add the manifest.
+
+    Recordings sharing one deduplicated audio file reference the same member.
+    """
+    audio_members = {}  # stored audio name -> member name (None if it failed)
+    count = 0
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(path) or '.') as tmp_dir, \
+            zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED, allowZip64=True) as zf, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export-audio') as pool:
+        manifest_path = os.path.join(tmp_dir, 'transcripts.jsonl')
+        pending = deque()  # (record, audio name, future) in history order
+
+        def drain(keep):
+            while len(pending) > keep:
+                record, name, future = pending.popleft()
+                if future is not None:
+                    member = audio_members[name]
+                    try:
+                        encoded = future.result()
+                        zf.write(encoded, member)
+                        os.remove(encoded)
+                    except Exception as e:
+                        log.warning("Could not export audio %s: %s", name, e)
+                        audio_members[name] = None
+                record["audio"] = audio_members.get(name) if name else None
+                manifest.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        try:
+            with open(manifest_path, 'w', encoding='utf-8') as manifest:
+                for entry, record in records:
+                    name = history_archive.audio_name(entry)
+                    future = None
+                    src = history_archive.audio_path(entry)
+                    if name and name not in audio_members and src and os.path.exists(src):
+                        base, ext = os.path.splitext(name)
+                        if audio_format != 'original':
+                            ext = history_archive.ARCHIVE_FORMATS[audio_format][2]
+                        audio_members[name] = f"audio/{base}{ext}"
+                        future = pool.submit(_encode_audio, src, os.path.join(tmp_dir, base + ext), audio_format)
+                    pending.append((record, name, future))
+                    count += 1
+                    drain(workers * 2)
+                drain(0)
+        except BaseException:
+            for _record, _name, future in pending:
+                if future is not None:
+                    future.cancel()
+            raise
+        if job:
+            job.check()
+        zf.write(manifest_path, 'transcripts.jsonl', compress_type=zipfile.ZIP_DEFLATED)
+    return count
+
+
+# ---------------- Export -----------------
+
+def export_history(dest_path, fmt='jsonl', since=None, until=None, audio_format='flac', workers=None, job=None):
+    """Export history entries to a file.
+
+    The output is written to dest_path + '.part' and moved into place only when
+    complete, so a cancelled or failed export never leaves a truncated file.
+
+    Args:
+        dest_path: output file
+        fmt: one of FORMATS
+        since, until: optional ISO timestamps bounding the exported entries
+        audio_format: ZIP only; 'original' copies stored audio, 'flac'/'opus' re-encode
+        workers: ZIP only; number of audio encoder threads
+        job: optional jobs.Job for progress and cancellation
+
+    Returns:
+        dict with keys: path, format, entries
+    """
+    fmt = (fmt or 'jsonl').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if fmt == 'zip':
+        if audio_format not in AUDIO_FORMATS:
+            raise ValueError(f"Unsupported audio format: {audio_format}")
+        if audio_format != 'original' and sf is None:
+            raise RuntimeError('soundfile is required to re-encode audio; use audio_format="original"')
+    workers = max(1, int(workers or min(4, os.cpu_count() or 1)))
+    if job:
+        job.update(done=0, total=history_store.count(), message=f"Exporting {fmt.upper()}")
+
+    dest_dir = os.path.dirname(os.path.abspath(dest_path))
+    os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = dest_path + '.part'
+    records = iter_records(since, until, job)
+    try:
+        if fmt == 'zip':
+            count = _write_zip(tmp_path, records, audio_format, workers, job)
+        else:
+            # newline='' lets the csv module write its own line endings
+            with open(tmp_path, 'w', encoding='utf-8', newline='' if fmt == 'csv' else None) as f:
+                writer = {'jsonl': _write_jsonl, 'csv': _write_csv, 'srt': _write_srt}[fmt]
+                count = writer(f, records)
+        if job:
+            job.check()
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if job:
+        job.update(message=f"Exported {count} entries")
+    log.info("Exported %s history entries to %s", count, dest_path)
+    return {"path": os.path.abspath(dest_path), "format": fmt, "entries": count}
+
+
+def default_export_path(fmt):
+    """exports/history_<date>_<time>.<fmt> next to the history folder."""
+    export_dir = os.path.join(os.path.dirname(history_store.HISTORY_DIR), 'exports')
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(export_dir, f"history_{stamp}.{fmt}")
+
+
+def start_export(fmt='jsonl', dest_path=None, **options):
+    """Run export_history as a background job.
+
+    Returns:
+        the job's status dict (progress and the result reach jobs listeners)
+    """
+    fmt = (fmt or 'jsonl').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    dest_path = dest_path or default_export_path(fmt)
+    job = jobs.submit('export', _export_job, dest_path, fmt, **options)
+    return job.to_dict()
+
+
+def _export_job(job, dest_path, fmt, **options):
+    return export_history(dest_path, fmt, job=job, **options)
+
+
+# ---------------- CLI -----------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.history_export', description='Export transcription history.')
+    parser.add_argument('output', help='output file; the format is taken from its extension unless --format is given')
+    parser.add_argument('--format', choices=FORMATS, help='output format')
+    parser.add_argument('--since', help='only entries at or after this ISO date/time')
+    parser.add_argument('--until', help='only entries before this ISO date/time')
+    parser.add_argument('--audio', choices=AUDIO_FORMATS, default='flac', help='audio encoding for ZIP exports')
+    parser.add_argument('--workers', type=int, help='audio encoder threads for ZIP exports')
+    parser.add_argument('--history-dir', help='history folder to export (default: ./history)')
+    args = parser.parse_args(argv)
+    logs.setup()
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip('.').lower()
+    if fmt not in FORMATS:
+        parser.error(f"cannot infer format from {args.output!r}; use --format")
+    if args.history_dir:
+        history_store.set_history_dir(os.path.abspath(args.history_dir))
+
+    job = jobs.Job('export')
+    try:
+        result = export_history(args.output, fmt, args.since, args.until, args.audio, args.workers, job)
+    except KeyboardInterrupt:
+        print('\nExport cancelled', file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
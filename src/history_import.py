@@ -0,0 +1,392 @@
+"""Parallel bulk import of external audio files (WAV, MP3, M4A, ...) into history.
+
+The importer walks a directory, decodes every supported file and resamples it
+to 16 kHz mono 16-bit WAV in a process pool, then registers the results with
+the history store in batches (deduplicated like normal recordings). Imported
+entries keep the source file's modification time as their timestamp, so they
+slot into the history in chronological order.
+
+Entry names are derived from the source path and size, so an interrupted
+import can simply be run again: files that are already in history are
+skipped, and with transcription enabled the ones still lacking a transcript
+are queued again.
+
+WAV is read natively; other formats are decoded with soundfile when its
+libsndfile supports them (FLAC, OGG, and MP3 on recent versions) and with
+ffmpeg otherwise (M4A/AAC, ...).
+
+    python -m src.history_import ~/VoiceNotes --transcribe
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import wave
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import numpy as np
+
+from . import history_archive, history_meta, history_store, jobs, logs
+
+try:
+    import soundfile as sf
+except Exception:  # pragma: no cover
+    sf = None
+
+log = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.aac', '.flac', '.ogg', '.opus', '.webm')
+TARGET_RATE = 16000       # same format as live recordings (see recorder.RATE)
+BATCH_SIZE = 64           # decoded files registered per history store call
+STAGING_DIRNAME = '.import'
+
+
+# ---------------- Decoding (runs in worker processes) -----------------
+
+def _decode_wav(path):
+    with wave.open(path, 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError('only 16-bit PCM WAV is read natively')
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    samples = samples.reshape(-1, channels).mean(axis=1) / 32768.0
+    return samples, rate
+
+
+def _decode_ffmpeg(path):
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError('ffmpeg is required to decode this file')
+    result = subprocess.run(
+        [ffmpeg, '-v', 'error', '-nostdin', '-i', path, '-ac', '1', '-ar', str(TARGET_RATE), '-f', 's16le', '-'],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode('utf-8', 'replace').strip() or 'ffmpeg failed')
+    return np.frombuffer(result.stdout, dtype=np.int16) / 32768.0, TARGET_RATE
+
+
+def decode_audio(path):
+    """Decode an audio file to mono float samples in [-1, 1].
+
+    Returns:
+        (samples, sample_rate)
+    """
+    if path.lower().endswith('.wav'):
+        try:
+            return _decode_wav(path)
+        except Exception:
+            pass  # float/24-bit WAV: let soundfile or ffmpeg handle it
+    if sf is not None:
+        try:
+            data, rate = sf.read(path, dtype='float32', always_2d=True)
+            return data.mean(axis=1), rate
+        except Exception:
+            pass  # format not supported by this libsndfile
+    return _decode_ffmpeg(path)
+
+
+def resample(samples, rate, target=TARGET_RATE):
+    """Linear-interpolation resampler with a box pre-filter when downsampling.
+
+    Plenty for speech headed to a transcription model; avoids a scipy dependency.
+    """
+    if rate == target or len(samples) == 0:
+        return samples
+    factor = int(rate // target)
+    if factor > 1:
+        samples = np.convolve(samples, np.ones(factor) / factor, mode='same')
+    n = max(1, int(round(len(samples) * target / float(rate))))
+    positions = np.linspace(0, len(samples) - 1, n)
+    return np.interp(positions, np.arange(len(samples)), samples)
+
+
+def _prepare(args):
+    """Decode, resample and hash one source file into a staged WAV."""
+    src, staged = args
+    try:
+        samples, rate = decode_audio(src)
+        samples = resample(samples, rate)
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+        with wave.open(staged, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(TARGET_RATE)
+            wf.writeframes(pcm.tobytes())
+        return src, staged, history_archive.content_hash(staged), None
+    except Exception as e:
+        try:
+            os.remove(staged)
+        except OSError:
+            pass
+        return src, None, None, str(e)
+
+
+# ---------------- Import -----------------
+
+def find_audio_files(root, recursive=True):
+    """Supported audio files under root, sorted, skipping the history folder itself."""
+    root = os.path.abspath(root)
+    history_dir = os.path.abspath(history_store.HISTORY_DIR)
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames
+                             if recursive and os.path.join(dirpath, d) != history_dir and not d.startswith('.'))
+        for name in sorted(filenames):
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                found.append(os.path.join(dirpath, name))
+    return found
+
+
+def entry_for(src, root):
+    """History entry for a source file; the filename is stable across runs."""
+    stat = os.stat(src)
+    key = hashlib.sha1(f"{os.path.abspath(src)}|{stat.st_size}".encode('utf-8')).hexdigest()[:10]
+    mtime = datetime.fromtimestamp(stat.st_mtime)
+    return {
+        "filename": f"import_{mtime.strftime('%Y%m%d_%H%M%S')}_{key}.wav",
+        "timestamp": mtime.isoformat(),
+        "transcript": "",
+        "source": os.path.relpath(src, root),
+    }
+
+
+def _transcribe(filename):
+    """Transcribe an imported entry. Returns False on failure, leaving the
+    transcript empty so the next run of the import retries it."""
+    from .transcriber import ERROR_PREFIX, is_error, transcribe_with_gemini
+    path = history_archive.playable_path(filename)
+    transcript = transcribe_with_gemini(path) if path else None
+    if not transcript:
+        return False
+    if is_error(transcript):
+        log.warning("Transcription of %s failed: %s", filename, transcript[len(ERROR_PREFIX):].strip())
+        return False
+    history_store.update_entry(filename, transcript=transcript)
+    return True
+
+
+class _Transcriber:
+    """Bounded transcription queue: at most `workers` requests run at once and
+    submitting blocks while 2 * workers are outstanding."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='import-transcribe')
+        self.pending = set()
+        self.transcribed = 0
+        self.failed = 0
+
+    def submit(self, filename):
+        while len(self.pending) >= self.workers * 2:
+            self._collect(FIRST_COMPLETED)
+        self.pending.add(self.pool.submit(_transcribe, filename))
+
+    def _collect(self, return_when):
+        done, self.pending = wait(self.pending, return_when=return_when)
+        for future in done:
+            if future.cancelled():
+                continue
+            try:
+                ok = future.result()
+            except Exception as e:
+                log.error("Import transcription error: %s", e)
+                ok = False
+            if ok:
+                self.transcribed += 1
+            else:
+                self.failed += 1
+
+    def finish(self, cancel=False):
+        if cancel:
+            for future in self.pending:
+                future.cancel()
+        if self.pending:
+            self._collect(ALL_COMPLETED)
+        self.pool.shutdown()
+
+
+def import_directory(root, recursive=True, transcribe=False, workers=None, transcribe_workers=2, job=None):
+    """Import every supported audio file under root into history.
+
+    Args:
+        root: directory to walk
+        recursive: also walk subdirectories
+        transcribe: queue imported entries without a transcript for transcription
+        workers: decoder processes (default: CPU count - 1)
+        transcribe_workers: concurrent transcription requests
+        job: optional jobs.Job for progress and cancellation
+
+    Returns:
+        dict with keys: found, imported, skipped, failed, transcribed, transcribe_failed
+    """
+    root = os.path.abspath(root)
+    if not os.path.isdir(root):
+        raise ValueError(f"Not a directory: {root}")
+    history_store.load()
+    staging_root = os.path.join(history_store.HISTORY_DIR, STAGING_DIRNAME)
+    os.makedirs(staging_root, exist_ok=True)
+    # Same filesystem as history, so registering a decoded file is a rename
+    staging = tempfile.mkdtemp(dir=staging_root)
+
+    sources = find_audio_files(root, recursive)
+    stats = {"found": len(sources), "imported": 0, "skipped": 0, "failed": 0,
+             "transcribed": 0, "transcribe_failed": 0}
+    if job:
+        job.update(done=0, total=len(sources), message='Importing audio')
+    transcriber = _Transcriber(max(1, int(transcribe_workers or 1))) if transcribe else None
+
+    # Resume: skip files registered by an earlier run (re-queueing missing transcripts)
+    todo = []
+    for src in sources:
+        try:
+            entry = entry_for(src, root)
+        except OSError as e:
+            log.warning("Cannot read %s: %s", src, e)
+            stats["failed"] += 1
+            continue
+        existing = history_store.get_entry(entry["filename"])
+        if existing is None:
+            todo.append((src, entry))
+            continue
+        stats["skipped"] += 1
+        if transcriber and not existing.get('transcript'):
+            transcriber.submit(entry["filename"])
+
+    entries = {src: entry for src, entry in todo}
+    batch = []
+    done_count = stats["skipped"] + stats["failed"]
+
+    def register():
+        if not batch:
+            return
+        try:
+            changes = history_archive.store_audio_files(batch)
+        except Exception as e:
+            log.error("Error registering imported audio: %s", e)
+            stats["failed"] += len(batch)
+            for staged, _entry, _digest in batch:
+                try:
+                    os.remove(staged)
+                except OSError:
+                    pass
+            batch.clear()
+            return
+        for change in changes:
+            stats["imported"] += 1
+            history_meta.enqueue(change["filename"])
+            if transcriber and not (job and job.cancelled):
+                transcriber.submit(change["filename"])
+        batch.clear()
+
+    cancelled = False
+    workers = max(1, int(workers or max(1, (os.cpu_count() or 2) - 1)))
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        queued = iter(todo)
+        pending = set()
+        while True:
+            # Keep a bounded number of files in flight
+            while len(pending) < workers * 4:
+                item = next(queued, None)
+                if item is None:
+                    break
+                src, entry = item
+                staged = os.path.join(staging, entry["filename"])
+                pending.add(pool.submit(_prepare, (src, staged)))
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                src, staged, digest, error = future.result()
+                done_count += 1
+                if error:
+                    log.warning("Could not import %s: %s", src, error)
+                    stats["failed"] += 1
+                else:
+                    batch.append((staged, entries[src], digest))
+            if len(batch) >= BATCH_SIZE:
+                register()
+            if job:
+                job.update(done=done_count)
+                if job.cancelled:
+                    cancelled = True
+                    for future in pending:
+                        future.cancel()
+                    break
+    finally:
+        pool.shutdown(wait=True)
+        # Anything already decoded is kept, so a resumed import does less work
+        register()
+        if transcriber:
+            if job:
+                job.update(message='Waiting for transcriptions')
+            transcriber.finish(cancel=cancelled)
+            stats["transcribed"] = transcriber.transcribed
+            stats["transcribe_failed"] = transcriber.failed
+        shutil.rmtree(staging, ignore_errors=True)  # cancelled or failed leftovers
+
+    if cancelled:
+        job.check()
+    if job:
+        job.update(message=f"Imported {stats['imported']} files")
+    log.info("History import from %s: %s", root, stats)
+    return stats
+
+
+def start_import(root, **options):
+    """Run import_directory as a background job.
+
+    Returns:
+        the job's status dict (progress and the result reach jobs listeners)
+    """
+    if not root or not os.path.isdir(root):
+        raise ValueError(f"Not a directory: {root}")
+    job = jobs.submit('import', _import_job, root, **options)
+    return job.to_dict()
+
+
+def _import_job(job, root, **options):
+    return import_directory(root, job=job, **options)
+
+
+# ---------------- CLI -----------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m src.history_import', description='Import audio files into transcription history.')
+    parser.add_argument('folder', help='directory with audio files')
+    parser.add_argument('--no-recursive', action='store_true', help='do not walk subdirectories')
+    parser.add_argument('--transcribe', action='store_true', help='transcribe imported files (uses the configured OpenRouter key)')
+    parser.add_argument('--workers', type=int, help='decoder processes')
+    parser.add_argument('--transcribe-workers', type=int, default=2, help='concurrent transcription requests')
+    parser.add_argument('--history-dir', help='history folder to import into (default: ./history)')
+    args = parser.parse_args(argv)
+    logs.setup()
+
+    if args.history_dir:
+        history_store.set_history_dir(os.path.abspath(args.history_dir))
+    try:
+        stats = import_directory(args.folder, not args.no_recursive, args.transcribe, args.workers, args.transcribe_workers)
+    except KeyboardInterrupt:
+        history_store.flush()
+        print('\nImport interrupted; run again to resume', file=sys.stderr)
+        return 130
+    except Exception as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+    # The app does this in the background; here, finish before exiting
+    history_meta.backfill()
+    history_store.flush()
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""SQLite index over history: transcript full-text search and audio metadata.
+
+history.json remains the source of truth. The FTS index is derived from it,
+kept current incrementally by history_store, and rebuilt from the JSON list
+whenever it is missing or out of sync. The media table caches per-recording
+audio analysis (see history_meta) so the UI never has to open audio files.
+"""
+import html
+import logging
+import os
+import sqlite3
+import threading
+
+log = logging.getLogger(__name__)
+
+INDEX_FILENAME = 'index.db'
+SCHEMA_VERSION = 1
+
+# Private-use markers wrapped around matches by snippet(); swapped for <mark>
+# after HTML-escaping so transcript text can never inject markup.
+_HL_START = '\ue000'
+_HL_END = '\ue001'
+
+_conn = None
+_db_path = None
+_lock = threading.RLock()
+_synced = False
+
+
+def init_index(history_dir):
+    """Open (and create if needed) the index database inside history_dir."""
+    global _conn, _db_path, _synced
+    path = os.path.join(history_dir, INDEX_FILENAME)
+    with _lock:
+        if _conn is not None and _db_path == path:
+            return
+        if _conn is not None:
+            try:
+                _conn.close()
+            except Exception:
+                pass
+        _conn = sqlite3.connect(path, check_same_thread=False)
+        _conn.execute('PRAGMA journal_mode=WAL')
+        _conn.execute('PRAGMA synchronous=NORMAL')
+        version = _conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            _conn.executescript(
+                """
+                DROP TABLE IF EXISTS transcripts;
+                DROP TABLE IF EXISTS entries;
+                """
+            )
+        _conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY,
+                filename TEXT NOT NULL UNIQUE,
+                timestamp TEXT
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS transcripts USING fts5(
+                transcript,
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+            CREATE TABLE IF NOT EXISTS media (
+                filename TEXT PRIMARY KEY,
+                duration REAL NOT NULL,
+                rms REAL NOT NULL,
+                peak REAL NOT NULL,
+                voice_ratio REAL NOT NULL,
+                thumb BLOB NOT NULL,
+                levels TEXT NOT NULL,
+                pyramid BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS media_duration ON media (duration);
+            """
+        )
+        _conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+        _conn.commit()
+        _db_path = path
+        _synced = False
+
+
+def _upsert(entry):
+    filename = entry.get('filename')
+    if not filename:
+        return
+    row = _conn.execute('SELECT id FROM entries WHERE filename = ?', (filename,)).fetchone()
+    if row is None:
+        cur = _conn.execute(
+            'INSERT INTO entries (filename, timestamp) VALUES (?, ?)',
+            (filename, entry.get('timestamp', '')),
+        )
+        rowid = cur.lastrowid
+    else:
+        rowid = row[0]
+        _conn.execute('UPDATE entries SET timestamp = ? WHERE id = ?', (entry.get('timestamp', ''), rowid))
+        _conn.execute('DELETE FROM transcripts WHERE rowid = ?', (rowid,))
+    _conn.execute(
+        'INSERT INTO transcripts (rowid, transcript) VALUES (?, ?)',
+        (rowid, entry.get('transcript') or ''),
+    )
+
+
+def index_entry(entry):
+    """Insert or refresh a single history entry in the index."""
+    index_entries([entry])
+
+
+def index_entries(entries):
+    """Insert or refresh several history entries in one transaction."""
+    if _conn is None:
+        return
+    with _lock:
+        for entry in entries:
+            _upsert(entry)
+        _conn.commit()
+
+
+def remove_entry(filename):
+    """Drop a history entry from the index."""
+    if _conn is None:
+        return
+    with _lock:
+        row = _conn.execute('SELECT id FROM entries WHERE filename = ?', (filename,)).fetchone()
+        if row is not None:
+            _conn.execute('DELETE FROM transcripts WHERE rowid = ?', (row[0],))
+            _conn.execute('DELETE FROM entries WHERE id = ?', (row[0],))
+        _conn.execute('DELETE FROM media WHERE filename = ?', (filename,))
+        _conn.commit()
+
+
+def rebuild(entries):
+    """Replace the whole index with the given history entries."""
+    global _synced
+    if _conn is None:
+        return
+    with _lock:
+        _conn.execute('DELETE FROM transcripts')
+        _conn.execute('DELETE FROM entries')
+        for entry in entries:
+            _upsert(entry)
+        _conn.execute('DELETE FROM media WHERE filename NOT IN (SELECT filename FROM entries)')
+        _conn.commit()
+        _synced = True
+
+
+def ensure_synced(entries):
+    """Rebuild once per process if the index disagrees with history.json.
+
+    Only the entry count and filename set are compared; incremental updates
+    keep transcripts current after that.
+    """
+    global _synced
+    if _conn is None or _synced:
+        return
+    with _lock:
+        if _synced:
+            return
+        indexed = {row[0] for row in _conn.execute('SELECT filename FROM entries')}
+        wanted = {e.get('filename') for e in entries if e.get('filename')}
+        if indexed != wanted:
+            log.info("Rebuilding history search index (%s entries)", len(wanted))
+            rebuild(entries)
+        _synced = True
+
+
+def _to_match_query(query):
+    """Turn free text into a safe FTS5 expression (AND of quoted terms, last one prefix)."""
+    terms = [t for t in (query or '').split() if t]
+    if not terms:
+        return None
+    quoted = ['"' + t.replace('"', '""') + '"' for t in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _render_snippet(raw):
+    text = html.escape(raw or '')
+    return text.replace(_HL_START, '<mark>').replace(_HL_END, '</mark>')
+
+
+def search(query, limit=20, offset=0):
+    """Full-text search over transcripts, best matches first.
+
+    Returns:
+        dict with keys: total, results (list of dicts with filename, timestamp,
+        transcript, snippet (HTML-escaped with <mark> highlights), score)
+    """
+    match = _to_match_query(query)
+    if _conn is None or match is None:
+        return {"total": 0, "results": []}
+    limit = max(1, min(int(limit or 20), 200))
+    offset = max(0, int(offset or 0))
+    with _lock:
+        total = _conn.execute(
+            'SELECT count(*) FROM transcripts WHERE transcripts MATCH ?', (match,)
+        ).fetchone()[0]
+        rows = _conn.execute(
+            """
+            SELECT e.filename, e.timestamp, transcripts.transcript,
+                   snippet(transcripts, 0, ?, ?, '…', 16),
+                   bm25(transcripts) AS score
+            FROM transcripts JOIN entries e ON e.id = transcripts.rowid
+            WHERE transcripts MATCH ?
+            ORDER BY score
+            LIMIT ? OFFSET ?
+            """,
+            (_HL_START, _HL_END, match, limit, offset),
+        ).fetchall()
+    return {
+        "total": total,
+        "results": [
+            {
+                "filename": filename,
+                "timestamp": timestamp,
+                "transcript": transcript,
+                "snippet": _render_snippet(snippet),
+                "score": -score,
+            }
+            for filename, timestamp, transcript, snippet, score in rows
+        ],
+    }
+
+
+# ---------------- Audio metadata -----------------
+
+_MEDIA_COLUMNS = ('duration', 'rms', 'peak', 'voice_ratio', 'thumb', 'levels', 'pyramid')
+
+
+def put_media(records):
+    """Store audio analysis rows: iterable of (filename, dict with _MEDIA_COLUMNS)."""
+    if _conn is None:
+        return
+    with _lock:
+        _conn.executemany(
+            'INSERT OR REPLACE INTO media (filename, duration, rms, peak, voice_ratio, thumb, levels, pyramid)'
+            ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [(filename, *(meta[c] for c in _MEDIA_COLUMNS)) for filename, meta in records],
+        )
+        _conn.commit()
+
+
+def media_filenames():
+    """Set of filenames that already have audio metadata."""
+    if _conn is None:
+        return set()
+    with _lock:
+        return {row[0] for row in _conn.execute('SELECT filename FROM media')}
+
+
+def get_media_summaries(filenames):
+    """Small per-entry summaries for list rendering.
+
+    Returns:
+        dict filename -> dict with keys: duration, rms, peak, voice_ratio, thumb (bytes)
+    """
+    if _conn is None or not filenames:
+        return {}
+    out = {}
+    filenames = list(filenames)
+    with _lock:
+        for i in range(0, len(filenames), 500):  # stay under SQLite's variable limit
+            chunk = filenames[i:i + 500]
+            marks = ','.join('?' * len(chunk))
+            for row in _conn.execute(
+                f'SELECT filename, duration, rms, peak, voice_ratio, thumb FROM media WHERE filename IN ({marks})',
+                chunk,
+            ):
+                out[row[0]] = {"duration": row[1], "rms": row[2], "peak": row[3], "voice_ratio": row[4], "thumb": row[5]}
+    return out
+
+
+def get_media_pyramid(filename):
+    """Full peak pyramid for one entry: (levels JSON text, pyramid bytes) or None."""
+    if _conn is None:
+        return None
+    with _lock:
+        return _conn.execute('SELECT levels, pyramid FROM media WHERE filename = ?', (filename,)).fetchone()
+
+
+def filenames_by_duration(descending=True, limit=50, offset=0):
+    """Analysed filenames ordered by duration, plus the number of analysed entries."""
+    if _conn is None:
+        return [], 0
+    order = 'DESC' if descending else 'ASC'
+    with _lock:
+        total = _conn.execute('SELECT count(*) FROM media').fetchone()[0]
+        rows = _conn.execute(
+            f'SELECT filename FROM media ORDER BY duration {order}, filename LIMIT ? OFFSET ?',
+            (limit, offset),
+        ).fetchall()
+    return [r[0] for r in rows], total
@@ -0,0 +1,292 @@
+"""Precomputed audio metadata and waveform peaks for history entries.
+
+For every recording a background worker computes duration, RMS, peak level,
+voice ratio (share of chunks above the silence threshold) and a multi-resolution
+min/max peak pyramid, and stores them in the media table of the history index.
+The UI can then draw waveform thumbnails and sort by length without opening
+audio files.
+
+New recordings are analysed on a single worker thread as they are saved; the
+backlog of existing entries is filled in through a process pool at startup.
+"""
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import wave
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import history_archive, history_index, history_store
+
+try:
+    import soundfile as sf
+except Exception:  # pragma: no cover
+    sf = None
+
+log = logging.getLogger(__name__)
+
+BASE_BUCKET = 256       # samples per min/max pair at the finest level (16 ms at 16 kHz)
+LEVEL_FACTOR = 4        # each coarser level merges this many buckets
+THUMB_BUCKETS = 64      # resolution of the inline list thumbnail
+VOICE_CHUNK = 512       # same chunking as recorder.is_silence
+BACKFILL_INLINE_MAX = 8  # below this many missing entries, skip the process pool
+
+# recorder.set_silence_threshold() only forwards to this module once it is
+# loaded, so start from the recorder's current value if it was set earlier
+_silence_threshold = getattr(sys.modules.get(f'{__package__}.recorder'), 'SILENCE_THRESHOLD', 50)
+_queue = queue.Queue()
+_thread = None
+
+
+def set_silence_threshold(value):
+    """Threshold used for voice_ratio of recordings analysed from now on."""
+    global _silence_threshold
+    try:
+        _silence_threshold = max(1, int(float(value)))
+    except Exception:
+        pass
+
+
+# ---------------- Analysis (runs in worker processes) -----------------
+
+def _read_mono_int16(path):
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'rb') as wf:
+            rate = wf.getframerate()
+            channels = wf.getnchannels()
+            if wf.getsampwidth() != 2:
+                raise ValueError(f"Unsupported sample width in {path}")
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        return samples, rate
+    if sf is None:
+        raise RuntimeError('soundfile not available for archived audio')
+    data, rate = sf.read(path, dtype='int16', always_2d=True)
+    return data.mean(axis=1).astype(np.int16), rate
+
+
+def _min_max(samples, bucket):
+    """Per-bucket (min, max) of int16 samples as an (n, 2) int16 array."""
+    n = -(-len(samples) // bucket)
+    padded = np.zeros(n * bucket, dtype=np.int16)
+    padded[:len(samples)] = samples
+    blocks = padded.reshape(n, bucket)
+    return np.stack([blocks.min(axis=1), blocks.max(axis=1)], axis=1)
+
+
+def _to_int8(pairs):
+    return (pairs.astype(np.int32) * 127 // 32767).clip(-127, 127).astype(np.int8)
+
+
+def analyze_audio(path, silence_threshold=50):
+    """Compute metadata and a peak pyramid for one audio file.
+
+    Returns:
+        dict with keys: duration, rms, peak, voice_ratio, thumb (bytes),
+        levels (JSON list of [samples_per_bucket, buckets]), pyramid (bytes)
+    """
+    samples, rate = _read_mono_int16(path)
+    if len(samples) == 0:
+        samples = np.zeros(1, dtype=np.int16)
+    as_float = samples.astype(np.float32)
+    duration = len(samples) / float(rate)
+    rms = float(np.sqrt(np.mean(as_float * as_float)))
+    peak = float(np.abs(as_float).max())
+
+    chunks = len(samples) // VOICE_CHUNK
+    if chunks:
+        amplitudes = np.abs(as_float[:chunks * VOICE_CHUNK]).reshape(chunks, VOICE_CHUNK).mean(axis=1)
+        voice_ratio = float((amplitudes >= silence_threshold).mean())
+    else:
+        voice_ratio = 0.0
+
+    # Pyramid: finest level from raw samples, coarser levels by merging buckets
+    levels = []
+    blobs = []
+    pairs = _min_max(samples, BASE_BUCKET)
+    bucket = BASE_BUCKET
+    while True:
+        levels.append([bucket, len(pairs)])
+        blobs.append(_to_int8(pairs).tobytes())
+        if len(pairs) <= THUMB_BUCKETS:
+            break
+        n = -(-len(pairs) // LEVEL_FACTOR)
+        padded = np.zeros((n * LEVEL_FACTOR, 2), dtype=np.int16)
+        padded[:len(pairs)] = pairs
+        grouped = padded.reshape(n, LEVEL_FACTOR, 2)
+        pairs = np.stack([grouped[:, :, 0].min(axis=1), grouped[:, :, 1].max(axis=1)], axis=1)
+        bucket *= LEVEL_FACTOR
+
+    thumb_bucket = max(1, -(-len(samples) // THUMB_BUCKETS))
+    thumb = _to_int8(_min_max(samples, thumb_bucket)).tobytes()
+
+    return {
+        "duration": duration,
+        "rms": rms,
+        "peak": peak,
+        "voice_ratio": voice_ratio,
+        "thumb": thumb,
+        "levels": json.dumps(levels),
+        "pyramid": b''.join(blobs),
+    }
+
+
+def _analyze_job(args):
+    filename, path, silence_threshold = args
+    try:
+        return filename, analyze_audio(path, silence_threshold), None
+    except Exception as e:
+        return filename, None, str(e)
+
+
+# ---------------- Background worker -----------------
+
+def start():
+    """Start the metadata worker and queue a backfill of unanalysed entries (idempotent)."""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _thread = threading.Thread(target=_worker_loop, name='history-meta', daemon=True)
+    _thread.start()
+    _queue.put(None)  # None = backfill pass
+
+
+def enqueue(filename):
+    """Analyse a (new) history entry in the background."""
+    _queue.put(filename)
+
+
+def _jobs_for(filenames):
+    jobs = []
+    for filename in filenames:
+        entry = history_store.get_entry(filename)
+        path = history_archive.audio_path(entry) if entry else None
+        if path and os.path.exists(path):
+            jobs.append((filename, path, _silence_threshold))
+    return jobs
+
+
+def _worker_loop():
+    while True:
+        item = _queue.get()
+        try:
+            if item is None:
+                backfill()
+            else:
+                _store(map(_analyze_job, _jobs_for([item])))
+        except Exception as e:
+            log.error("History metadata worker error: %s", e)
+
+
+def _store(results):
+    records = []
+    for filename, meta, error in results:
+        if error:
+            log.warning("Could not analyse %s: %s", filename, error)
+        elif history_store.get_entry(filename) is not None:  # may have been deleted meanwhile
+            records.append((filename, meta))
+    history_index.put_media(records)
+    return len(records)
+
+
+def backfill(max_workers=None):
+    """Analyse every entry that has audio but no metadata yet.
+
+    Returns:
+        number of entries analysed
+    """
+    history_store.load()
+    done = history_index.media_filenames()
+    missing = [e['filename'] for e in history_store.get_entries()
+               if e['filename'] not in done and history_archive.audio_name(e)]
+    jobs = _jobs_for(missing)
+    if not jobs:
+        return 0
+    log.info("Analysing audio of %s history entries", len(jobs))
+    if len(jobs) <= BACKFILL_INLINE_MAX:
+        return _store(map(_analyze_job, jobs))
+    workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+    stored = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        batch = []
+        for result in pool.map(_analyze_job, jobs, chunksize=16):
+            batch.append(result)
+            if len(batch) >= 256:
+                stored += _store(batch)
+                batch = []
+        stored += _store(batch)
+    return stored
+
+
+# ---------------- Queries -----------------
+
+def _summary(row):
+    thumb = np.frombuffer(row["thumb"], dtype=np.int8)
+    return {
+        "duration": round(row["duration"], 3),
+        "rms": round(row["rms"], 1),
+        "peak": round(row["peak"], 1),
+        "voice_ratio": round(row["voice_ratio"], 3),
+        "peaks": thumb.tolist(),  # flat [min0, max0, min1, max1, ...] scaled to -127..127
+    }
+
+
+def attach_summaries(items):
+    """Add a "meta" dict to each page item that has been analysed (in place)."""
+    rows = history_index.get_media_summaries(item['filename'] for item in items)
+    for item in items:
+        row = rows.get(item['filename'])
+        if row is not None:
+            item["meta"] = _summary(row)
+    return items
+
+
+def get_sorted_page(cursor=None, limit=50, descending=True):
+    """Page of analysed entries ordered by duration; cursor is an offset.
+
+    Entries are listed once their audio has been analysed.
+    """
+    limit = max(1, min(int(limit or 50), 500))
+    try:
+        offset = max(0, int(cursor or 0))
+    except (TypeError, ValueError):
+        offset = 0
+    version = history_store.get_version()
+    filenames, total = history_index.filenames_by_duration(descending, limit, offset)
+    items = [e for e in (history_store.get_entry(f) for f in filenames) if e is not None]
+    end = offset + len(filenames)
+    return {
+        "items": attach_summaries(items),
+        "next_cursor": str(end) if filenames and end < total else None,
+        "total": total,
+        "version": version,
+    }
+
+
+def get_waveform(filename, buckets=400):
+    """Coarsest pyramid level with at least `buckets` min/max pairs (or the finest one).
+
+    Returns:
+        dict with keys: samples_per_bucket, peaks (flat min/max list, -127..127);
+        None if the entry has not been analysed
+    """
+    row = history_index.get_media_pyramid(filename)
+    if row is None:
+        return None
+    levels = json.loads(row[0])
+    blob = row[1]
+    offset = 0
+    chosen = None
+    for samples_per_bucket, count in levels:
+        size = count * 2
+        if count >= buckets or chosen is None:
+            chosen = (samples_per_bucket, offset, size)
+        offset += size
+    samples_per_bucket, start, size = chosen
+    peaks = np.frombuffer(blob[start:start + size], dtype=np.int8)
+    return {"samples_per_bucket": samples_per_bucket, "peaks": peaks.tolist()}
@@ -0,0 +1,492 @@
+"""In-memory history store with a single background writer.
+
+history.json is read once; after that the in-memory list is authoritative and
+every mutation goes through this module under one lock. A dedicated writer
+thread takes mutation events from a queue, coalesces whatever arrived within a
+short window and rewrites history.json atomically (temp file + os.replace), so
+concurrent callers can no longer lose each other's updates.
+
+Kept free of audio/GUI imports so headless tools can use it too.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from . import history_index
+
+log = logging.getLogger(__name__)
+
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'history')
+HISTORY_FILE = os.path.join(HISTORY_DIR, 'history.json')
+
+FLUSH_DELAY = 0.25  # seconds to wait for more mutations before writing
+MAX_HISTORY_CHANGES = 1000
+
+_lock = threading.RLock()
+_loaded = False
+_items = []       # in timestamp order, oldest first; new recordings are simply appended
+_positions = {}   # filename -> index in _items
+_audio_users = {}  # audio file name -> set of filenames of the entries using it
+_hash_audio = {}  # audio content hash -> audio file name (for deduplication)
+
+# Monotonic history version and a bounded log of recent mutations, so clients can
+# apply deltas instead of re-fetching the list. Versions are seeded from the wall
+# clock at startup so they keep increasing across restarts.
+_version = int(time.time()) * 1000000
+_changes = deque(maxlen=MAX_HISTORY_CHANGES)
+
+_queue = queue.Queue()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def set_history_dir(path):
+    """Point the store at another history directory (drops any loaded state)."""
+    global HISTORY_DIR, HISTORY_FILE, _loaded
+    flush()
+    with _lock:
+        HISTORY_DIR = path
+        HISTORY_FILE = os.path.join(path, 'history.json')
+        _items.clear()
+        _positions.clear()
+        _audio_users.clear()
+        _hash_audio.clear()
+        _loaded = False
+
+
+def load():
+    """Ensure the history directory exists and the JSON list is loaded into memory."""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if _loaded:
+            return
+        if not os.path.exists(HISTORY_DIR):
+            os.makedirs(HISTORY_DIR)
+        if not os.path.exists(HISTORY_FILE):
+            with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
+                json.dump([], f)
+        try:
+            with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            log.error("Error reading history json: %s", e)
+            data = []
+        _items[:] = list(reversed(data))  # file is newest first
+        _reindex(0)
+        for item in _items:
+            _track_audio(item, 1)
+        _loaded = True
+        try:
+            history_index.init_index(HISTORY_DIR)
+            history_index.ensure_synced(_items)
+        except Exception as e:
+            log.error("Error opening history search index: %s", e)
+
+
+def _reindex(start):
+    for i in range(start, len(_items)):
+        _positions[_items[i].get('filename')] = i
+
+
+def audio_name(entry):
+    """Name of the file holding an entry's audio, or None if it was evicted.
+
+    Entries point at their audio through an optional "audio" field (several
+    entries may share one file); without it the audio is the entry's filename.
+    """
+    if entry.get('audio_evicted'):
+        return None
+    return entry.get('audio') or entry.get('filename')
+
+
+def _track_audio(entry, delta):
+    """Adjust audio reference counts for an entry being added (+1) or dropped (-1)."""
+    name = audio_name(entry)
+    if not name:
+        return
+    users = _audio_users.setdefault(name, set())
+    if delta > 0:
+        users.add(entry.get('filename'))
+    else:
+        users.discard(entry.get('filename'))
+        if not users:
+            del _audio_users[name]
+    content_hash = entry.get('audio_hash')
+    if content_hash:
+        if delta > 0:
+            _hash_audio[content_hash] = name
+        elif name not in _audio_users and _hash_audio.get(content_hash) == name:
+            del _hash_audio[content_hash]
+
+
+def _record_change(filename, entry=None):
+    """Append a mutation to the change log and return it (caller holds _lock).
+
+    entry is the new entry for inserts/updates; None records a delete tombstone.
+    """
+    global _version
+    _version += 1
+    change = {"version": _version, "filename": filename}
+    if entry is None:
+        change["deleted"] = True
+    else:
+        change["entry"] = dict(entry)
+    _changes.append(change)
+    _queue.put(change)
+    return change
+
+
+# ---------------- Reads -----------------
+
+def get_entries():
+    """All entries, newest first (copies)."""
+    load()
+    with _lock:
+        return [dict(item) for item in reversed(_items)]
+
+
+def iter_entries(newest_first=False):
+    """Yield entries one at a time (copies).
+
+    Iterates over a snapshot of references taken once, so the whole history is
+    never copied and concurrent mutations do not disturb the iteration.
+    """
+    load()
+    with _lock:
+        snapshot = list(_items)
+    if newest_first:
+        snapshot.reverse()
+    for item in snapshot:
+        yield dict(item)
+
+
+def get_entry(filename):
+    load()
+    with _lock:
+        pos = _positions.get(filename)
+        return dict(_items[pos]) if pos is not None else None
+
+
+def count():
+    load()
+    with _lock:
+        return len(_items)
+
+
+def audio_refcount(name):
+    """Number of entries whose audio is stored in file `name`."""
+    load()
+    with _lock:
+        return len(_audio_users.get(name, ()))
+
+
+def audio_users(name):
+    """Filenames of the entries whose audio is stored in file `name`."""
+    load()
+    with _lock:
+        return sorted(_audio_users.get(name, ()))
+
+
+def find_audio_by_hash(content_hash):
+    """Audio file name already holding this content, or None."""
+    load()
+    with _lock:
+        name = _hash_audio.get(content_hash)
+        return name if name and name in _audio_users else None
+
+
+def get_version():
+    """Current history version number."""
+    with _lock:
+        return _version
+
+
+def get_changes(since_version):
+    """Get history mutations newer than since_version.
+
+    Returns:
+        dict with keys: version, changes (oldest first; entries or tombstones),
+        reset (True when the log cannot bridge the gap and the client must reload)
+    """
+    with _lock:
+        current = _version
+        oldest = _changes[0]["version"] if _changes else current + 1
+        try:
+            since = int(since_version)
+        except (TypeError, ValueError):
+            since = None
+        if since is None or since > current or since < oldest - 1:
+            return {"version": current, "changes": [], "reset": since != current}
+        changes = [c for c in _changes if c["version"] > since]
+    return {"version": current, "changes": changes, "reset": False}
+
+
+def _encode_cursor(item):
+    return f"{item.get('timestamp', '')}|{item.get('filename', '')}"
+
+
+def get_page(cursor=None, limit=50):
+    """Get one page of history, newest first.
+
+    Args:
+        cursor: opaque value from a previous page's next_cursor, or None for the first page
+        limit: maximum number of entries to return (1-500)
+
+    Returns:
+        dict with keys: items, next_cursor (None on the last page), total, version
+    """
+    load()
+    limit = max(1, min(int(limit or 50), 500))
+    with _lock:
+        # Walk _items backwards: start is the _items index of the first entry to return
+        start = len(_items) - 1
+        if cursor:
+            timestamp, _, filename = str(cursor).partition('|')
+            pos = _positions.get(filename)
+            if pos is not None:
+                start = pos - 1
+            else:
+                # Cursor entry was deleted meanwhile: resume after its timestamp
+                start = -1
+                for i in range(len(_items) - 1, -1, -1):
+                    if _items[i].get('timestamp', '') < timestamp:
+                        start = i
+                        break
+        stop = max(start - limit, -1)
+        page = [dict(_items[i]) for i in range(start, stop, -1)]
+        return {
+            "items": page,
+            "next_cursor": _encode_cursor(_items[stop + 1]) if page and stop >= 0 else None,
+            "total": len(_items),
+            "version": _version,
+        }
+
+
+def search(query, limit=20, offset=0):
+    """Full-text search over transcripts (see history_index.search), tagged with the version."""
+    load()
+    version = get_version()
+    result = history_index.search(query, limit, offset)
+    result["version"] = version
+    return result
+
+
+# ---------------- Mutations -----------------
+
+def _insert_position(timestamp):
+    """Index in _items (kept in timestamp order) where an entry with this timestamp goes."""
+    if not _items or _items[-1].get('timestamp', '') <= timestamp:
+        return len(_items)  # the usual case: a new recording
+    lo, hi = 0, len(_items)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _items[mid].get('timestamp', '') <= timestamp:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _unique_filename(filename, taken):
+    """filename, or the first free "<stem>_<n><ext>" if it is in use (caller holds _lock).
+
+    taken holds the names claimed earlier in the same batch, which are not in
+    _positions until the batch is reindexed.
+    """
+    if filename not in _positions and filename not in taken:
+        return filename
+    stem, ext = os.path.splitext(filename)
+    suffix = 1
+    while f"{stem}_{suffix}{ext}" in _positions or f"{stem}_{suffix}{ext}" in taken:
+        suffix += 1
+    return f"{stem}_{suffix}{ext}"
+
+
+def _put(entry):
+    """Insert a new entry (caller holds _lock). Returns its position."""
+    pos = _insert_position(entry.get('timestamp', ''))
+    _items.insert(pos, entry)
+    _track_audio(entry, 1)
+    return pos
+
+
+def add_entry(entry):
+    """Insert a new entry (at its timestamp position; normally the newest). Returns the change.
+
+    The filename is made unique as in add_entries; the change carries the one used.
+    """
+    return add_entries([entry])[0]
+
+
+def add_entries(entries):
+    """Insert several entries under one lock and one index transaction.
+
+    Existing entries are never replaced: an entry whose filename is already
+    taken is stored as "<stem>_<n><ext>" with the first free n. The name is
+    chosen and inserted in the same critical section, so concurrent callers
+    cannot pick the same one.
+
+    Returns:
+        list of changes, in the order given (change["filename"] is the name used)
+    """
+    load()
+    entries = [dict(entry) for entry in entries]
+    if not entries:
+        return []
+    with _lock:
+        first = None
+        taken = set()
+        for entry in entries:
+            filename = _unique_filename(entry.get('filename'), taken)
+            if filename != entry.get('filename'):
+                log.debug("History entry %s exists, storing as %s", entry.get('filename'), filename)
+                entry['filename'] = filename
+            taken.add(filename)
+            pos = _put(entry)
+            if first is None or pos < first:
+                first = pos
+        _reindex(first)
+        changes = [_record_change(entry.get('filename'), entry) for entry in entries]
+        _index(entries)
+    _ensure_writer()
+    return changes
+
+
+def update_entry(filename, **fields):
+    """Update fields of an existing entry. Returns the change, or None if not found."""
+    load()
+    with _lock:
+        pos = _positions.get(filename)
+        if pos is None:
+            return None
+        # Replace rather than mutate so snapshots taken by the writer stay consistent
+        entry = {**_items[pos], **fields}
+        _track_audio(_items[pos], -1)
+        _items[pos] = entry
+        _track_audio(entry, 1)
+        change = _record_change(filename, entry)
+        _index([entry])
+    _ensure_writer()
+    return change
+
+
+def remove_entry(filename):
+    """Remove an entry. Returns a tombstone change (also when it was already gone)."""
+    load()
+    with _lock:
+        pos = _positions.pop(filename, None)
+        if pos is None:
+            return {"version": _version, "filename": filename, "deleted": True}
+        _track_audio(_items[pos], -1)
+        del _items[pos]
+        _reindex(pos)
+        change = _record_change(filename)
+        try:
+            history_index.remove_entry(filename)
+        except Exception as e:
+            log.error("Error removing history entry from index: %s", e)
+    _ensure_writer()
+    return change
+
+
+def _index(entries):
+    """Write entries to the search index (caller holds _lock).
+
+    Index writes happen under the store lock so they apply in the same order as
+    the mutations: an update racing a delete cannot re-index a removed entry.
+    """
+    try:
+        history_index.index_entries(entries)
+    except Exception as e:
+        log.error("Error indexing history entries: %s", e)
+
+
+# ---------------- Writer -----------------
+
+class _FlushBarrier:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_writer_loop, name='history-writer', daemon=True)
+            _writer.start()
+
+
+def _writer_loop():
+    dirty = False
+    while True:
+        event = _queue.get()
+        barriers = []
+        if isinstance(event, _FlushBarrier):
+            barriers.append(event)
+        else:
+            dirty = True
+            # Coalesce: give concurrent mutations a moment to join this batch
+            deadline = time.monotonic() + FLUSH_DELAY
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = _queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if isinstance(event, _FlushBarrier):
+                    barriers.append(event)
+                    break  # someone is waiting; write now
+        # Pick up anything else already queued without waiting
+        while True:
+            try:
+                event = _queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(event, _FlushBarrier):
+                barriers.append(event)
+            else:
+                dirty = True
+        if dirty:
+            dirty = not _write_snapshot()
+        for barrier in barriers:
+            barrier.done.set()
+
+
+def _write_snapshot():
+    """Atomically rewrite history.json from the in-memory list. Returns True on success."""
+    with _lock:
+        snapshot = list(reversed(_items))  # newest first, as stored on disk
+        path = HISTORY_FILE
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        log.error("Error saving history json: %s", e)
+        return False
+
+
+def flush(timeout=None):
+    """Block until every mutation queued so far is on disk.
+
+    Returns True if the writer confirmed the flush within timeout.
+    """
+    if _writer is None or not _writer.is_alive():
+        return True
+    barrier = _FlushBarrier()
+    _queue.put(barrier)
+    return barrier.done.wait(timeout)
@@ -0,0 +1,107 @@
+"""Hold-to-record key handling.
+
+keyboard's hooks report a key-down for every OS autorepeat while a key is
+held, and a hold key such as ctrl is also part of ordinary shortcuts
+(ctrl+c, ctrl+v). HoldKeyDispatcher sits between the hooks and the recording
+actions:
+
+- the hook callbacks only flip a flag and enqueue; autorepeat key-downs of a
+  key that is already down are dropped right there
+- one dispatcher thread consumes the events in order. The key has to stay
+  down for min_hold seconds, with no other key pressed meanwhile, before
+  on_start runs; a shorter tap or a shortcut chord never touches recording
+- on release, on_stop runs only if on_start ran for that hold
+"""
+import logging
+import queue
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MIN_HOLD = 0.2  # seconds
+
+
+class HoldKeyDispatcher:
+    def __init__(self, on_start, on_stop, min_hold=DEFAULT_MIN_HOLD):
+        self.on_start = on_start
+        self.on_stop = on_stop
+        self.min_hold = max(0.0, float(min_hold))
+        self.stats = {
+            "events": 0,           # key events seen by the hook callbacks
+            "repeats_dropped": 0,  # autorepeat key-downs dropped in the hook
+            "taps_ignored": 0,     # released before min_hold
+            "chords_ignored": 0,   # another key went down before min_hold
+            "holds": 0,            # holds that started a recording
+        }
+        self._down = False
+        self._events = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='hotkey-dispatch', daemon=True)
+        self._thread.start()
+
+    # ---- hook side (keyboard's listener thread; must stay cheap) ----
+    def press(self, _event=None):
+        self.stats["events"] += 1
+        if self._down:
+            self.stats["repeats_dropped"] += 1
+            return
+        self._down = True
+        self._events.put(('press', time.monotonic()))
+
+    def release(self, _event=None):
+        self.stats["events"] += 1
+        if not self._down:
+            return
+        self._down = False
+        self._events.put(('release', time.monotonic()))
+
+    def other_key(self, _event=None):
+        """Another key went down (only matters while the hold key is down)."""
+        self.stats["events"] += 1
+        if self._down:
+            self._events.put(('other', time.monotonic()))
+
+    def close(self, timeout=1.0):
+        """Stop the dispatcher thread (a started hold is not stopped)."""
+        self._events.put(None)
+        self._thread.join(timeout)
+
+    # ---- dispatcher thread ----
+    def _run(self):
+        pressed_at = None  # when the hold key went down (None while it is up)
+        active = False     # on_start ran for this hold
+        chord = False      # another key was pressed during this hold
+        while True:
+            timeout = None
+            if pressed_at is not None and not active and not chord:
+                timeout = max(0.0, pressed_at + self.min_hold - time.monotonic())
+            try:
+                item = self._events.get(timeout=timeout)
+            except queue.Empty:
+                # Held long enough: this is a real hold
+                active = True
+                self.stats["holds"] += 1
+                self._call(self.on_start)
+                continue
+            if item is None:
+                return
+            kind, _when = item
+            if kind == 'press':
+                pressed_at, active, chord = _when, False, False
+            elif kind == 'other':
+                if pressed_at is not None and not active and not chord:
+                    chord = True
+                    self.stats["chords_ignored"] += 1
+            elif kind == 'release':
+                if active:
+                    self._call(self.on_stop)
+                elif not chord:
+                    self.stats["taps_ignored"] += 1
+                pressed_at, active, chord = None, False, False
+
+    @staticmethod
+    def _call(fn):
+        try:
+            fn()
+        except Exception as e:
+            log.error('Hotkey action failed: %s', e)
@@ -0,0 +1,182 @@
+"""Background jobs with progress reporting and cancellation.
+
+Long-running work (history export/import, ...) runs on its own thread and is
+tracked by a Job handle. Listeners added with add_progress_listener() hear
+every progress update (run.py pushes them to the UI); the UI can call
+cancel_job() and the work function checks job.cancelled between steps.
+
+Short blocking calls (device probing, calibration, a transcription request)
+go through run() instead, which uses a shared thread pool. Listeners added
+with add_listener() are told about every finished job, which is how results
+get pushed to the UI instead of blocking an eel request.
+"""
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+MAX_FINISHED_JOBS = 50  # finished jobs kept around for status queries
+POOL_WORKERS = 4
+
+_jobs = {}
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_listeners = []
+_progress_listeners = []
+_pool = None
+
+
+class JobCancelled(Exception):
+    """Raised by Job.check() when cancellation was requested."""
+
+
+class Job:
+    def __init__(self, kind):
+        self.id = f"{kind}-{next(_ids)}"
+        self.kind = kind
+        self.status = 'queued'  # queued | running | done | error | cancelled
+        self.done = 0
+        self.total = None
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        """Raise JobCancelled if cancellation was requested."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def update(self, done=None, total=None, message=None):
+        if done is not None:
+            self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        _notify(_progress_listeners, self)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def submit(kind, fn, *args, **kwargs):
+    """Run fn(job, *args, **kwargs) on a background thread.
+
+    Returns:
+        the Job; its result is fn's return value
+    """
+    job = Job(kind)
+    with _lock:
+        _jobs[job.id] = job
+        _prune()
+    threading.Thread(target=_run, args=(job, fn, args, kwargs), name=job.id, daemon=True).start()
+    return job
+
+
+def run(kind, fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) on the shared worker pool (fn gets no job handle).
+
+    Returns:
+        the Job; its result is fn's return value
+    """
+    global _pool
+    job = Job(kind)
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix='job')
+        _jobs[job.id] = job
+        _prune()
+    _pool.submit(_run, job, lambda _job: fn(*args, **kwargs), (), {})
+    return job
+
+
+def add_listener(callback):
+    """Call callback(status dict) whenever a job finishes (from the job's thread)."""
+    _listeners.append(callback)
+
+
+def add_progress_listener(callback):
+    """Call callback(status dict) when a job starts and on every Job.update() (from the job's thread).
+
+    Updates can be frequent (one per file); callbacks should only queue the status.
+    """
+    _progress_listeners.append(callback)
+
+
+def _notify(listeners, job):
+    if not listeners:
+        return
+    status = job.to_dict()
+    for callback in list(listeners):
+        try:
+            callback(status)
+        except Exception as e:
+            log.error("Job listener error: %s", e)
+
+
+def _run(job, fn, args, kwargs):
+    job.status = 'running'
+    _notify(_progress_listeners, job)
+    try:
+        job.result = fn(job, *args, **kwargs)
+        job.status = 'cancelled' if job.cancelled else 'done'
+    except JobCancelled:
+        job.status = 'cancelled'
+    except Exception as e:
+        log.exception("Job %s failed", job.id)
+        job.error = str(e)
+        job.status = 'error'
+    finally:
+        job.finished = time.time()
+        _notify(_listeners, job)
+
+
+def _prune():
+    finished = sorted((j for j in _jobs.values() if j.finished), key=lambda j: j.finished)
+    for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job.id]
+
+
+def get_job(job_id):
+    """Status dict of a job, or None if unknown."""
+    with _lock:
+        job = _jobs.get(job_id)
+    return job.to_dict() if job else None
+
+
+def cancel_job(job_id):
+    """Request cancellation. Returns False if the job is unknown."""
+    with _lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        return False
+    job.cancel()
+    return True
+
+
+def list_jobs(kind=None):
+    with _lock:
+        jobs = list(_jobs.values())
+    return [j.to_dict() for j in jobs if kind is None or j.kind == kind]
@@ -0,0 +1,87 @@
+"""Decimated input level telemetry for the overlay's level meter.
+
+The capture loop hands every chunk to input_level.feed(). At most RATE_HZ
+times a second the meter publishes the RMS and peak of the chunks seen since
+the last publish into a single-slot mailbox: one attribute assignment of an
+immutable Level tuple, which is atomic in CPython, so the capture thread never
+takes a lock or waits on a reader. Readers (the overlay's Tk thread) poll
+latest() at their own frame rate and only ever see the newest value; values
+nobody read are simply overwritten. reset() may be called from any thread: it
+posts silence to the mailbox and leaves a flag for the capture thread, which
+clears its own accumulators on the next feed().
+"""
+import itertools
+import time
+from collections import namedtuple
+
+RATE_HZ = 20
+FULL_SCALE = 32768.0
+
+# rms and peak are 0..1 of full scale; voice is the silence detector's verdict
+# for the last chunk; seq increases with every publish (0 = nothing yet)
+Level = namedtuple('Level', 'rms peak voice seq time')
+SILENT = Level(0.0, 0.0, False, 0, 0.0)
+
+
+class LevelMeter:
+    def __init__(self, rate_hz=RATE_HZ):
+        self.interval = 1.0 / rate_hz
+        self._slot = SILENT
+        self._seqs = itertools.count(1)
+        self._reset_pending = False
+        self._sum_sq = 0.0
+        self._count = 0
+        self._peak = 0
+        self._voice = False
+        self._next_publish = 0.0
+
+    def feed(self, data, voice=False):
+        """Accumulate one chunk of 16-bit PCM (capture thread only).
+
+        Args:
+            data: raw int16 bytes
+            voice: whether the silence detector considered the chunk speech
+        """
+        import numpy as np
+        if self._reset_pending:
+            self._reset_pending = False
+            self._clear()
+        samples = np.frombuffer(data, dtype=np.int16)
+        if not len(samples):
+            return
+        wide = samples.astype(np.float32)
+        self._sum_sq += float(np.dot(wide, wide))
+        self._count += len(samples)
+        self._peak = max(self._peak, int(np.abs(samples.astype(np.int32)).max()))
+        self._voice = self._voice or voice
+        now = time.monotonic()
+        if now >= self._next_publish:
+            self._publish(now)
+
+    def _publish(self, now):
+        rms = (self._sum_sq / self._count) ** 0.5 / FULL_SCALE if self._count else 0.0
+        self._slot = Level(min(1.0, rms), min(1.0, self._peak / FULL_SCALE), self._voice, next(self._seqs), now)
+        self._clear()
+        self._next_publish = now + self.interval
+
+    def _clear(self):
+        self._sum_sq = 0.0
+        self._count = 0
+        self._peak = 0
+        self._voice = False
+
+    def reset(self):
+        """Publish silence and drop accumulated samples (e.g. on pause or stop).
+
+        Safe from any thread: the accumulators belong to the capture thread,
+        which clears them itself on its next feed().
+        """
+        self._reset_pending = True
+        self._slot = Level(0.0, 0.0, False, next(self._seqs), time.monotonic())
+
+    def latest(self):
+        """Newest published Level (never blocks)."""
+        return self._slot
+
+
+input_level = LevelMeter()
@@ -0,0 +1,151 @@
+"""Application logging: non-blocking output, per-module levels and a ring buffer.
+
+setup() routes every record through a QueueHandler, so a log call from the
+capture loop, the sound callback or a keyboard hook never waits on a console
+or pipe; a listener thread writes the records to stderr and into a bounded
+in-memory ring. The web UI reads the ring through recent() when the Logs view
+opens and receives new records as they arrive through add_listener().
+
+Levels are set per logger name from settings ("log_levels"), e.g.
+
+    {"": "INFO", "src.recorder": "DEBUG", "src.history_meta": "WARNING"}
+
+where "" is the root logger. Debug logging in hot loops is guarded with
+logger.isEnabledFor(logging.DEBUG), checked once before the loop, so it costs
+a boolean test per iteration when disabled.
+"""
+import atexit
+import itertools
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from collections import deque
+
+RING_SIZE = 2000
+FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+# Chatty third-party loggers (httpx logs every request at INFO)
+DEFAULT_LEVELS = {"": "INFO", "httpx": "WARNING", "httpcore": "WARNING", "urllib3": "WARNING"}
+
+_ring = deque(maxlen=RING_SIZE)
+_ring_lock = threading.Lock()
+_seq = itertools.count(1)
+_listener = None
+_queue_handler = None
+_configured = set()  # logger names whose level we set
+_listeners = []
+
+
+class RingHandler(logging.Handler):
+    """Keeps the most recent records as plain dicts (runs on the listener thread)."""
+
+    def emit(self, record):
+        item = {
+            "seq": next(_seq),
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        with _ring_lock:
+            _ring.append(item)
+        for callback in list(_listeners):
+            try:
+                callback(item)
+            except Exception:
+                pass  # logging the failure would come straight back here
+
+
+def setup(levels=None, console=True):
+    """Install the queue handler on the root logger and start the listener (idempotent).
+
+    Args:
+        levels: optional {logger name: level name} applied over DEFAULT_LEVELS
+        console: also write records to stderr
+    """
+    global _listener, _queue_handler
+    root = logging.getLogger()
+    if _listener is None:
+        records = queue.SimpleQueue()  # unbounded: put() never blocks
+        handlers = [RingHandler()]
+        if console:
+            stream = logging.StreamHandler(sys.stderr)
+            stream.setFormatter(logging.Formatter(FORMAT))
+            handlers.append(stream)
+        _queue_handler = logging.handlers.QueueHandler(records)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+    set_levels(levels)
+
+
+def set_levels(levels=None):
+    """Apply per-logger levels; loggers configured earlier but not listed are reset.
+
+    Args:
+        levels: {logger name: level name or number}; merged over DEFAULT_LEVELS
+
+    Returns:
+        dict of the levels in effect
+    """
+    wanted = dict(DEFAULT_LEVELS)
+    wanted.update(levels or {})
+    applied = {}
+    for name, level in wanted.items():
+        number = level if isinstance(level, int) else logging.getLevelName(str(level).upper())
+        if not isinstance(number, int):
+            logging.getLogger(__name__).warning("Ignoring invalid log level %r for %r", level, name)
+            continue
+        logging.getLogger(name or None).setLevel(number)
+        applied[name] = logging.getLevelName(number)
+    for name in _configured - set(applied):
+        logging.getLogger(name or None).setLevel(logging.NOTSET)
+    _configured.clear()
+    _configured.update(applied)
+    return applied
+
+
+def add_listener(callback):
+    """Call callback(record dict) for every record added to the ring.
+
+    Runs on the listener thread, so callbacks should only queue the record.
+    """
+    _listeners.append(callback)
+
+
+def recent(after=0, limit=200, level=None, logger=None):
+    """Most recent records from the ring, oldest first.
+
+    Args:
+        after: only records with seq greater than this (for incremental polling)
+        limit: maximum number of records (the newest are kept)
+        level: minimum level name, e.g. 'WARNING'
+        logger: only this logger and its children, e.g. 'src.history_meta'
+
+    Returns:
+        dict with keys: records, last_seq
+    """
+    minimum = logging.getLevelName(str(level).upper()) if level else 0
+    if not isinstance(minimum, int):
+        minimum = 0
+    with _ring_lock:
+        items = [r for r in _ring if r["seq"] > after]
+    last_seq = items[-1]["seq"] if items else after
+    if minimum:
+        items = [r for r in items if logging.getLevelName(r["level"]) >= minimum]
+    if logger:
+        items = [r for r in items if r["logger"] == logger or r["logger"].startswith(logger + '.')]
+    return {"records": items[-max(1, int(limit)):], "last_seq": last_seq}
+
+
+def shutdown():
+    """Flush queued records (call before os._exit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
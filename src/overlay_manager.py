@@ -1,15 +1,42 @@
 """CustomTkinter recording overlay manager used alongside the Eel web UI.
 
 Retains the original floating pill overlay while primary UI is in browser.
+
+The overlay window is built once on the Tk thread by init_overlay() and then
+only shown and hidden (deiconify/withdraw), so starting a recording does no
+widget construction. Other threads never touch Tk: show_overlay(),
+hide_overlay() and set_paused_overlay() put updates on a queue that the Tk
+thread drains every UPDATE_INTERVAL_MS.
+
+While the overlay is visible the Tk thread also reads the capture loop's
+latest input level (level_meter.input_level) METER_FPS times a second and
+draws it; neither side waits on the other.
 """
+import logging
+import queue
+import statistics
 import threading
-import customtkinter as ctk
+import time
+from collections import deque
+
+from .level_meter import input_level
+
+log = logging.getLogger(__name__)
+
+# customtkinter and the window class (overlay_window) are imported on the Tk
+# thread started by init_overlay(), keeping them off the startup path.
 
 USE_OVERLAY = True
+UPDATE_INTERVAL_MS = 15  # how often the Tk thread applies queued updates
+METER_FPS = 30
+LEVEL_STALE_SEC = 0.5  # a level older than this is drawn as silence
 
 _root = None
 _overlay = None
 _thread = None
+_updates = queue.Queue()  # (action, value) for the Tk thread
+_meter_job = None
+_time_to_visible = deque(maxlen=50)  # seconds from show_overlay() to the window being mapped
 
 _callbacks = {
     'pause_toggle': None,
@@ -18,160 +45,104 @@ _callbacks = {
     'restart': None,
 }
 
-class RecordingOverlay(ctk.CTkToplevel):
-    def __init__(self, master, on_pause_toggle, on_stop, on_cancel, on_restart):
-        super().__init__(master)
-
-        # Window setup
-        self.withdraw()
-        self.overrideredirect(True)
-        self.attributes('-topmost', True)
-        try:
-            self.attributes('-alpha', 0.97)
-        except Exception:
-            pass
-
-        # Transparency (rounded pill)
-        self._transparent_color = '#010101'
-        try:
-            self.configure(fg_color=self._transparent_color)
-            self.attributes('-transparentcolor', self._transparent_color)
-        except Exception:
-            self.configure(fg_color='#000000')
-
-        # Callbacks
-        self.on_pause_toggle = on_pause_toggle
-        self.on_stop = on_stop
-        self.on_cancel = on_cancel
-        self.on_restart = on_restart
-
-        # State
-        self.is_paused = False
-        self._seconds_elapsed = 0
-        self._timer_job_id = None
-
-        # Container
-        self.container = ctk.CTkFrame(self, fg_color='#1b1b1b', corner_radius=28, border_width=2, border_color='#2E2E2E')
-        self.container.pack(fill='both', expand=True)
-        self.container.pack_propagate(False)
-
-        # Status pill (indicator + timer)
-        self.status_pill = ctk.CTkFrame(self.container, fg_color='#2a2a2a', corner_radius=16)
-        self.status_pill.pack(side='left', padx=(12, 8), pady=12)
-        self.status_pill.pack_propagate(False)
-        self.status_pill.configure(width=170, height=40)
-
-        self.rec_indicator = ctk.CTkFrame(self.status_pill, width=36, height=36, corner_radius=18, fg_color='#ff6a45')
-        self.rec_indicator.pack(side='left', padx=(12, 10), pady=2)
-        self.rec_indicator.pack_propagate(False)
-        self.rec_inner_stop = ctk.CTkFrame(self.rec_indicator, width=16, height=16, corner_radius=4, fg_color='white')
-        self.rec_inner_stop.place(relx=0.5, rely=0.5, anchor='center')
-
-        self.timer_label = ctk.CTkLabel(self.status_pill, text='0:00', text_color='white', font=('Segoe UI', 18, 'bold'))
-        self.timer_label.pack(side='left', padx=(0, 14))
-        for w in (self.status_pill, self.rec_indicator, self.timer_label, self.rec_inner_stop):
-            w.bind('<Button-1>', lambda _e: self.on_stop())
-            w.configure(cursor='hand2')
-
-        # Divider
-        self.divider = ctk.CTkFrame(self.container, width=2, height=36, fg_color='#2a2a2a')
-        self.divider.pack(side='left', padx=6, pady=14)
-
-        # Icon button factory
-        def make_icon(text, command):
-            return ctk.CTkButton(
-                self.container,
-                text=text,
-                width=40,
-                height=40,
-                corner_radius=20,
-                fg_color='transparent',
-                hover_color='#2a2a2a',
-                text_color='white',
-                font=('Segoe UI Symbol', 20, 'bold'),
-                command=command,
-            )
-
-        # Buttons
-        self.restart_button = make_icon('↻', self.on_restart)
-        self.restart_button.pack(side='left', padx=4, pady=10)
-        self.pause_button = make_icon('⏸', self.on_pause_toggle)
-        self.pause_button.pack(side='left', padx=4, pady=10)
-        self.delete_button = make_icon('🗑', self.on_cancel)
-        self.delete_button.pack(side='left', padx=(4, 12), pady=10)
-
-        # Dragging
-        self._offset_x = 0
-        self._offset_y = 0
-        for drag_widget in (self.container, self.status_pill, self.divider):
-            drag_widget.bind('<Button-1>', self._start_move)
-            drag_widget.bind('<B1-Motion>', self._on_move)
-
-        # Lifecycle
-        self.bind('<Destroy>', self._on_destroy)
-        self.after(10, self._place_initial)
-        self._schedule_tick()
-
-    def _place_initial(self):
+def _build_overlay():
+    global _overlay
+    from .overlay_window import RecordingOverlay
+    _overlay = RecordingOverlay(
+        _root,
+        on_pause_toggle=lambda: _safe_call('pause_toggle'),
+        on_stop=lambda: _safe_call('stop'),
+        on_cancel=lambda: _safe_call('cancel'),
+        on_restart=lambda: _safe_call('restart'),
+    )
+
+
+def _safe_call(name):
+    cb = _callbacks.get(name)
+    if cb:
         try:
-            sw = self.winfo_screenwidth(); sh = self.winfo_screenheight()
-            width, height = 460, 64
-            x = int((sw - width) / 2); y = int(sh - height - 96)
-            self.geometry(f"{width}x{height}+{x}+{y}")
-        finally:
-            self.deiconify()
+            cb()
+        except Exception as e:
+            log.error('Overlay callback %s error: %s', name, e)
+
+
+def _apply(action, value):
+    if _overlay is None or not _overlay.winfo_exists():
+        _build_overlay()
+    if action == 'show':
+        _overlay.show()
+        _overlay.update_idletasks()
+        elapsed = time.perf_counter() - value
+        _time_to_visible.append(elapsed)
+        log.debug("Overlay visible after %.1f ms", elapsed * 1000)
+        _start_meter()
+    elif action == 'hide':
+        _stop_meter()
+        _overlay.hide()
+    elif action == 'paused':
+        _overlay.set_paused(value)
+
+
+def _meter_frame():
+    global _meter_job
+    _meter_job = None
+    if _overlay is None or not _overlay.winfo_exists():
+        return
+    level = input_level.latest()
+    if time.monotonic() - level.time > LEVEL_STALE_SEC:
+        _overlay.set_level(0.0, False)
+    else:
+        _overlay.set_level(level.rms, level.voice)
+    _meter_job = _root.after(int(1000 / METER_FPS), _meter_frame)
 
-    def _start_move(self, event):
-        self._offset_x = event.x; self._offset_y = event.y
 
-    def _on_move(self, event):
-        x = self.winfo_pointerx() - self._offset_x
-        y = self.winfo_pointery() - self._offset_y
-        self.geometry(f"+{x}+{y}")
+def _start_meter():
+    if _meter_job is None:
+        _meter_frame()
 
-    def _schedule_tick(self):
-        self._timer_job_id = self.after(1000, self._tick)
 
-    def _tick(self):
-        try:
-            if self.winfo_exists() and not self.is_paused:
-                self._seconds_elapsed += 1
-                m = self._seconds_elapsed // 60; s = self._seconds_elapsed % 60
-                self.timer_label.configure(text=f"{m}:{s:02d}")
-        finally:
-            if self.winfo_exists():
-                self._schedule_tick()
-
-    def _on_destroy(self, _):
-        if self._timer_job_id:
-            try: self.after_cancel(self._timer_job_id)
-            except Exception: pass
-            self._timer_job_id = None
-
-    def set_paused(self, value: bool):
-        self.is_paused = value
+def _stop_meter():
+    global _meter_job
+    if _meter_job is not None:
         try:
-            self.pause_button.configure(text='▶' if value else '⏸')
-            self.rec_indicator.configure(fg_color='#ffa089' if value else '#ff6a45')
+            _root.after_cancel(_meter_job)
         except Exception:
             pass
+        _meter_job = None
 
-    def reset(self):
-        self._seconds_elapsed = 0
-        try: self.timer_label.configure(text='0:00')
-        except Exception: pass
+
+def _drain_updates():
+    try:
+        while True:
+            try:
+                action, value = _updates.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                _apply(action, value)
+            except Exception as e:
+                log.error('Overlay update %s failed: %s', action, e)
+    finally:
+        _root.after(UPDATE_INTERVAL_MS, _drain_updates)
 
 
 def _tk_thread():
     global _root
+    import customtkinter as ctk
     ctk.set_appearance_mode('System')
     _root = ctk.CTk()
     _root.withdraw()
     _root.protocol('WM_DELETE_WINDOW', lambda: None)
+    try:
+        _build_overlay()
+    except Exception as e:
+        log.error('Overlay build failed: %s', e)
+    _root.after(UPDATE_INTERVAL_MS, _drain_updates)
     _root.mainloop()
 
 
 def init_overlay(pause_toggle_cb, stop_cb, cancel_cb, restart_cb):
+    """Start the Tk thread and build the (hidden) overlay window on it."""
     if not USE_OVERLAY:
         return
     global _thread
@@ -180,45 +151,45 @@ def init_overlay(pause_toggle_cb, stop_cb, cancel_cb, restart_cb):
     _callbacks['cancel'] = cancel_cb
     _callbacks['restart'] = restart_cb
     if _thread is None or not _thread.is_alive():
-        _thread = threading.Thread(target=_tk_thread, daemon=True)
+        _thread = threading.Thread(target=_tk_thread, name='overlay-tk', daemon=True)
         _thread.start()
 
 
 def show_overlay():
+    """Show the overlay with a fresh timer (from any thread)."""
     if not USE_OVERLAY:
         return
-    def _create():
-        global _overlay
-        if _overlay is None or not _overlay.winfo_exists():
-            _overlay = RecordingOverlay(
-                _root,
-                on_pause_toggle=_callbacks['pause_toggle'],
-                on_stop=_callbacks['stop'],
-                on_cancel=_callbacks['cancel'],
-                on_restart=_callbacks['restart'],
-            )
-        else:
-            _overlay.reset(); _overlay.set_paused(False); _overlay.deiconify()
-    if _root:
-        _root.after(0, _create)
+    _updates.put(('show', time.perf_counter()))
 
 
 def set_paused_overlay(value: bool):
-    if not USE_OVERLAY or _root is None:
+    if not USE_OVERLAY:
         return
-    def _p():
-        if _overlay and _overlay.winfo_exists():
-            _overlay.set_paused(value)
-    _root.after(0, _p)
+    _updates.put(('paused', bool(value)))
 
 
-def destroy_overlay():
-    if not USE_OVERLAY or _root is None:
+def hide_overlay():
+    """Hide the overlay; the window is kept for the next recording (from any thread)."""
+    if not USE_OVERLAY:
         return
-    def _d():
-        global _overlay
-        if _overlay and _overlay.winfo_exists():
-            try: _overlay.destroy()
-            except Exception: pass
-        _overlay = None
-    _root.after(0, _d)
+    _updates.put(('hide', None))
+
+
+destroy_overlay = hide_overlay  # backward compatible name
+
+
+def overlay_stats():
+    """Time-to-visible of recent show_overlay() calls.
+
+    Returns:
+        dict with keys: count, last_ms, median_ms, max_ms (None values when no samples)
+    """
+    samples = list(_time_to_visible)
+    if not samples:
+        return {"count": 0, "last_ms": None, "median_ms": None, "max_ms": None}
+    return {
+        "count": len(samples),
+        "last_ms": round(samples[-1] * 1000, 2),
+        "median_ms": round(statistics.median(samples) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2),
+    }
@@ -1,51 +1,91 @@
 import os
-import json
+import sys
+import logging
+import itertools
+import queue
 import threading
 import tempfile
 import time
 import wave
-import pyaudio
-import pyperclip
-import pyautogui
-import numpy as np
-import winsound
-import shutil
 from datetime import datetime
 from dotenv import load_dotenv
+from . import history_archive, history_store
+from .level_meter import input_level
+
+log = logging.getLogger(__name__)
+
+# numpy, PyAudio, the sound engine and history_meta are imported where first
+# used, so importing this module stays cheap at startup.
 
 # Load API key from .env file
 load_dotenv()
 
 # Audio settings
-AUDIO_FORMAT = pyaudio.paInt16
+AUDIO_FORMAT = 8  # pyaudio.paInt16
 CHANNELS = 1
 RATE = 16000
 CHUNK = 512  # Smaller chunk for lower latency capture (was 1024)
 TEMP_DIRECTORY = tempfile.gettempdir()
 SELECTED_DEVICE_INDEX = None  # None means use default device
+SELECTED_DEVICE_INDEXES = []  # several devices to record in parallel (overrides SELECTED_DEVICE_INDEX)
+AUDIO_SOURCE = None  # None: microphone through PyAudio; else an audio_sources source (see set_audio_source)
+CHUNK_RECORDING_DIR = None  # when set, captured chunks are also written here (see set_chunk_recording)
+_devices_cache = None  # last get_audio_devices() result
 
-# History settings
-HISTORY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'history')
-HISTORY_FILE = os.path.join(HISTORY_DIR, 'history.json')
+# History settings (owned by history_store; kept here for backward compatibility)
+HISTORY_DIR = history_store.HISTORY_DIR
+HISTORY_FILE = history_store.HISTORY_FILE
 
 # Silence detection settings
 SILENCE_THRESHOLD = 50  # Amplitude threshold for silence detection (can be updated at runtime)
 MIN_VOICE_PERCENTAGE = 0.05  # Minimum percentage of non-silent chunks to consider as valid speech
 
-# Global variables
-recording = False
-paused = False
-cancelled = False
-stop_event = threading.Event()
-pause_event = threading.Event()
+# Recording state lives in `controller` (RecordingController, below)
 app = None  # Legacy reference (tkinter app); kept for backward compatibility
-active_session_id = None  # identifies the most recent recording session
-is_playing_audio = False  # tracks if audio playback is active
+MIN_RECORDING_DURATION = 0.6  # seconds; shorter recordings are treated as accidental
 
 # Callback hooks for new (Eel) UI
 on_transcription_done_callback = None
 on_recording_completed_callback = None
 
+# ---------------- Event bus -----------------
+# Subscribers get (event, data) from whichever thread emits. Events:
+#   playback        state: started|finished, filename (None for feedback cues)
+#   recording_state phase: recording|transcribing|idle, recording, paused
+#   vad_level       level (mean |amplitude| of the last chunk), voice (bool)
+#   transcription   stage: started|done|failed, session_id (and device) or filename
+#   transcript      session_id, device, text (a finished dictation that is still current)
+_subscribers = []
+_subscribers_lock = threading.Lock()
+
+def subscribe(callback):
+    """Register callback(event: str, data: dict) for recorder events.
+
+    Returns:
+        function that unsubscribes the callback
+    """
+    with _subscribers_lock:
+        _subscribers.append(callback)
+
+    def unsubscribe():
+        with _subscribers_lock:
+            if callback in _subscribers:
+                _subscribers.remove(callback)
+    return unsubscribe
+
+def emit(event, **data):
+    """Send an event to all subscribers (callbacks must be quick; errors are printed)."""
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+    for callback in subscribers:
+        try:
+            callback(event, data)
+        except Exception as e:
+            log.error("Event subscriber error (%s): %s", event, e)
+
+def _emit_recording_state(phase):
+    emit('recording_state', phase=phase, recording=is_recording(), paused=is_paused())
+
 def set_callbacks(on_transcription_done=None, on_recording_completed=None):
     """Register UI callbacks (used by Eel web UI).
 
@@ -59,39 +99,85 @@ def set_callbacks(on_transcription_done=None, on_recording_completed=None):
     if on_recording_completed is not None:
         on_recording_completed_callback = on_recording_completed
 
-def play_audio(file_path, wait=False):
-    """Plays WAV file for audio feedback"""
-    global is_playing_audio
+def _pyaudio():
+    """Import PyAudio on first use (loading PortAudio is slow)."""
+    import pyaudio
+    return pyaudio
+
+def set_audio_source(source):
+    """Capture from another source than the microphone.
+
+    Args:
+        source: an audio_sources source (WavFileSource, SyntheticSource,
+            ReplaySource, ...), or None for the microphone
+    """
+    global AUDIO_SOURCE
+    AUDIO_SOURCE = source
+
+def set_chunk_recording(directory):
+    """Also write every captured chunk stream to directory, for replay with audio_sources.ReplaySource.
+
+    Args:
+        directory: folder for the .chunks files, or None to stop recording chunks
+    """
+    global CHUNK_RECORDING_DIR
+    if directory:
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            log.warning("Cannot record chunks to %s: %s", directory, e)
+            directory = None
+    CHUNK_RECORDING_DIR = directory or None
+
+def _open_source():
+    """The source for one recording (the caller closes it)."""
+    if AUDIO_SOURCE is not None:
+        return AUDIO_SOURCE
+    from .audio_sources import PyAudioSource
+    return PyAudioSource(_pyaudio(), AUDIO_FORMAT, CHUNK)
+
+def play_audio(file_path, wait=False, filename=None):
+    """Plays WAV file for audio feedback
+
+    Cue sounds (audio/*.wav) come from the sound engine's preloaded PCM; other
+    files are decoded on demand. Sounds are mixed, so a cue does not interrupt
+    history playback.
+
+    filename names the history entry being played (None for feedback cues) and is
+    passed along in playback events.
+
+    Returns:
+        the sound engine voice id
+    """
     if not file_path.endswith('.wav'):
         raise Exception('Only .wav files are supported')
-    # Resolve relative path robustly (works when launched from different CWD or frozen exe)
-    if not os.path.isabs(file_path) and not os.path.exists(file_path):
-        candidate = os.path.join(os.path.dirname(__file__), file_path)
-        if os.path.exists(candidate):
-            file_path = candidate
-        else:
-            # Allow shorthand like 'audio/done.wav' vs full path
-            audio_dir_candidate = os.path.join(os.path.dirname(__file__), 'audio', os.path.basename(file_path))
-            if os.path.exists(audio_dir_candidate):
-                file_path = audio_dir_candidate
-    is_playing_audio = True
-    if wait:
-        winsound.PlaySound(file_path, winsound.SND_FILENAME)
-        is_playing_audio = False
+    from . import sound
+
+    def finished(_voice_id):
+        emit('playback', state='finished', filename=filename)
+
+    cue = None
+    if filename is None:
+        sound.init()  # no-op once running; loads the cues on first use
+        cue = sound.get_cue(file_path)
+    emit('playback', state='started', filename=filename)
+    if cue is not None:
+        voice_id = sound.play(cue, on_finished=finished)
     else:
-        winsound.PlaySound(file_path, winsound.SND_FILENAME | winsound.SND_ASYNC)
-        # For async playback, we'll clear the flag after a reasonable duration
-        # or let stop_audio handle it
+        voice_id = sound.play_file(file_path, on_finished=finished)
+    if wait:
+        sound.wait(voice_id)
+    return voice_id
 
 def stop_audio():
     """Stop any currently playing audio"""
-    global is_playing_audio
-    winsound.PlaySound(None, winsound.SND_PURGE)
-    is_playing_audio = False
+    from . import sound
+    sound.stop()
 
 def is_audio_playing():
-    """Check if audio is currently playing"""
-    return is_playing_audio
+    """Check if audio is currently playing (until the last sample has left the speakers)"""
+    from . import sound
+    return sound.is_playing()
 
 def set_silence_threshold(value):
     """Update the global silence threshold used by is_silence().
@@ -105,19 +191,31 @@ def set_silence_threshold(value):
         if v < 1:
             v = 1
         SILENCE_THRESHOLD = v
-        print(f"Silence threshold set to {SILENCE_THRESHOLD}")
-    except Exception as _e:
-        pass
+        # history_meta (numpy, soundfile) is not imported just for this; it reads
+        # SILENCE_THRESHOLD when it is imported (see history_meta._silence_threshold)
+        history_meta = sys.modules.get(f'{__package__}.history_meta')
+        if history_meta is not None:
+            history_meta.set_silence_threshold(v)
+        log.info("Silence threshold set to %s", SILENCE_THRESHOLD)
+    except Exception as e:
+        log.warning("Invalid silence threshold %r: %s", value, e)
 
-def get_audio_devices():
+def get_audio_devices(cached=False):
     """Get list of available audio input devices.
 
+    Args:
+        cached: reuse the result of the last enumeration if there is one
+            (opening PortAudio to enumerate takes a noticeable moment)
+
     Returns:
         list of dicts with keys: index, name, max_inputs
     """
+    global _devices_cache
+    if cached and _devices_cache is not None:
+        return list(_devices_cache)
     devices = []
     try:
-        p = pyaudio.PyAudio()
+        p = _pyaudio().PyAudio()
         for i in range(p.get_device_count()):
             try:
                 info = p.get_device_info_by_index(i)
@@ -132,7 +230,8 @@ def get_audio_devices():
         p.terminate()
     except Exception:
         pass
-    return devices
+    _devices_cache = devices
+    return list(devices)
 
 def set_audio_device(device_index):
     """Set the audio input device to use for recording.
@@ -147,22 +246,45 @@ def set_audio_device(device_index):
         try:
             device_index = int(device_index)
             # Validate device exists
-            devices = get_audio_devices()
+            devices = get_audio_devices(cached=True)
             if any(d['index'] == device_index for d in devices):
                 SELECTED_DEVICE_INDEX = device_index
             else:
-                print(f"Invalid device index: {device_index}")
+                log.warning("Invalid device index: %s", device_index)
         except Exception:
-            print(f"Invalid device index: {device_index}")
+            log.warning("Invalid device index: %s", device_index)
+
+def set_audio_devices(device_indexes):
+    """Record several input devices in parallel, one stream and transcript each.
+
+    Args:
+        device_indexes: list of device indexes; empty (or None) records only the
+            device chosen with set_audio_device
+    """
+    global SELECTED_DEVICE_INDEXES
+    valid = []
+    devices = get_audio_devices(cached=True) if device_indexes else []
+    for device_index in device_indexes or []:
+        try:
+            device_index = int(device_index)
+        except (TypeError, ValueError):
+            log.warning("Invalid device index: %s", device_index)
+            continue
+        if any(d['index'] == device_index for d in devices):
+            if device_index not in valid:
+                valid.append(device_index)
+        else:
+            log.warning("Invalid device index: %s", device_index)
+    SELECTED_DEVICE_INDEXES = valid
+
+def chunk_amplitude(data):
+    """Average absolute amplitude of a chunk of 16-bit audio"""
+    import numpy as np
+    return float(np.abs(np.frombuffer(data, dtype=np.int16)).mean())
 
 def is_silence(data):
     """Determine if an audio chunk is silence based on amplitude threshold"""
-    # Convert bytes to numpy array
-    audio_array = np.frombuffer(data, dtype=np.int16)
-    # Calculate the average absolute amplitude
-    amplitude = np.abs(audio_array).mean()
-    print("amplitude:", amplitude)  # Debugging line to check amplitude
-    return amplitude < SILENCE_THRESHOLD
+    return chunk_amplitude(data) < SILENCE_THRESHOLD
 
 def calibrate_noise_floor(duration_sec: float = 2.0) -> dict:
     """Sample ambient audio to estimate noise floor and propose a silence threshold.
@@ -176,21 +298,22 @@ def calibrate_noise_floor(duration_sec: float = 2.0) -> dict:
     if duration_sec is None or duration_sec <= 0:
         duration_sec = 2.0
 
-    # Initialize PyAudio
-    p = pyaudio.PyAudio()
-    stream = p.open(
-        format=AUDIO_FORMAT,
-        channels=CHANNELS,
-        rate=RATE,
-        input=True,
-        input_device_index=SELECTED_DEVICE_INDEX,
-        frames_per_buffer=CHUNK
-    )
+    import numpy as np
+    # Open the input (the microphone unless another source is set)
+    source = _open_source()
+    try:
+        stream = source.open(SELECTED_DEVICE_INDEX)
+    except Exception:
+        source.close()
+        raise
     try:
         num_chunks = int(max(1, RATE / CHUNK * duration_sec))
         amplitudes = []
         for _ in range(num_chunks):
-            data = stream.read(CHUNK, exception_on_overflow=False)
+            try:
+                data = stream.read(CHUNK)
+            except EOFError:
+                break
             audio_array = np.frombuffer(data, dtype=np.int16)
             amp = float(np.abs(audio_array).mean())
             amplitudes.append(amp)
@@ -213,150 +336,449 @@ def calibrate_noise_floor(duration_sec: float = 2.0) -> dict:
             "threshold": proposed,
         }
     finally:
-        try:
-            stream.stop_stream()
-        except Exception:
-            pass
         try:
             stream.close()
         except Exception:
             pass
-        p.terminate()
+        source.close()
 
-def record_audio(session_id):
-    """Records audio from microphone until stop_event is set, filtering out silence.
+def capture_devices():
+    """Input devices a recording captures from: SELECTED_DEVICE_INDEXES when set, else the one device."""
+    return list(SELECTED_DEVICE_INDEXES) or [SELECTED_DEVICE_INDEX]
 
-    Returns (filepath_or_None, aborted_bool, duration_seconds)
-    aborted_bool True means recording became stale/cancelled and should be ignored silently.
-    duration_seconds is the actual recording duration in seconds.
+class StreamCapture:
+    """Voice detection and buffering for one input stream of a recording.
+
+    Keeps a short pre-roll so speech right after the start sound isn't lost,
+    drops long silences but keeps a little trailing silence for natural
+    transitions, and counts voice/silence chunks for the speech check.
     """
-    # Create a temporary file for the recording
-    timestamp = time.strftime("%Y%m%d-%H%M%S")
-    temp_file = os.path.join(TEMP_DIRECTORY, f"recording_{timestamp}.wav")
-    
-    # Initialize PyAudio
-    p = pyaudio.PyAudio()
-    
-    # Open audio stream
-    stream = p.open(
-        format=AUDIO_FORMAT,
-        channels=CHANNELS,
-        rate=RATE,
-        input=True,
-        input_device_index=SELECTED_DEVICE_INDEX,
-        frames_per_buffer=CHUNK
-    )
-    
-    print("Recording started...")
-    start_time = time.time()
-    frames = []
-    pre_roll = []  # capture a small pre-roll so speech right after start sound isn't lost
     MAX_PRE_ROLL_FRAMES = int(RATE / CHUNK * 0.6)  # ~600ms
-    silence_count = 0
-    voice_count = 0
-    consecutive_silence = 0
-    recording_voice = False
     TRAILING_SILENCE_CHUNKS = 12  # Keep ~0.75 seconds of trailing silence for natural transitions
-    
-    # Record audio in chunks until stop_event is set
-    aborted = False
-    while not stop_event.is_set():
-        # If session became stale or cancelled, abort immediately (no save, no stats)
-        if cancelled or session_id != active_session_id:
-            aborted = True
-            break
-        data = stream.read(CHUNK, exception_on_overflow=False)
 
+    def __init__(self, temp_file, device_index=None, primary=True):
+        self.temp_file = temp_file
+        self.device_index = device_index
+        self.primary = primary  # drives the level meter and vad_level events
+        self.frames = []
+        self.pre_roll = []
+        self.silence_count = 0
+        self.voice_count = 0
+        self.consecutive_silence = 0
+        self.recording_voice = False
+        self.debug = log.isEnabledFor(logging.DEBUG)  # checked once: per-chunk logging is free when off
+
+    def feed(self, data, paused=False):
+        """Process one chunk (while paused, only the pre-roll is kept up to date)."""
         # Accumulate pre-roll until user begins speaking; maintain sliding window
-        if len(pre_roll) < MAX_PRE_ROLL_FRAMES:
+        pre_roll = self.pre_roll
+        if len(pre_roll) < self.MAX_PRE_ROLL_FRAMES:
             pre_roll.append(data)
         else:
             pre_roll.pop(0); pre_roll.append(data)
 
         # If paused, drain audio but do not process/append
-        if pause_event.is_set():
-            continue
+        if paused:
+            return
 
         # Check if the chunk is silence
-        if is_silence(data):
-            silence_count += 1
-            consecutive_silence += 1
+        amplitude = chunk_amplitude(data)
+        silent = amplitude < SILENCE_THRESHOLD
+        if self.primary:
+            emit('vad_level', level=amplitude, voice=not silent)
+            input_level.feed(data, voice=not silent)
+        if self.debug:
+            log.debug("chunk amplitude %.1f (%s) on device %s", amplitude,
+                      'silence' if silent else 'voice', self.device_index)
+        if silent:
+            self.silence_count += 1
+            self.consecutive_silence += 1
 
             # Keep trailing silence for smooth transitions (avoid harsh cuts)
-            if recording_voice and consecutive_silence <= TRAILING_SILENCE_CHUNKS:
-                frames.append(data)
-            elif recording_voice and consecutive_silence > TRAILING_SILENCE_CHUNKS:
+            if self.recording_voice and self.consecutive_silence <= self.TRAILING_SILENCE_CHUNKS:
+                self.frames.append(data)
+            elif self.recording_voice and self.consecutive_silence > self.TRAILING_SILENCE_CHUNKS:
                 # We've had enough silence, stop recording voice but keep the buffer
-                recording_voice = False
+                self.recording_voice = False
         else:
-            voice_count += 1
-            consecutive_silence = 0
-            
+            self.voice_count += 1
+            self.consecutive_silence = 0
+
             # If we weren't recording, append the pre-roll buffer for smooth attack
-            if not recording_voice and pre_roll:
-                frames.extend(pre_roll)
+            if not self.recording_voice and pre_roll:
+                self.frames.extend(pre_roll)
                 pre_roll.clear()
-            
-            recording_voice = True
-            frames.append(data)
-    
-    # Stop and close the stream
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
-    
+
+            self.recording_voice = True
+            self.frames.append(data)
+
+    @property
+    def voice_percentage(self):
+        total_chunks = self.silence_count + self.voice_count
+        return self.voice_count / total_chunks if total_chunks > 0 else 0
+
+    def save(self, sample_width=2):
+        """Write the kept audio to temp_file; returns its path, or None if there is too little speech."""
+        log.debug("Voice detected in %.1f%% of the recording (device %s)",
+                  self.voice_percentage * 100, self.device_index)
+
+        # If there's not enough voice, return None
+        if self.voice_percentage < MIN_VOICE_PERCENTAGE:
+            log.info("Not enough speech detected. Skipping transcription.")
+            return None
+
+        # Save the recorded audio to the temporary file
+        with wave.open(self.temp_file, 'wb') as wf:
+            wf.setnchannels(CHANNELS)
+            wf.setsampwidth(sample_width)
+            wf.setframerate(RATE)
+            wf.writeframes(b''.join(self.frames))
+
+        log.debug("Recording saved to %s", self.temp_file)
+        file_size = os.path.getsize(self.temp_file)
+        log.debug("File size: %.2f MB", file_size / (1024 * 1024))
+        return self.temp_file
+
+def record_audio(session):
+    """Records audio from the capture devices until the session is stopped, filtering out silence.
+
+    Runs on the controller's capture worker, one session at a time. With
+    several devices (SELECTED_DEVICE_INDEXES), all of their streams are read by
+    this one thread, each with its own voice detection and buffer. Audio comes
+    from the microphone unless another source was set with set_audio_source();
+    a file or replay source that runs out ends the recording as if stopped.
+
+    Returns (captures, aborted_bool, duration_seconds)
+    captures is a list of (device_index, filepath_or_None), one per stream.
+    aborted_bool True means recording became stale/cancelled and should be ignored silently.
+    duration_seconds is the actual recording duration in seconds.
+    """
+    devices = capture_devices()
+    # Create a temporary file per stream for the recording
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+
+    # One source (one PyAudio instance for the microphone) for all streams
+    source = _open_source()
+
+    # Open audio streams
+    streams = []
+    try:
+        for n, device_index in enumerate(devices):
+            try:
+                stream = source.open(device_index)
+            except Exception as e:
+                if len(devices) == 1:
+                    raise
+                log.warning("Cannot open input device %s: %s", device_index, e)
+                continue
+            suffix = f"_{n}" if len(devices) > 1 else ""
+            name = f"recording_{timestamp}_{session.id}{suffix}"
+            if CHUNK_RECORDING_DIR:
+                from .audio_sources import ChunkRecorder
+                stream = ChunkRecorder(stream, os.path.join(CHUNK_RECORDING_DIR, name + '.chunks'))
+            temp_file = os.path.join(TEMP_DIRECTORY, name + '.wav')
+            streams.append((stream, StreamCapture(temp_file, device_index, primary=not streams)))
+        if not streams:
+            raise RuntimeError("no input device could be opened")
+    except Exception:
+        _close_streams(streams, source)
+        raise
+
+    try:
+        return _capture(session, streams, source.sample_width)
+    finally:
+        # Stop and close the streams, whatever happened while capturing
+        _close_streams(streams, source)
+        input_level.reset()
+
+def _close_streams(streams, source):
+    for stream, _capture_state in streams:
+        try:
+            stream.close()
+        except Exception:
+            pass
+    source.close()
+
+def _capture(session, streams, sample_width):
+    log.info("Recording started on %d stream(s)", len(streams))
+    _emit_recording_state('recording')
+    start_time = time.time()
+    poll_interval = CHUNK / float(RATE) / 4
+
+    # Record audio in chunks until the session is stopped
+    aborted = False
+    while not session.stop_event.is_set():
+        # If the session was cancelled, abort immediately (no save, no stats)
+        if session.cancelled:
+            aborted = True
+            break
+        paused = session.pause_event.is_set()
+        try:
+            if len(streams) == 1:
+                stream, capture = streams[0]
+                capture.feed(stream.read(CHUNK), paused)
+                continue
+            # Several devices: read whatever each stream has buffered, so one thread
+            # keeps up with all of them without blocking on any single device
+            progressed = False
+            for stream, capture in streams:
+                while stream.available() >= CHUNK:
+                    capture.feed(stream.read(CHUNK), paused)
+                    progressed = True
+        except EOFError:
+            # A file or replay source ran out: finish as if the user had stopped
+            log.info("Audio source ended")
+            break
+        if not progressed:
+            time.sleep(poll_interval)
+
     # Calculate recording duration
     duration_seconds = time.time() - start_time
-    
-    # Handle abort
-    if aborted:
+
+    # Handle abort (also a cancel that landed after the last chunk)
+    if aborted or session.cancelled:
         # Clean up stream, return without saving
-        return None, True, duration_seconds
+        return [(capture.device_index, None) for _stream, capture in streams], True, duration_seconds
+
+    captures = [(capture.device_index, capture.save(sample_width)) for _stream, capture in streams]
+    return captures, False, duration_seconds
+
+# ---------------- Recording sessions -----------------
+# Hotkey hooks, eel greenlets, the overlay's Tk thread and the tray all start
+# and stop recordings. Every transition goes through one controller lock, and
+# one long-lived capture worker records the sessions strictly one after
+# another, so there is never more than one session's streams open (one stream,
+# or one per device with SELECTED_DEVICE_INDEXES). Transcription of a finished
+# capture runs on its own thread per stream and does not hold up the next
+# recording.
+#
+# Session states: recording <-> paused -> stopped (audio kept) | cancelled
+
+class RecordingSession:
+    def __init__(self, session_id):
+        self.id = session_id
+        self.state = 'recording'
+        self.stop_event = threading.Event()   # capture loop exits when set
+        self.pause_event = threading.Event()  # capture drains but discards audio while set
+        self.captured = threading.Event()     # capture finished and its stream is closed
+
+    @property
+    def cancelled(self):
+        return self.state == 'cancelled'
+
 
-    # Get voice percentage to determine if there's actual speech
-    total_chunks = silence_count + voice_count
-    voice_percentage = voice_count / total_chunks if total_chunks > 0 else 0
+class RecordingController:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._session = None      # session being recorded (recording or paused)
+        self._latest_id = None    # newest session; results of older ones are stale
+        self._sessions = queue.Queue()  # sessions for the capture worker, in start order
+        self._worker = None
+        self._capturing = 0       # sessions queued or being captured
+        self._finishing = set()   # transcription threads still running
 
-    print(f"Voice detected in {voice_percentage:.1%} of the recording")
+    # ---- state ----
+    @property
+    def state(self):
+        """'idle', 'recording' or 'paused'."""
+        with self._lock:
+            return self._session.state if self._session else 'idle'
 
-    # If there's not enough voice, return None
-    if voice_percentage < MIN_VOICE_PERCENTAGE:
-        print("Not enough speech detected. Skipping transcription.")
-        return None, False, duration_seconds
+    def is_current(self, session):
+        """Whether no newer session has been started since this one."""
+        with self._lock:
+            return session.id == self._latest_id
 
-    # Save the recorded audio to the temporary file
-    with wave.open(temp_file, 'wb') as wf:
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(p.get_sample_size(AUDIO_FORMAT))
-        wf.setframerate(RATE)
-        wf.writeframes(b''.join(frames))
+    # ---- transitions (callable from any thread) ----
+    def start(self):
+        """Begin a new session; returns it, or None if one is already recording."""
+        with self._lock:
+            if self._session is not None:
+                return None
+            session = self._begin()
+        _emit_recording_state('recording')
+        return session
 
-    print(f"Recording saved to {temp_file}")
-    file_size = os.path.getsize(temp_file)
-    print(f"File size: {file_size / (1024 * 1024):.2f} MB")
+    def stop(self):
+        """Finish the current session and keep its audio. Returns False if idle."""
+        return self._end('stopped')
 
-    return temp_file, False, duration_seconds
+    def cancel(self):
+        """Discard the current session. Returns False if idle."""
+        return self._end('cancelled')
+
+    def restart(self):
+        """Atomically discard the current session (if any) and start a new one."""
+        with self._lock:
+            if self._session is not None:
+                self._finish(self._session, 'cancelled')
+            session = self._begin()
+        _emit_recording_state('recording')
+        return session
+
+    def set_paused(self, value):
+        """Pause or resume the current session. Returns the new paused state."""
+        with self._lock:
+            session = self._session
+            if session is None:
+                return False
+            if value:
+                session.state = 'paused'
+                session.pause_event.set()
+            else:
+                session.state = 'recording'
+                session.pause_event.clear()
+        if value:
+            input_level.reset()
+        _emit_recording_state('recording')
+        return bool(value)
+
+    def _begin(self):
+        session = RecordingSession(next(self._ids))
+        self._session = session
+        self._latest_id = session.id
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._capture_loop, name='capture', daemon=True)
+            self._worker.start()
+        self._capturing += 1
+        self._sessions.put(session)
+        return session
+
+    def _end(self, state):
+        with self._lock:
+            session = self._session
+            if session is None:
+                return False
+            self._finish(session, state)
+        return True
+
+    def _finish(self, session, state):
+        session.state = state
+        session.pause_event.clear()
+        session.stop_event.set()
+        self._session = None
+
+    # ---- worker ----
+    def _capture_loop(self):
+        while True:
+            session = self._sessions.get()
+            if session is None:
+                return
+            captures, duration = [], 0.0
+            try:
+                # Sessions stopped or cancelled before the worker got to them never open a stream
+                if not session.stop_event.is_set():
+                    captures, aborted, duration = record_audio(session)
+                    if aborted:
+                        captures = []
+            except Exception as e:
+                log.error("Recording failed: %s", e)
+                # Nothing is being captured for it any more: end the session
+                with self._lock:
+                    if self._session is session:
+                        self._finish(session, 'cancelled')
+            with self._lock:
+                if self._session is session:
+                    # The source ended (file or replay) while the session was still recording
+                    self._finish(session, 'stopped')
+            # The device is only reported when several were recorded
+            kept = [(device if len(captures) > 1 else None, path) for device, path in captures if path]
+            if not kept and (session.cancelled or duration < MIN_RECORDING_DURATION):
+                self._captured(session)
+                self._emit_idle()
+                continue
+            # Fan out: one transcription per stream that has speech
+            kept = kept or [(None, None)]
+            threads = [threading.Thread(target=self._finish_session, args=(session, path, duration, device),
+                                        name=f'transcribe-{session.id}' + (f'.{n}' if len(kept) > 1 else ''),
+                                        daemon=True)
+                       for n, (device, path) in enumerate(kept)]
+            with self._lock:
+                self._finishing.update(threads)
+            self._captured(session)
+            for t in threads:
+                t.start()
+
+    def _captured(self, session):
+        with self._lock:
+            self._capturing -= 1
+        session.captured.set()
+
+    def _finish_session(self, session, audio_file, duration, device_index=None):
+        try:
+            _process_speech(session, audio_file, duration, device_index)
+        except Exception as e:
+            log.error("Processing recording failed: %s", e)
+        finally:
+            with self._lock:
+                self._finishing.discard(threading.current_thread())
+            self._emit_idle()
+
+    def _emit_idle(self):
+        # A newer session may already be recording
+        if self.state == 'idle':
+            _emit_recording_state('idle')
+
+    def wait_idle(self, timeout=None):
+        """Wait until nothing is recording, capturing or transcribing. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if self._session is None and not self._capturing and not self._finishing:
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    def shutdown(self, timeout=None):
+        """Cancel any recording and stop the capture worker."""
+        self.cancel()
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._sessions.put(None)
+            worker.join(timeout)
+
+
+controller = RecordingController()
+
+def start_recording():
+    """Start a recording session; returns it, or None if already recording."""
+    return controller.start()
+
+def stop_recording():
+    """Stop recording and transcribe; returns False if nothing was recording."""
+    return controller.stop()
+
+def cancel_recording():
+    """Stop recording and discard the audio; returns False if nothing was recording."""
+    return controller.cancel()
+
+def restart_recording():
+    """Discard the current recording (if any) and start a new one; returns the new session."""
+    return controller.restart()
 
 def set_paused(value: bool):
-    global paused
-    paused = bool(value)
-    if paused:
-        pause_event.set()
-    else:
-        pause_event.clear()
+    return controller.set_paused(value)
+
+def is_recording() -> bool:
+    """True while a session is recording or paused."""
+    return controller.state != 'idle'
+
+def is_paused() -> bool:
+    return controller.state == 'paused'
 
 def get_recording_state() -> bool:
-    return globals().get("recording", False)
+    return is_recording()
 
 # --- History Management Functions ---
+# History state lives in history_store (in-memory list + single background writer);
+# these wrappers add the audio-file side of each operation.
 
 def ensure_history_dir():
-    """Ensure the history directory and JSON file exist."""
-    if not os.path.exists(HISTORY_DIR):
-        os.makedirs(HISTORY_DIR)
-    if not os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump([], f)
+    """Ensure the history directory and JSON file exist and are loaded."""
+    history_store.load()
 
 def get_history():
     """Get the list of all recordings from history.
@@ -364,78 +786,93 @@ def get_history():
     Returns:
         list of dicts with keys: filename, timestamp, transcript
     """
-    ensure_history_dir()
-    try:
-        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception:
-        return []
+    return history_store.get_entries()
+
+def get_history_page(cursor=None, limit=50, sort='newest'):
+    """Get one page of history.
+
+    Args:
+        cursor: opaque value from a previous page's next_cursor, or None for the first page
+        limit: maximum number of entries to return (1-500)
+        sort: 'newest' (default), or 'longest'/'shortest' (only analysed entries)
+
+    Returns:
+        dict with keys: items (with "meta" once analysed), next_cursor (None on the
+        last page), total, version
+    """
+    from . import history_meta
+    if sort in ('longest', 'shortest'):
+        return history_meta.get_sorted_page(cursor, limit, descending=(sort == 'longest'))
+    page = history_store.get_page(cursor, limit)
+    history_meta.attach_summaries(page["items"])
+    return page
+
+def get_history_waveform(filename, buckets=400):
+    """Precomputed min/max peaks of a history recording at roughly `buckets` resolution."""
+    from . import history_meta
+    return history_meta.get_waveform(filename, buckets)
+
+def get_history_version():
+    """Current history version number."""
+    return history_store.get_version()
+
+def get_history_changes(since_version):
+    """Get history mutations newer than since_version.
 
-def save_recording_to_history(audio_path, transcript):
+    Returns:
+        dict with keys: version, changes (oldest first; entries or tombstones),
+        reset (True when the client must reload)
+    """
+    return history_store.get_changes(since_version)
+
+def flush_history(timeout=None):
+    """Wait until all pending history writes are on disk."""
+    return history_store.flush(timeout)
+
+def save_recording_to_history(audio_path, transcript, device_index=None):
     """Move the recorded audio file to history and save its transcript.
+
+    Audio is stored once per content hash; a retried or re-saved identical
+    recording shares the existing file.
     
     Args:
         audio_path: path to the temporary audio file
         transcript: transcribed text (can be None or empty)
+        device_index: input device, recorded for multi-device captures
     """
     ensure_history_dir()
     if not audio_path or not os.path.exists(audio_path):
         return
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"recording_{timestamp}.wav"
-    dest_path = os.path.join(HISTORY_DIR, filename)
-    
-    try:
-        shutil.move(audio_path, dest_path)
-        print(f"Saved recording to history: {dest_path}")
-    except Exception as e:
-        print(f"Error moving file to history: {e}")
-        return
-
+    now = datetime.now()
+    # The store picks recording_<ts>_<n>.wav if another save took this name
     entry = {
-        "filename": filename,
-        "timestamp": datetime.now().isoformat(),
+        "filename": f"recording_{now.strftime('%Y%m%d_%H%M%S')}.wav",
+        "timestamp": now.isoformat(),
         "transcript": transcript or ""
     }
-
-    history = get_history()
-    history.insert(0, entry)  # Add to beginning (newest first)
-
+    if device_index is not None:
+        entry["device"] = device_index
     try:
-        with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
+        change = history_archive.store_audio_file(audio_path, entry)
+        log.info("Saved recording to history: %s", change['entry']['audio'])
     except Exception as e:
-        print(f"Error saving history json: {e}")
+        log.error("Error moving file to history: %s", e)
+        return
+    from . import history_meta
+    history_meta.enqueue(change['filename'])
 
 def delete_history_item(filename):
-    """Delete a recording from history (both file and JSON entry).
+    """Delete a recording from history (JSON entry, and the audio file once unused).
     
     Args:
-        filename: name of the audio file to delete
+        filename: name of the history entry to delete
     
     Returns:
-        Updated history list
+        Tombstone dict with keys: version, filename, deleted
     """
     ensure_history_dir()
-    file_path = os.path.join(HISTORY_DIR, filename)
-    if os.path.exists(file_path):
-        try:
-            os.remove(file_path)
-            print(f"Deleted history file: {file_path}")
-        except Exception as e:
-            print(f"Error deleting file: {e}")
-    
-    history = get_history()
-    history = [item for item in history if item['filename'] != filename]
-    
-    try:
-        with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(history, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print(f"Error updating history json: {e}")
-    
-    return history
+    return history_archive.delete_entry(filename)
 
 def play_history_item(filename):
     """Play a recording from history.
@@ -446,14 +883,13 @@ def play_history_item(filename):
     Returns:
         True if playback started, False otherwise
     """
-    global is_playing_audio
-    file_path = os.path.join(HISTORY_DIR, filename)
-    if os.path.exists(file_path):
-        is_playing_audio = True
-        play_audio(file_path)
+    # Archived (FLAC/Opus) audio is decoded on the fly into a small WAV cache
+    file_path = history_archive.playable_path(filename)
+    if file_path:
+        play_audio(file_path, filename=filename)
         return True
     else:
-        print(f"File not found: {file_path}")
+        log.warning("Audio not available for: %s", filename)
         return False
 
 def transcribe_history_item(filename):
@@ -463,79 +899,80 @@ def transcribe_history_item(filename):
         filename: name of the audio file to transcribe
     
     Returns:
-        Updated history list, or None if transcription failed
+        Change dict with keys: version, filename, entry; or None if transcription failed
     """
     ensure_history_dir()
-    file_path = os.path.join(HISTORY_DIR, filename)
-    if not os.path.exists(file_path):
-        print(f"File not found for transcription: {file_path}")
+    file_path = history_archive.playable_path(filename)
+    if not file_path:
+        log.warning("Audio not available for transcription: %s", filename)
         return None
     
-    from .transcriber import transcribe_with_gemini
+    from .transcriber import is_error as is_transcription_error, transcribe_with_gemini
+    emit('transcription', stage='started', filename=filename)
     transcript = transcribe_with_gemini(file_path)
+    if is_transcription_error(transcript):
+        log.warning("Transcription of %s failed: %s", filename, transcript)
+        transcript = None  # keep the old transcript
+    emit('transcription', stage='done' if transcript else 'failed', filename=filename)
     
     if transcript:
-        history = get_history()
-        for item in history:
-            if item['filename'] == filename:
-                item['transcript'] = transcript
-                break
-        
-        try:
-            with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(history, f, ensure_ascii=False, indent=2)
-            print(f"Updated transcript for {filename}")
-        except Exception as e:
-            print(f"Error updating history json: {e}")
-        
-        return history
+        change = history_store.update_entry(filename, transcript=transcript)
+        if change is None:
+            log.warning("History entry not found: %s", filename)
+        else:
+            log.info("Updated transcript for %s", filename)
+        return change
     return None
 
-def process_speech(session_id=None):
-    """Records audio, transcribes it, and pastes the result.
+def search_history(query, limit=20, offset=0):
+    """Full-text search over history transcripts.
+
+    Args:
+        query: free text; every word must match, the last one as a prefix
+        limit: page size (max 200)
+        offset: number of ranked results to skip
 
-    session_id: identifier captured at start; if it no longer matches active_session_id
-                when transcription is about to happen, the audio is discarded (stale).
+    Returns:
+        dict with keys: total, results (filename, timestamp, transcript, snippet, score), version
     """
-    global active_session_id
-    if session_id is None:
-        session_id = active_session_id
-    from .transcriber import transcribe_with_gemini
-    
-    # Record audio until stop_event is set
-    audio_file, aborted, duration = record_audio(session_id)
-    
-    # If aborted early (stale/cancelled) skip everything silently
-    if aborted:
-        return
+    return history_store.search(query, limit, offset)
+
+def _process_speech(session, audio_file, duration, device_index=None):
+    """Transcribe a finished capture, paste the result and save it to history.
+
+    Runs on its own thread per session and stream. If the session was
+    cancelled, or a newer session was started while this one was being
+    transcribed, the audio is discarded (stale).
+    """
+    from .transcriber import is_error as is_transcription_error, transcribe_with_gemini
 
     # Check if recording was cancelled OR session became stale due to restart after capture finished
-    if cancelled or session_id != active_session_id:
-        print("Recording was cancelled or stale (post-capture), skipping transcription")
+    if session.cancelled or not controller.is_current(session):
+        log.info("Recording was cancelled or stale (post-capture), skipping transcription")
+        _remove_file(audio_file)
         return
-    
+
     # Check if recording was too short (likely accidental)
-    MIN_RECORDING_DURATION = 0.6  # seconds
     if duration < MIN_RECORDING_DURATION:
-        print(f"Recording too short ({duration:.2f}s), likely accidental. Skipping transcription.")
-        if audio_file:
-            try:
-                os.remove(audio_file)
-            except Exception:
-                pass
+        log.info("Recording too short (%.2fs), likely accidental. Skipping transcription.", duration)
+        _remove_file(audio_file)
         return
-    
+
     # Skip transcription if no audio file (silent recording)
     if audio_file is None:
-        print("No speech detected, skipping transcription")
+        log.info("No speech detected, skipping transcription")
         return
-    
+
     # Transcribe the recorded audio
+    _emit_recording_state('transcribing')
+    emit('transcription', stage='started', session_id=session.id, device=device_index)
     transcribed_text = transcribe_with_gemini(audio_file)
+    failed = not transcribed_text or is_transcription_error(transcribed_text)
+    emit('transcription', stage='failed' if failed else 'done', session_id=session.id, device=device_index)
 
     # Detect likely API key / auth errors and inform user via popup (non-fatal)
     try:
-        if isinstance(transcribed_text, str) and transcribed_text.lower().startswith("transcription error"):
+        if is_transcription_error(transcribed_text):
             lowered = transcribed_text.lower()
             if any(k in lowered for k in ["api key", "unauthorized", "invalid", "permission", "403", "401", "forbidden"]):
                 try:
@@ -547,24 +984,22 @@ def process_speech(session_id=None):
         pass
 
     # Discard if session became stale after transcription latency
-    if session_id != active_session_id:
-        print("Stale recording (post-transcribe) discarded")
-        try:
-            if audio_file:
-                os.remove(audio_file)
-        except Exception:
-            pass
+    if not controller.is_current(session):
+        log.info("Stale recording (post-transcribe) discarded")
+        _remove_file(audio_file)
         return
 
     # Display and paste the result (still current)
     if transcribed_text:
-        print(f"Transcribed: {transcribed_text}")
+        log.info("Transcribed %d characters", len(transcribed_text))
+        log.debug("Transcript: %s", transcribed_text)
+        emit('transcript', session_id=session.id, device=device_index, text=transcribed_text)
         # Notify UI callback directly (Eel) or via tkinter if legacy app exists
         if on_transcription_done_callback is not None:
             try:
                 on_transcription_done_callback(transcribed_text)
             except Exception as _e:
-                print("UI callback (transcription done) error:", _e)
+                log.error("UI callback (transcription done) error: %s", _e)
         elif app is not None:
             try:
                 app.after(0, app.on_transcription_done, transcribed_text)
@@ -572,9 +1007,9 @@ def process_speech(session_id=None):
                 pass
 
         # Save to history instead of deleting
-        save_recording_to_history(audio_file, transcribed_text)
+        save_recording_to_history(audio_file, transcribed_text, device_index)
     else:
-        print("No transcription result")
+        log.info("No transcription result")
         # Optionally save recordings without transcripts, or delete them
         if audio_file and os.path.exists(audio_file):
             try:
@@ -588,10 +1023,16 @@ def process_speech(session_id=None):
         try:
             on_recording_completed_callback()
         except Exception as _e:
-            print("UI callback (recording completed) error:", _e)
+            log.error("UI callback (recording completed) error: %s", _e)
     elif app is not None:
         try:
             app.after(0, app.on_recording_completed)
         except Exception:
             pass
 
+def _remove_file(path):
+    if path:
+        try:
+            os.remove(path)
+        except Exception:
+            pass
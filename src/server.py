@@ -0,0 +1,496 @@
+"""Local HTTP/WebSocket service: dictation and transcription for other tools.
+
+One asyncio loop on a background thread serves plain HTTP/1.1 and WebSocket
+connections on localhost (no extra dependencies). Everything goes through the
+same process-wide pieces the GUI uses: the recorder's session controller (one
+capture stream, however many clients) and transcriber's cached OpenAI client.
+File transcriptions wait in a job queue served by a fixed number of worker
+tasks, each running the blocking request on a small thread pool, so N clients
+never mean N concurrent API requests.
+
+HTTP (JSON in and out):
+
+    GET  /status                    recording state, queue depth, clients
+    POST /start | /stop | /cancel | /pause
+    POST /transcribe                the raw audio bytes (Content-Type audio/wav),
+                                    or {"path": "..."} of a file in the history
+                                    or temp folder; ?wait=1 returns the
+                                    finished job instead of the queued one
+    GET  /jobs/<id>                 job status (see jobs.Job.to_dict)
+    DELETE /jobs/<id>               cancel a queued job
+
+WebSocket /events: a feed of {"type": ...} messages - recording_state,
+transcription (started/done/failed), transcript (the text of a dictation) and
+job (a finished file transcription); vad_level only with ?levels=1. Clients
+may send {"action": "start" | "stop" | "cancel" | "pause" | "status"}.
+
+Requests whose Host header is not a loopback name, or that carry any Origin
+but a loopback one (including "null" from sandboxed frames and file:// pages),
+are refused, so web pages and DNS-rebound hosts cannot drive the recorder. A
+{"path"} can only name files under the history or temp folder, so a client
+cannot have arbitrary local files uploaded for transcription. If a token is
+configured it must be sent as "Authorization: Bearer <token>" or ?token=<token>.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from . import history_store, jobs, recorder
+
+log = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2           # concurrent transcription requests
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 50 * 1024 * 1024
+MAX_QUEUED_JOBS = 100
+MAX_KEPT_JOBS = 200           # finished jobs kept for GET /jobs/<id>
+CLIENT_QUEUE_SIZE = 256       # messages buffered per WebSocket client
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '[::1]', '::1')
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 401: 'Unauthorized', 403: 'Forbidden',
+           404: 'Not Found', 405: 'Method Not Allowed', 409: 'Conflict', 411: 'Length Required',
+           413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or REASONS.get(status, 'Error'))
+        self.status = status
+
+
+def _default_actions():
+    """Recorder actions without the GUI's sounds and overlay."""
+    def state():
+        return {"recording": recorder.is_recording(), "paused": recorder.is_paused()}
+    return {
+        "start": lambda: {"status": "started" if recorder.start_recording() else "already_recording"},
+        "stop": lambda: {"status": "stopping" if recorder.stop_recording() else "not_recording"},
+        "cancel": lambda: {"status": "cancelled" if recorder.cancel_recording() else "not_recording"},
+        "pause": lambda: {"paused": recorder.set_paused(not recorder.is_paused())},
+        "state": state,
+    }
+
+
+def _hostname(url):
+    """Lower-case host of a URL or "//host:port" ('' if there is none or it is malformed)."""
+    try:
+        return (urlsplit(url).hostname or '').lower()
+    except ValueError:
+        return ''
+
+
+def _in_allowed_folder(path):
+    """True if a resolved path lies in the history or recorder temp folder."""
+    for folder in (history_store.HISTORY_DIR, recorder.TEMP_DIRECTORY):
+        folder = os.path.realpath(folder)
+        try:
+            if os.path.commonpath([path, folder]) == folder:
+                return True
+        except ValueError:  # different drives
+            continue
+    return False
+
+
+def _transcribe_file(path):
+    from .transcriber import ERROR_PREFIX, is_error, transcribe_with_gemini
+    text = transcribe_with_gemini(path)
+    if not text:
+        raise RuntimeError('no transcript')
+    if is_error(text):
+        raise RuntimeError(text[len(ERROR_PREFIX):].strip())
+    return text
+
+
+class _Client:
+    """One WebSocket connection; messages are queued and written by its own task."""
+
+    def __init__(self, writer, levels):
+        self.writer = writer
+        self.levels = levels
+        self.queue = asyncio.Queue(CLIENT_QUEUE_SIZE)
+        self.dropped = 0
+        self.task = asyncio.current_task()
+
+    def send(self, message):
+        if self.queue.full():
+            # Slow reader: drop the oldest message rather than buffer without bound
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class TranscriptionServer:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, token=None, actions=None):
+        """
+        Args:
+            host, port: address to listen on (keep it on loopback)
+            workers: concurrent file transcriptions
+            token: optional shared secret required from clients
+            actions: {name: callable} for start/stop/cancel/pause/state; run.py
+                passes its own so the sounds and overlay behave as in the GUI
+        """
+        self.host = host
+        self.port = port
+        self.workers = max(1, int(workers or DEFAULT_WORKERS))
+        self.token = token or None
+        self.actions = dict(_default_actions(), **(actions or {}))
+        self._loop = None
+        self._thread = None
+        self._unsubscribe = None
+        self._ready = threading.Event()
+        self._stopping = None
+        self._error = None
+        self._clients = set()
+        self._jobs = OrderedDict()  # id -> Job, queued and recently finished
+        self._done = {}             # id -> asyncio.Future for ?wait=1
+        self._queue = None
+        self._executor = None
+
+    # ---- lifecycle (any thread) ----
+    def start(self, timeout=5.0):
+        """Start the server thread; returns the bound port (raises if binding failed)."""
+        self._thread = threading.Thread(target=self._run, name='server', daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError('server did not start')
+        if self._error:
+            raise self._error
+        self._unsubscribe = recorder.subscribe(self._on_recorder_event)
+        return self.port
+
+    def stop(self, timeout=2.0):
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        loop = self._loop
+        if loop is not None and self._stopping is not None:
+            loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            "clients": len(self._clients),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "jobs": len(self._jobs),
+            "workers": self.workers,
+        }
+
+    def _run(self):
+        try:
+            asyncio.run(self._main())
+        except Exception as e:
+            log.error("Server stopped: %s", e)
+            self._error = e
+            self._ready.set()
+
+    async def _main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._queue = asyncio.Queue(MAX_QUEUED_JOBS)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='server-transcribe')
+        server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = server.sockets[0].getsockname()[1]
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        log.info("Transcription server listening on http://%s:%d", self.host, self.port)
+        self._ready.set()
+        async with server:
+            await self._stopping.wait()
+        for task in workers:
+            task.cancel()
+        # Closing the transports ends each WebSocket handler's read loop
+        handlers = [client.task for client in self._clients]
+        for client in list(self._clients):
+            client.writer.close()
+        if handlers:
+            await asyncio.wait(handlers, timeout=1.0)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ---- recorder events (recorder threads) ----
+    def _on_recorder_event(self, event, data):
+        if not self._clients or self._loop is None:
+            return
+        message = dict(data, type=event)
+        try:
+            self._loop.call_soon_threadsafe(self._broadcast, message)
+        except RuntimeError:
+            pass  # loop closed during shutdown
+
+    def _broadcast(self, message):
+        levels_only = message["type"] == 'vad_level'
+        for client in self._clients:
+            if client.levels or not levels_only:
+                client.send(message)
+
+    # ---- job queue ----
+    def _submit(self, path, temporary=False):
+        if self._queue.full():
+            raise HttpError(503, 'transcription queue is full')
+        job = jobs.Job('transcribe')
+        job.update(message=os.path.basename(path))
+        self._jobs[job.id] = job
+        self._done[job.id] = self._loop.create_future()
+        self._queue.put_nowait((job, path, temporary))
+        while len(self._jobs) > MAX_KEPT_JOBS:
+            oldest = next(iter(self._jobs.values()))
+            if not oldest.finished:
+                break
+            self._jobs.popitem(last=False)
+        return job
+
+    async def _worker(self):
+        while True:
+            job, path, temporary = await self._queue.get()
+            try:
+                if job.cancelled:
+                    job.status = 'cancelled'
+                    continue
+                job.status = 'running'
+                try:
+                    job.result = await self._loop.run_in_executor(self._executor, _transcribe_file, path)
+                    job.status = 'done'
+                except Exception as e:
+                    job.error = str(e)
+                    job.status = 'error'
+            finally:
+                job.finished = time.time()
+                if temporary:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                future = self._done.pop(job.id, None)
+                if future is not None and not future.done():
+                    future.set_result(job)
+                self._broadcast(dict(job.to_dict(), type='job'))
+
+    # ---- connections ----
+    async def _handle(self, reader, writer):
+        try:
+            method, target, headers = await self._read_head(reader)
+            url = urlsplit(target)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            self._check_access(headers, query)
+            if url.path == '/events' and headers.get('upgrade', '').lower() == 'websocket':
+                await self._websocket(reader, writer, headers, query)
+                return
+            length = headers.get('content-length')
+            if method in ('POST', 'PUT') and length is None:
+                raise HttpError(411)
+            length = int(length or 0)
+            if length > MAX_BODY_BYTES:
+                raise HttpError(413)
+            body = await reader.readexactly(length) if length else b''
+            status, payload = await self._route(method, url.path, query, headers, body)
+        except HttpError as e:
+            status, payload = e.status, {"error": str(e)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            log.exception("Server request failed")
+            status, payload = 500, {"error": str(e)}
+        try:
+            data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                         f"Content-Type: application/json; charset=utf-8\r\n"
+                         f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode('latin-1') + data)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_head(self, reader):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.LimitOverrunError:
+            raise HttpError(413, 'headers too large')
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _version = lines[0].split(' ', 2)
+        except ValueError:
+            raise HttpError(400, 'malformed request line')
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, headers
+
+    def _check_access(self, headers, query):
+        if _hostname('//' + headers.get('host', '')) not in LOCAL_HOSTS:
+            raise HttpError(403, 'only localhost may be used as Host')
+        origin = headers.get('origin')
+        if origin is not None and _hostname(origin) not in LOCAL_HOSTS:
+            raise HttpError(403, 'cross-origin requests are not allowed')
+        if self.token:
+            auth = headers.get('authorization', '')
+            sent = auth[7:] if auth.lower().startswith('bearer ') else query.get('token')
+            if sent != self.token:
+                raise HttpError(401, 'missing or wrong token')
+
+    async def _route(self, method, path, query, headers, body):
+        if path == '/status':
+            if method != 'GET':
+                raise HttpError(405)
+            return 200, dict(self.stats(), **await self._action('state'))
+        if path in ('/start', '/stop', '/cancel', '/pause'):
+            if method != 'POST':
+                raise HttpError(405)
+            return 200, await self._action(path[1:])
+        if path == '/transcribe':
+            if method != 'POST':
+                raise HttpError(405)
+            job = self._submit(*self._audio_source(headers, body))
+            future = self._done.get(job.id)
+            if future is not None and query.get('wait') in ('1', 'true'):
+                await future
+            return (200 if job.finished else 202), job.to_dict()
+        if path.startswith('/jobs/'):
+            job = self._jobs.get(path[len('/jobs/'):])
+            if job is None:
+                raise HttpError(404, 'unknown job')
+            if method == 'DELETE':
+                if job.finished or job.status == 'running':
+                    raise HttpError(409, 'job already started')
+                job.cancel()
+            elif method != 'GET':
+                raise HttpError(405)
+            return 200, job.to_dict()
+        raise HttpError(404)
+
+    def _audio_source(self, headers, body):
+        """(path, temporary) for a transcription request body."""
+        content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+        if content_type == 'application/json':
+            try:
+                path = json.loads(body or b'{}').get('path')
+            except (ValueError, AttributeError):
+                raise HttpError(400, 'invalid JSON')
+            if not path or not os.path.isfile(path):
+                raise HttpError(400, f"not a file: {path}")
+            path = os.path.realpath(path)
+            if not _in_allowed_folder(path):
+                raise HttpError(403, 'only files in the history or temp folder can be named; upload others')
+            return path, False
+        if content_type in ('audio/wav', 'audio/x-wav', 'audio/wave', 'application/octet-stream'):
+            if not body:
+                raise HttpError(400, 'empty body')
+            fd, path = tempfile.mkstemp(prefix='server_', suffix='.wav', dir=recorder.TEMP_DIRECTORY)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            return path, True
+        raise HttpError(400, 'send audio/wav or JSON {"path": ...}')
+
+    async def _action(self, name):
+        """Run a recorder action off the loop (they may play sounds or probe devices)."""
+        return await self._loop.run_in_executor(None, self.actions[name])
+
+    # ---- WebSocket ----
+    async def _websocket(self, reader, writer, headers, query):
+        key = headers.get('sec-websocket-key')
+        if not key:
+            raise HttpError(400, 'missing Sec-WebSocket-Key')
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode('ascii')).digest()).decode('ascii')
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode('latin-1'))
+        client = _Client(writer, query.get('levels') in ('1', 'true'))
+        self._clients.add(client)
+        sender = asyncio.create_task(self._ws_sender(client))
+        client.send(dict(await self._action('state'), type='hello', **self.stats()))
+        try:
+            while True:
+                opcode, payload = await _read_frame(reader)
+                if opcode == 0x8:  # close
+                    break
+                if opcode == 0x9:  # ping
+                    writer.write(_frame(payload, 0xA))
+                elif opcode == 0x1:
+                    client.send(await self._ws_command(payload))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._clients.discard(client)
+            sender.cancel()
+            try:
+                writer.write(_frame(b'', 0x8))
+                await writer.drain()
+            except Exception:
+                pass
+            writer.close()
+
+    async def _ws_command(self, payload):
+        try:
+            action = json.loads(payload).get('action')
+        except (ValueError, AttributeError):
+            return {"type": "error", "error": "invalid JSON"}
+        if action == 'status':
+            action = 'state'
+        if action not in self.actions:
+            return {"type": "error", "error": f"unknown action: {action}"}
+        try:
+            return dict(await self._action(action), type='result', action=action)
+        except Exception as e:
+            return {"type": "error", "action": action, "error": str(e)}
+
+    async def _ws_sender(self, client):
+        try:
+            while True:
+                message = await client.queue.get()
+                client.writer.write(_frame(json.dumps(message, ensure_ascii=False).encode('utf-8')))
+                await client.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+
+def _frame(payload, opcode=0x1):
+    """An unmasked, unfragmented server frame."""
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 65536:
+        header += bytes([126]) + struct.pack('!H', length)
+    else:
+        header += bytes([127]) + struct.pack('!Q', length)
+    return header + payload
+
+
+async def _read_frame(reader):
+    """(opcode, payload) of the next client frame; continuation frames are joined."""
+    message, message_opcode = b'', None
+    while True:
+        first, second = await reader.readexactly(2)
+        opcode = first & 0x0F
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', await reader.readexactly(8))[0]
+        if length > MAX_BODY_BYTES:
+            raise ValueError('frame too large')
+        mask = await reader.readexactly(4) if second & 0x80 else None
+        payload = await reader.readexactly(length)
+        if mask and length:
+            key = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
+        if opcode >= 0x8:
+            return opcode, payload  # control frames may arrive between fragments
+        if opcode:
+            message_opcode = opcode
+        message += payload
+        if first & 0x80:
+            return message_opcode, message
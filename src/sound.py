@@ -0,0 +1,459 @@
+"""Feedback and playback sound engine.
+
+Cue sounds (audio/start.wav, done.wav, ...) are decoded into memory once and
+played through a single persistent output stream, mixed with anything else
+that is playing, so a cue starts within one block (~11 ms) and never cuts off
+history playback. Every sound is a "voice"; when its last sample has been
+handed to the device the engine waits out the device's output latency and
+then reports completion through the voice's callback. History recordings
+(play_file) are streamed from disk and resampled block by block instead.
+
+Output goes through a backend object. PyAudioBackend drives a PyAudio
+callback stream; NullBackend consumes blocks in real time without a device,
+for headless use and tests. A backend needs:
+
+    start(rate, channels, block, render)  # render(frames) -> int16 bytes
+    stop()
+    latency                               # seconds from render to audible
+"""
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+import wave
+
+import numpy as np
+
+try:
+    import pyaudio
+except Exception:  # pragma: no cover
+    pyaudio = None
+
+log = logging.getLogger(__name__)
+
+OUTPUT_RATE = 48000
+OUTPUT_CHANNELS = 2
+BLOCK_FRAMES = 512  # ~10.7 ms per mixed block
+AUDIO_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'audio')
+
+_lock = threading.RLock()
+_backend = None
+_cues = {}     # cue name (file name without .wav) -> Sound
+_voices = {}   # voice id -> _Voice still being mixed
+_pending = {}  # voice id -> _Voice not yet reported finished (includes _voices)
+_latency = 0.0
+_ids = itertools.count(1)
+_finished = queue.Queue()  # (due time, voice) waiting to be reported
+_notifier = None
+
+
+class Sound:
+    """Decoded PCM: int16 array of shape (frames, channels) at `rate`."""
+
+    def __init__(self, samples, rate):
+        self.samples = samples
+        self.rate = rate
+
+    @property
+    def duration(self):
+        return len(self.samples) / float(self.rate)
+
+
+def _to_output_channels(samples, channels):
+    """Map an int16 (frames, channels) array onto OUTPUT_CHANNELS."""
+    if channels == OUTPUT_CHANNELS:
+        return samples
+    if channels == 1:
+        return np.repeat(samples, OUTPUT_CHANNELS, axis=1)
+    if channels > OUTPUT_CHANNELS:
+        return samples[:, :OUTPUT_CHANNELS]
+    return np.repeat(samples[:, :1], OUTPUT_CHANNELS, axis=1)
+
+
+def _open_wav(path):
+    wf = wave.open(path, 'rb')
+    if wf.getsampwidth() != 2:
+        wf.close()
+        raise ValueError(f"Only 16-bit PCM WAV is supported: {path}")
+    return wf
+
+
+def load_wav(path):
+    """Decode a 16-bit PCM WAV into a Sound, converted to the output rate and channels."""
+    with _open_wav(path) as wf:
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).reshape(-1, channels)
+    samples = _to_output_channels(samples, channels)
+    if rate != OUTPUT_RATE and len(samples):
+        n = max(1, int(round(len(samples) * OUTPUT_RATE / float(rate))))
+        positions = np.linspace(0, len(samples) - 1, n)
+        samples = np.stack([np.interp(positions, np.arange(len(samples)), samples[:, c])
+                            for c in range(OUTPUT_CHANNELS)], axis=1).astype(np.int16)
+    return Sound(np.ascontiguousarray(samples), OUTPUT_RATE)
+
+
+class _Voice:
+    def __init__(self, voice_id, sound, gain, on_finished):
+        self.id = voice_id
+        self.sound = sound
+        self.gain = gain
+        self.on_finished = on_finished
+        self.pos = 0
+        self.done = threading.Event()
+
+    def render(self, frames):
+        """Next block of float samples (may be shorter than frames at the end)."""
+        chunk = self.sound.samples[self.pos:self.pos + frames]
+        self.pos += len(chunk)
+        return chunk.astype(np.float32) * self.gain
+
+    @property
+    def exhausted(self):
+        return self.pos >= len(self.sound.samples)
+
+    def close(self):
+        pass
+
+
+class _FileVoice(_Voice):
+    """Plays a WAV straight from disk, resampling one block at a time.
+
+    Only about READ_SECONDS of the file is held in memory, so an hour-long
+    recording costs no more than a short one.
+    """
+
+    READ_SECONDS = 0.25
+
+    def __init__(self, voice_id, path, gain, on_finished):
+        super().__init__(voice_id, None, gain, on_finished)
+        self._wf = _open_wav(path)
+        self._channels = self._wf.getnchannels()
+        self._step = self._wf.getframerate() / float(OUTPUT_RATE)  # source frames per output frame
+        self._read_frames = max(BLOCK_FRAMES, int(self._wf.getframerate() * self.READ_SECONDS))
+        self._buf = np.zeros((0, OUTPUT_CHANNELS), dtype=np.float32)
+        self._t = 0.0  # read position in source frames, relative to _buf[0]
+        self._eof = False
+        self._fill(1)  # read the first chunk here rather than on the audio thread
+
+    def _fill(self, needed):
+        while len(self._buf) < needed and not self._eof:
+            data = self._wf.readframes(self._read_frames)
+            if not data:
+                self._eof = True
+                break
+            chunk = np.frombuffer(data, dtype=np.int16).reshape(-1, self._channels)
+            chunk = _to_output_channels(chunk, self._channels).astype(np.float32)
+            self._buf = np.concatenate([self._buf, chunk])
+
+    def render(self, frames):
+        """Next block of float samples (may be shorter than frames at the end)."""
+        self._fill(int(self._t + self._step * frames) + 2)
+        available = len(self._buf)
+        if available == 0:
+            return np.zeros((0, OUTPUT_CHANNELS), dtype=np.float32)
+        positions = self._t + self._step * np.arange(frames)
+        positions = positions[positions <= available - 1]
+        if len(positions) == 0:
+            # Only a final fractional frame was left
+            self._buf = self._buf[:0]
+            return np.zeros((0, OUTPUT_CHANNELS), dtype=np.float32)
+        index = positions.astype(np.int64)
+        frac = (positions - index)[:, None].astype(np.float32)
+        upper = np.minimum(index + 1, available - 1)
+        chunk = self._buf[index] * (1 - frac) + self._buf[upper] * frac
+        self._t += self._step * len(positions)
+        consumed = min(int(self._t), available)
+        self._buf = self._buf[consumed:]
+        self._t -= consumed
+        if len(positions) < frames:
+            self._buf = self._buf[:0]
+        self.pos += len(chunk)
+        return chunk * self.gain
+
+    @property
+    def exhausted(self):
+        return self._eof and (len(self._buf) == 0 or self._t > len(self._buf) - 1)
+
+    def close(self):
+        try:
+            self._wf.close()
+        except Exception:
+            pass
+
+
+# ---------------- Backends -----------------
+
+class NullBackend:
+    """Discards audio, pulling blocks at the real-time rate (no device needed)."""
+
+    latency = 0.0
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+        self.blocks = 0
+
+    def start(self, rate, channels, block, render):
+        self._stop.clear()
+
+        def run():
+            period = block / float(rate)
+            next_time = time.monotonic()
+            while not self._stop.is_set():
+                render(block)
+                self.blocks += 1
+                next_time += period
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    self._stop.wait(delay)
+                else:
+                    next_time = time.monotonic()
+
+        self._thread = threading.Thread(target=run, name='sound-null', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+
+class PyAudioBackend:
+    """One persistent PyAudio output stream in callback mode."""
+
+    def __init__(self, device_index=None):
+        self.device_index = device_index
+        self.latency = 0.0
+        self._pa = None
+        self._stream = None
+
+    def start(self, rate, channels, block, render):
+        if pyaudio is None:
+            raise RuntimeError('PyAudio is not available')
+
+        def callback(in_data, frame_count, time_info, status):
+            return render(frame_count), pyaudio.paContinue
+
+        self._pa = pyaudio.PyAudio()
+        try:
+            self._stream = self._pa.open(
+                format=pyaudio.paInt16,
+                channels=channels,
+                rate=rate,
+                output=True,
+                output_device_index=self.device_index,
+                frames_per_buffer=block,
+                stream_callback=callback,
+            )
+            self._stream.start_stream()
+            self.latency = float(self._stream.get_output_latency() or 0.0)
+        except Exception:
+            self._pa.terminate()
+            self._pa = None
+            raise
+
+    @property
+    def active(self):
+        try:
+            return self._stream is not None and self._stream.is_active()
+        except Exception:
+            return False
+
+    def stop(self):
+        try:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+        except Exception:
+            pass
+        finally:
+            self._stream = None
+            if self._pa is not None:
+                self._pa.terminate()
+                self._pa = None
+
+
+# ---------------- Engine -----------------
+
+def _render(frames):
+    """Mix all active voices into one int16 block (runs on the audio thread)."""
+    mix = np.zeros((frames, OUTPUT_CHANNELS), dtype=np.float32)
+    now = time.monotonic()
+    with _lock:
+        voices = list(_voices.values())
+        for voice in voices:
+            chunk = voice.render(frames)
+            mix[:len(chunk)] += chunk
+            if voice.exhausted:
+                del _voices[voice.id]
+                # Its last samples become audible after this block plus the device latency
+                _finished.put((now + frames / float(OUTPUT_RATE) + _latency, voice))
+    np.clip(mix, -32768, 32767, out=mix)
+    return mix.astype(np.int16).tobytes()
+
+
+def _notify_loop():
+    while True:
+        due, voice = _finished.get()
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        _complete(voice)
+
+
+def _complete(voice):
+    with _lock:
+        if voice.done.is_set():
+            return
+        voice.done.set()
+        _pending.pop(voice.id, None)
+        voice.close()
+    if voice.on_finished is not None:
+        try:
+            voice.on_finished(voice.id)
+        except Exception as e:
+            log.error("Sound completion callback error: %s", e)
+
+
+def init(backend=None, audio_dir=None):
+    """Preload cue sounds and open the output stream (idempotent).
+
+    Args:
+        backend: backend instance, 'null', or None to use PyAudio (falling back
+            to the null backend when no output device can be opened)
+        audio_dir: folder with the cue WAVs (default: audio/ next to src/)
+    """
+    global _backend, _notifier, _latency
+    with _lock:
+        if _backend is not None:
+            return
+        if not _cues:
+            load_cues(audio_dir or AUDIO_DIR)
+        if backend == 'null':
+            backend = NullBackend()
+        if backend is None:
+            backend = PyAudioBackend()
+            try:
+                backend.start(OUTPUT_RATE, OUTPUT_CHANNELS, BLOCK_FRAMES, _render)
+            except Exception as e:
+                log.warning("Audio output unavailable (%s); sounds are muted", e)
+                backend = NullBackend()
+                backend.start(OUTPUT_RATE, OUTPUT_CHANNELS, BLOCK_FRAMES, _render)
+        else:
+            backend.start(OUTPUT_RATE, OUTPUT_CHANNELS, BLOCK_FRAMES, _render)
+        _backend = backend
+        _latency = backend.latency
+        if _notifier is None:
+            _notifier = threading.Thread(target=_notify_loop, name='sound-notify', daemon=True)
+            _notifier.start()
+
+
+def shutdown():
+    """Stop all sounds and close the output stream."""
+    global _backend
+    stop()
+    with _lock:
+        backend, _backend = _backend, None
+    if backend is not None:
+        backend.stop()
+
+
+def load_cues(audio_dir):
+    """Decode every WAV in audio_dir into memory, keyed by file name without extension."""
+    try:
+        names = sorted(n for n in os.listdir(audio_dir) if n.lower().endswith('.wav'))
+    except OSError as e:
+        log.warning("Cannot load cue sounds: %s", e)
+        return
+    for name in names:
+        try:
+            _cues[os.path.splitext(name)[0]] = load_wav(os.path.join(audio_dir, name))
+        except Exception as e:
+            log.warning("Cannot load cue sound %s: %s", name, e)
+
+
+def get_cue(name):
+    """Preloaded cue by name ('done') or file name ('audio/done.wav'), or None."""
+    return _cues.get(os.path.splitext(os.path.basename(name))[0])
+
+
+def _ensure_running():
+    if _backend is None:
+        init()
+    elif isinstance(_backend, PyAudioBackend) and not _backend.active:
+        # Device went away (unplugged, sleep); reopen before playing
+        log.info('Audio output stream stopped; reopening')
+        shutdown()
+        init()
+
+
+def play(sound, on_finished=None, gain=1.0):
+    """Start playing a Sound, mixed with whatever else is playing.
+
+    Args:
+        sound: Sound to play
+        on_finished: optional callback(voice_id), called once it has been heard
+            (or stopped), from the engine's notifier thread
+        gain: linear volume factor
+
+    Returns:
+        voice id
+    """
+    _ensure_running()
+    with _lock:
+        return _start_voice(_Voice(next(_ids), sound, gain, on_finished))
+
+
+def _start_voice(voice):
+    # caller holds _lock
+    _voices[voice.id] = voice
+    _pending[voice.id] = voice
+    return voice.id
+
+
+def play_cue(name, on_finished=None):
+    """Play a preloaded cue; returns the voice id, or None if there is no such cue."""
+    if _backend is None:
+        init()
+    sound = get_cue(name)
+    if sound is None:
+        log.warning("Unknown cue sound: %s", name)
+        return None
+    return play(sound, on_finished)
+
+
+def play_file(path, on_finished=None, gain=1.0):
+    """Play a WAV file, streamed from disk and resampled as it plays; returns the voice id."""
+    _ensure_running()
+    voice = _FileVoice(next(_ids), path, gain, on_finished)
+    with _lock:
+        return _start_voice(voice)
+
+
+def stop(voice_id=None):
+    """Stop one voice, or all of them. Stopped voices report completion at once."""
+    with _lock:
+        if voice_id is None:
+            stopped = list(_voices.values())
+            _voices.clear()
+        else:
+            voice = _voices.pop(voice_id, None)
+            stopped = [voice] if voice else []
+    for voice in stopped:
+        _complete(voice)
+
+
+def is_playing(voice_id=None):
+    """Whether a voice (or any voice) is still audible."""
+    with _lock:
+        return bool(_pending) if voice_id is None else voice_id in _pending
+
+
+def wait(voice_id, timeout=None):
+    """Block until a voice has finished. Returns False on timeout."""
+    with _lock:
+        voice = _pending.get(voice_id)
+    return True if voice is None else voice.done.wait(timeout)
@@ -1,9 +1,41 @@
 import os
 import json
 import base64
-from openai import OpenAI
+import logging
+import threading
+
+log = logging.getLogger(__name__)
 
 SETTINGS_FILE = 'settings.json'
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+ERROR_PREFIX = 'Transcription error:'  # what transcribe_with_gemini returns on failure
+
+# The openai package takes most of a second to import, so it is loaded on first
+# use (or by warm_up() in the background) and one client is reused per API key
+# and endpoint, keeping its HTTP connection pool warm between transcriptions.
+_client = None
+_client_key = None
+_client_lock = threading.Lock()
+
+_settings_cache = (None, {})  # ((path, mtime), data) of SETTINGS_FILE
+
+def is_error(text):
+    """True if text is transcribe_with_gemini's failure message rather than a transcript."""
+    return isinstance(text, str) and text.startswith(ERROR_PREFIX)
+
+def _read_settings():
+    """settings.json contents, re-read only when the file changes."""
+    global _settings_cache
+    try:
+        stamp = (SETTINGS_FILE, os.path.getmtime(SETTINGS_FILE))
+    except OSError:
+        return {}
+    cached_stamp, data = _settings_cache
+    if stamp != cached_stamp:
+        with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        _settings_cache = (stamp, data)
+    return data
 
 def _load_prompt():
     """Load custom prompt from settings.json (transcri_brain.prompt) if enabled.
@@ -11,54 +43,73 @@ def _load_prompt():
     The user requested a plain Part.from_text(text="...") without extra markdown wrappers.
     """
     try:
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            brain = data.get('transcri_brain', {})
-            if brain.get('enabled', True):
-                prompt = brain.get('prompt', '').strip()
-                if prompt:
-                    return prompt
+        brain = _read_settings().get('transcri_brain', {})
+        if brain.get('enabled', True):
+            prompt = brain.get('prompt', '').strip()
+            if prompt:
+                return prompt
     except Exception as e:
-        print('Prompt load error:', e)
+        log.error('Prompt load error: %s', e)
     # Default minimal instruction (kept concise per request)
     return "Transcribe the audio accurately. Preserve original language/scripts. Remove filler words. Do not translate."
 
 def _load_api_key():
     """Load API key from settings.json"""
     try:
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return data.get('openrouter_api_key', '')
+        return _read_settings().get('openrouter_api_key', '')
     except Exception as e:
-        print('API key load error:', e)
+        log.error('API key load error: %s', e)
     return ''
 
 def _load_model():
     """Load model from settings.json"""
     try:
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return data.get('model', 'google/gemini-2.5-flash-lite')
+        return _read_settings().get('model', 'google/gemini-2.5-flash-lite')
     except Exception as e:
-        print('Model load error:', e)
+        log.error('Model load error: %s', e)
     return 'google/gemini-2.5-flash-lite'
 
+def _load_base_url():
+    """Load the OpenAI-compatible endpoint from settings.json (openrouter_base_url).
+    Lets a proxy or a local stand-in server (benchmarks/fake_openrouter.py) replace OpenRouter.
+    """
+    try:
+        return (_read_settings().get('openrouter_base_url') or OPENROUTER_BASE_URL).rstrip('/')
+    except Exception as e:
+        log.error('Base URL load error: %s', e)
+    return OPENROUTER_BASE_URL
+
+def _get_client():
+    """OpenAI client for OpenRouter, rebuilt only when the API key or base URL changes."""
+    global _client, _client_key
+    key = (_load_api_key(), _load_base_url())
+    with _client_lock:
+        if _client is None or key != _client_key:
+            from openai import OpenAI
+            _client = OpenAI(base_url=key[1], api_key=key[0])
+            _client_key = key
+        return _client
+
+def warm_up():
+    """Import the OpenAI client and build it ahead of the first transcription."""
+    try:
+        if _load_api_key():
+            _get_client()
+        else:
+            import openai  # no key yet: at least pay the import cost now
+    except Exception as e:
+        log.error('Transcriber warm-up failed: %s', e)
+
 def transcribe_with_gemini(audio_file):
     """Transcribes audio using OpenRouter (OpenAI client) with Gemini model"""
     if audio_file is None:
         return None
     
     try:
-        # Initialize the OpenAI client with OpenRouter configuration
-        client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=_load_api_key(),
-        )
+        # OpenAI client with OpenRouter configuration (cached across calls)
+        client = _get_client()
         
-        print("Sending to OpenRouter...")
+        log.debug("Sending to OpenRouter...")
         
         # Read and encode the audio file
         with open(audio_file, "rb") as f:
@@ -93,10 +144,10 @@ def transcribe_with_gemini(audio_file):
         
         # Extract the text from the response
         transcribed_text = response.choices[0].message.content
-        print(transcribed_text)
+        log.debug("Transcript: %s", transcribed_text)
         return transcribed_text
             
     except Exception as e:
-        print(f"Error during transcription: {e}")
-        return f"Transcription error: {str(e)}"
+        log.error("Error during transcription: %s", e)
+        return f"{ERROR_PREFIX} {str(e)}"
 
@@ -1,14 +1,15 @@
+import logging
 import threading
 import os
 import sys
 from typing import Callable, Optional
 
-try:
-    import pystray
-    from PIL import Image
-except Exception as e:  # pragma: no cover
-    pystray = None
-    Image = None
+log = logging.getLogger(__name__)
+
+# pystray and PIL are imported by _import_backend() on the tray thread, so
+# they do not hold up application startup.
+pystray = None
+Image = None
 
 # Store pystray icon instance without static type annotation (pystray may be missing at import time)
 _icon_instance = None  # will hold pystray.Icon instance
@@ -22,6 +23,18 @@ _tray_callbacks = {
 }
 
 
+def _import_backend() -> bool:
+    global pystray, Image
+    if pystray is None:
+        try:
+            import pystray as _pystray
+            from PIL import Image as _Image
+        except Exception:  # pragma: no cover
+            return False
+        pystray, Image = _pystray, _Image
+    return True
+
+
 def _load_icon(path: str):
     if Image is None:
         return None
@@ -41,10 +54,6 @@ def init_tray(icon_path: str = 'images/icon.png', **callbacks):
         if k in _tray_callbacks:
             _tray_callbacks[k] = v
 
-    if pystray is None:
-        print('pystray not available; tray icon disabled')
-        return
-
     if _thread and _thread.is_alive():
         return
 
@@ -54,6 +63,9 @@ def init_tray(icon_path: str = 'images/icon.png', **callbacks):
 
 def _run_tray(icon_path: str):
     global _icon_instance
+    if not _import_backend():
+        log.warning('pystray not available; tray icon disabled')
+        return
     image = _load_icon(icon_path) or _fallback_image()
 
     menu = pystray.Menu(
@@ -67,7 +79,7 @@ def _run_tray(icon_path: str):
     try:
         _icon_instance.run()
     except Exception as e:
-        print('Tray icon failed:', e)
+        log.error('Tray icon failed: %s', e)
 
 
 def _fallback_image():
@@ -86,11 +98,11 @@ def _safe_call(name: str):
         try:
             cb()
         except Exception as e:
-            print(f'Tray callback {name} error:', e)
+            log.error('Tray callback %s error: %s', name, e)
 
 
 def notify(message: str):  # Placeholder for future Windows toast integration
-    print('[Tray]', message)
+    log.info('[Tray] %s', message)
 
 
 def shutdown_tray():
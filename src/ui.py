@@ -1,6 +1,5 @@
 import os
 import json
-import threading
 import keyboard
 import customtkinter as ctk
 
@@ -218,7 +217,6 @@ class RecorderApp(ctk.CTk):
         self.auto_paste_var = ctk.BooleanVar(value=True)
         self.status_var = ctk.StringVar(value="Idle")
         self.overlay = None
-        self._recording_thread = None  # track active recording thread
 
         # Header
         header = ctk.CTkLabel(self, text="Speech to Text", font=("Segoe UI", 20, "bold"))
@@ -329,62 +327,48 @@ class RecorderApp(ctk.CTk):
     # --- Actions ---
     def start_recording(self):
         import recorder
-        if recorder.recording:
+        if recorder.start_recording() is None:
             return
         try:
             recorder.play_audio("audio/start.wav")
         except Exception:
             pass
-        recorder.stop_event.clear()
-        recorder.pause_event.clear()
-        recorder.cancelled = False
-        recorder.recording = True
-        recorder.set_paused(False)
         self._set_recording_ui(True)
         self._ensure_overlay()
-        t = threading.Thread(target=recorder.process_speech, daemon=True)
-        self._recording_thread = t
-        t.start()
 
     def stop_recording(self):
         import recorder
-        if not recorder.recording:
+        if not recorder.stop_recording():
             return
         try:
             recorder.play_audio("audio/stop.wav")
         except Exception:
             pass
-        recorder.stop_event.set()
-        recorder.recording = False
         self._set_recording_ui(False)
         self._safe_destroy_overlay()
 
     def cancel_recording(self):
         import recorder
-        if not recorder.recording:
+        if not recorder.cancel_recording():
             return
         try:
             recorder.play_audio("audio/cancel.wav")
         except Exception:
             pass
-        recorder.cancelled = True
-        recorder.stop_event.set()
-        recorder.recording = False
         self._set_recording_ui(False)
         self._safe_destroy_overlay()
         self.status_var.set("Recording cancelled")
 
     def toggle_pause(self):
         import recorder
-        current = recorder.pause_event.is_set()
-        recorder.set_paused(not current)
+        paused = recorder.set_paused(not recorder.is_paused())
         try:
             if self.overlay and self.overlay.winfo_exists():
-                self.overlay.set_paused(recorder.pause_event.is_set())
+                self.overlay.set_paused(paused)
         except Exception:
             pass
-        self.pause_button.configure(text="Resume" if recorder.pause_event.is_set() else "Pause")
-        self.status_var.set("Paused" if recorder.pause_event.is_set() else "Recording")
+        self.pause_button.configure(text="Resume" if paused else "Pause")
+        self.status_var.set("Paused" if paused else "Recording")
         try:
             recorder.play_audio("audio/pause.wav")
         except Exception:
@@ -392,17 +376,10 @@ class RecorderApp(ctk.CTk):
 
     def restart_recording(self):
         """Reset timer & discard current audio without transcribing, then start fresh.
-        Avoids duplicate recording threads by waiting for old thread to finish."""
+        The recorder cancels and starts in one step; its capture worker records
+        sessions one at a time, so no duplicate recording threads can appear."""
         import recorder
-        old_thread = self._recording_thread
-        if recorder.recording:
-            recorder.cancelled = True
-            recorder.stop_event.set()
-            recorder.recording = False
-            try:
-                recorder.play_audio("audio/stop.wav")
-            except Exception:
-                pass
+        recorder.restart_recording()
         ov = self._ensure_overlay()
         try:
             if ov and ov.winfo_exists():
@@ -410,26 +387,11 @@ class RecorderApp(ctk.CTk):
                 ov.set_paused(False)
         except Exception:
             pass
-
-        def _wait_then_start():
-            if old_thread is not None and old_thread.is_alive():
-                self.after(50, _wait_then_start)
-                return
-            recorder.stop_event.clear()
-            recorder.pause_event.clear()
-            recorder.cancelled = False
-            recorder.recording = True
-            recorder.set_paused(False)
-            self._set_recording_ui(True)
-            try:
-                recorder.play_audio("audio/start.wav")
-            except Exception:
-                pass
-            new_t = threading.Thread(target=recorder.process_speech, daemon=True)
-            self._recording_thread = new_t
-            new_t.start()
-
-        _wait_then_start()
+        self._set_recording_ui(True)
+        try:
+            recorder.play_audio("audio/start.wav")
+        except Exception:
+            pass
 
     def toggle_recording(self):
         import recorder
@@ -459,7 +421,7 @@ class RecorderApp(ctk.CTk):
 
     def on_close(self):
         import recorder
-        recorder.stop_event.set()
+        recorder.controller.shutdown(timeout=1.0)
         try:
             self.destroy()
         except Exception:
@@ -6,6 +6,7 @@ document.addEventListener("DOMContentLoaded", () => {
     general: document.getElementById("view-general"),
     "api-keys": document.getElementById("view-api-keys"),
     history: document.getElementById("view-history"),
+    logs: document.getElementById("view-logs"),
   };
   const navButtons = document.querySelectorAll(".nav-list button");
 
@@ -25,6 +26,18 @@ document.addEventListener("DOMContentLoaded", () => {
   const silenceThresholdInput = document.getElementById("silenceThresholdInput");
   const calibrateBtn = document.getElementById("calibrateBtn");
   const historyList = document.getElementById("history-list");
+  const historySearchInput = document.getElementById("historySearchInput");
+  const historySearchInfo = document.getElementById("historySearchInfo");
+  const historySortSelect = document.getElementById("historySortSelect");
+  const historyExportFormat = document.getElementById("historyExportFormat");
+  const historyExportBtn = document.getElementById("historyExportBtn");
+  const historyExportCancelBtn = document.getElementById("historyExportCancelBtn");
+  const historyExportStatus = document.getElementById("historyExportStatus");
+  const historyImportInput = document.getElementById("historyImportInput");
+  const historyImportTranscribe = document.getElementById("historyImportTranscribe");
+  const historyImportBtn = document.getElementById("historyImportBtn");
+  const historyImportCancelBtn = document.getElementById("historyImportCancelBtn");
+  const historyImportStatus = document.getElementById("historyImportStatus");
 
   // --- Functions ---
 
@@ -116,9 +129,18 @@ document.addEventListener("DOMContentLoaded", () => {
         element.classList.toggle("hidden", key !== viewToShow);
       });
       
-      // Load history when switching to history view
+      if (viewToShow === "logs") {
+        openLogView();
+      } else {
+        closeLogView();
+      }
+      // Load history when switching to history view (or catch up if already loaded)
       if (viewToShow === "history") {
-        loadHistory();
+        if (historyState.version !== null) {
+          syncHistory();
+        } else {
+          loadHistory();
+        }
       }
     });
   });
@@ -198,7 +220,7 @@ document.addEventListener("DOMContentLoaded", () => {
   // Load audio devices
   const loadAudioDevices = async () => {
     try {
-      const res = await eel.get_audio_devices()();
+      const res = await awaitJob(eel.get_audio_devices()());
       if (res && res.ok && res.devices) {
         // Clear existing options except "Default microphone"
         while (audioDeviceSelect.children.length > 1) {
@@ -232,7 +254,7 @@ document.addEventListener("DOMContentLoaded", () => {
     const oldText = calibrateBtn.textContent;
     calibrateBtn.textContent = "Calibrating...";
     try {
-      const res = await eel.calibrate_silence_threshold(2.5)();
+      const res = await awaitJob(eel.calibrate_silence_threshold(2.5)());
       if (res && res.ok) {
         const thr = Math.round(res.threshold);
         silenceThresholdInput.value = thr;
@@ -250,163 +272,584 @@ document.addEventListener("DOMContentLoaded", () => {
   });
 
   // --- History Functions ---
-  let currentlyPlayingButton = null;
+  // The history view is a windowed list: only rows near the viewport exist in the DOM,
+  // and further pages are fetched from Python as the user scrolls towards the end.
+  const HISTORY_PAGE_SIZE = 100;
+  const HISTORY_ROW_HEIGHT = 200; // px incl. gap; fixed so row positions can be computed
+  const HISTORY_OVERSCAN = 6; // extra rows rendered above/below the viewport
+  const scrollContainer = document.querySelector("main");
+
+  const historyState = {
+    items: [], // loaded entries, in display order
+    total: 0,
+    nextCursor: null,
+    loading: false,
+    generation: 0, // bumped on reset so responses for an old list are dropped
+    version: null, // history version the loaded items reflect (see get_history_changes)
+    fetchPage: null, // async (cursor) => {items, next_cursor, total}
+    rows: new Map(), // index -> rendered row element
+  };
+  let playingFilename = null;
+  let searchTimer = null;
+
+  const historyPageSource = (sort) => (cursor) => eel.get_history_page(cursor, HISTORY_PAGE_SIZE, sort)();
+
+  const searchPageSource = (query) => async (cursor) => {
+    const offset = cursor || 0;
+    const res = await eel.search_history(query, HISTORY_PAGE_SIZE, offset)();
+    const items = res ? res.results : [];
+    const total = res ? res.total : 0;
+    historySearchInfo.textContent = `${total} match${total === 1 ? "" : "es"}`;
+    const next = offset + items.length;
+    return { items, total, version: res ? res.version : null, next_cursor: items.length && next < total ? next : null };
+  };
 
-  const loadHistory = async () => {
+  const showHistoryMessage = (html) => {
+    historyState.rows.clear();
+    historyList.style.height = "";
+    historyList.innerHTML = html;
+  };
+
+  const resetHistoryList = (fetchPage) => {
+    historyState.generation++;
+    historyState.items = [];
+    historyState.total = 0;
+    historyState.nextCursor = null;
+    historyState.loading = false;
+    historyState.version = null;
+    historyState.fetchPage = fetchPage;
+    showHistoryMessage("<p style='color: var(--text-secondary); padding: 20px;'>Loading...</p>");
+    loadNextHistoryPage();
+  };
+
+  const loadNextHistoryPage = async () => {
+    const state = historyState;
+    if (state.loading || (state.items.length && !state.nextCursor)) return;
+    state.loading = true;
+    const generation = state.generation;
     try {
-      historyList.innerHTML = "<p style='color: var(--text-secondary); padding: 20px;'>Loading...</p>";
-      const history = await eel.get_history()();
-      renderHistory(history);
+      const res = await state.fetchPage(state.nextCursor);
+      if (generation !== state.generation) return;
+      const firstPage = state.items.length === 0;
+      if (firstPage) state.version = res.version;
+      state.items.push(...(res.items || []));
+      state.total = res.total || 0;
+      state.nextCursor = res.next_cursor;
+      if (state.items.length === 0) {
+        const empty = historySearchInput.value.trim() ? "No matching recordings." : "No recordings yet.";
+        showHistoryMessage(`<p style='color: var(--text-secondary); padding: 20px;'>${empty}</p>`);
+        return;
+      }
+      if (firstPage) historyList.innerHTML = "";
     } catch (err) {
       console.error("Failed to load history:", err);
-      historyList.innerHTML = "<p style='color: #ff4d4d; padding: 20px;'>Failed to load history.</p>";
+      if (generation === state.generation && state.items.length === 0) {
+        showHistoryMessage("<p style='color: #ff4d4d; padding: 20px;'>Failed to load history.</p>");
+      }
+      return;
+    } finally {
+      if (generation === state.generation) state.loading = false;
+    }
+    renderVisibleHistoryRows();
+  };
+
+  const renderVisibleHistoryRows = () => {
+    const state = historyState;
+    if (views.history.classList.contains("hidden") || state.items.length === 0) return;
+    historyList.style.height = `${state.total * HISTORY_ROW_HEIGHT}px`;
+
+    // Offset of the list inside the scrolled content, then the visible index range
+    const listOffset = historyList.getBoundingClientRect().top
+      - scrollContainer.getBoundingClientRect().top + scrollContainer.scrollTop;
+    const viewTop = scrollContainer.scrollTop - listOffset;
+    const first = Math.max(0, Math.floor(viewTop / HISTORY_ROW_HEIGHT) - HISTORY_OVERSCAN);
+    const lastWanted = Math.ceil((viewTop + scrollContainer.clientHeight) / HISTORY_ROW_HEIGHT) + HISTORY_OVERSCAN;
+    const last = Math.min(state.items.length - 1, lastWanted);
+
+    for (const [index, row] of state.rows) {
+      if (index < first || index > last) {
+        row.remove();
+        state.rows.delete(index);
+      }
+    }
+    for (let i = first; i <= last; i++) {
+      if (!state.rows.has(i)) {
+        const row = createHistoryRow(state.items[i], i);
+        state.rows.set(i, row);
+        historyList.appendChild(row);
+      }
+    }
+    if (lastWanted >= state.items.length - HISTORY_OVERSCAN && state.nextCursor) {
+      loadNextHistoryPage();
     }
   };
 
-  const renderHistory = (history) => {
-    historyList.innerHTML = "";
-    if (!history || history.length === 0) {
-      historyList.innerHTML = "<p style='color: var(--text-secondary); padding: 20px;'>No recordings yet.</p>";
+  // Move rendered rows at or after fromIndex by delta positions (after an insert/delete)
+  const reindexHistoryRows = (fromIndex, delta) => {
+    const rows = new Map();
+    for (const [index, row] of historyState.rows) {
+      const target = index >= fromIndex ? index + delta : index;
+      row.style.top = `${target * HISTORY_ROW_HEIGHT}px`;
+      rows.set(target, row);
+    }
+    historyState.rows = rows;
+  };
+
+  // Patch the loaded list with one change (entry upsert or delete tombstone).
+  // Idempotent, so a change may safely arrive both from a mutation and a resync.
+  const applyHistoryChange = (change) => {
+    const state = historyState;
+    if (!change) return;
+    const index = state.items.findIndex((it) => it.filename === change.filename);
+    const searching = historySearchInput.value.trim() !== "";
+    if (change.deleted) {
+      if (index === -1) {
+        // Not loaded yet: it was somewhere in the unfetched tail of the full list
+        if (!searching && state.nextCursor) state.total = Math.max(0, state.total - 1);
+        return;
+      }
+      state.items.splice(index, 1);
+      state.total = Math.max(0, state.total - 1);
+      const row = state.rows.get(index);
+      if (row) row.remove();
+      state.rows.delete(index);
+      reindexHistoryRows(index + 1, -1);
+    } else if (index !== -1) {
+      // Keep the audio metadata; drop any stale search snippet
+      const item = { ...change.entry, meta: state.items[index].meta };
+      state.items[index] = item;
+      const row = state.rows.get(index);
+      if (row) {
+        const fresh = createHistoryRow(item, index);
+        row.replaceWith(fresh);
+        state.rows.set(index, fresh);
+      }
+    } else if (!searching && historySortSelect.value === "newest") {
+      // New entry: usually a fresh recording (top), imports may be older
+      const timestamp = change.entry.timestamp || "";
+      let at = state.items.findIndex((it) => (it.timestamp || "") <= timestamp);
+      if (at === -1) at = state.items.length;
+      if (at === state.items.length && state.nextCursor) {
+        state.total += 1; // belongs to the unfetched tail
+        return;
+      }
+      if (state.items.length === 0) historyList.innerHTML = "";
+      state.items.splice(at, 0, { ...change.entry });
+      state.total += 1;
+      reindexHistoryRows(at, 1);
+    }
+    if (state.items.length === 0 && !state.nextCursor) {
+      showHistoryMessage(`<p style='color: var(--text-secondary); padding: 20px;'>${searching ? "No matching recordings." : "No recordings yet."}</p>`);
+    } else {
+      renderVisibleHistoryRows();
+    }
+  };
+
+  // Pull changes made since the loaded version (by other handlers or new recordings)
+  let historySyncRunning = false;
+  let historySyncQueued = false;
+  const syncHistory = async () => {
+    const state = historyState;
+    if (state.version === null) return;
+    if (historySyncRunning) {
+      historySyncQueued = true;
       return;
     }
+    historySyncRunning = true;
+    const generation = state.generation;
+    try {
+      const res = await eel.get_history_changes(state.version)();
+      if (generation !== state.generation || !res) return;
+      if (res.reset) {
+        loadHistory();
+        return;
+      }
+      res.changes.forEach(applyHistoryChange);
+      state.version = Math.max(state.version, res.version);
+    } catch (err) {
+      console.error("History resync failed:", err);
+    } finally {
+      historySyncRunning = false;
+      if (historySyncQueued) {
+        historySyncQueued = false;
+        syncHistory();
+      }
+    }
+  };
+  window.addEventListener("history-changed", () => {
+    if (!views.history.classList.contains("hidden")) syncHistory();
+  });
 
-    history.forEach((item) => {
-      const el = document.createElement("div");
-      el.className = "history-item";
-      
-      const date = new Date(item.timestamp).toLocaleString();
-      const hasTranscript = item.transcript && item.transcript.trim().length > 0;
-      
-      el.innerHTML = `
-        <div class="history-header">
-          <span>${date}</span>
-          <span>${item.filename}</span>
-        </div>
-        <div class="history-transcript">${hasTranscript ? item.transcript : "<em>No transcript</em>"}</div>
-        <div class="history-actions">
-          <button class="play-btn" data-filename="${item.filename}">▶ Play</button>
-          <button class="copy-btn" ${!hasTranscript ? 'style="display:none"' : ''}>📄 Copy Text</button>
-          <button class="reprocess-btn">🔄 Reprocess</button>
-          <button class="delete-btn">🗑 Delete</button>
-        </div>
-      `;
-
-      // Play/Stop button
-      const playBtn = el.querySelector(".play-btn");
-      playBtn.addEventListener("click", async () => {
-        const isPlaying = playBtn.textContent.startsWith("⏹");
-        
-        if (isPlaying) {
-          // Stop current playback
-          await eel.stop_audio()();
-          playBtn.textContent = "▶ Play";
-          playBtn.dataset.playing = "false";
-          currentlyPlayingButton = null;
-        } else {
-          // Stop any other playing audio first
-          if (currentlyPlayingButton && currentlyPlayingButton !== playBtn) {
-            await eel.stop_audio()();
-            currentlyPlayingButton.textContent = "▶ Play";
-            currentlyPlayingButton.dataset.playing = "false";
-          }
-          
-          // Start playback
-          const started = await eel.play_history_item(item.filename)();
-          if (started) {
-            playBtn.textContent = "⏹ Stop";
-            playBtn.dataset.playing = "true";
-            currentlyPlayingButton = playBtn;
-            
-            // Auto-reset button after playback (estimate based on file duration)
-            // For now, we'll check periodically if audio is still playing
-            const checkPlayback = setInterval(async () => {
-              const stillPlaying = await eel.is_audio_playing()();
-              if (!stillPlaying && playBtn.dataset.playing === "true") {
-                playBtn.textContent = "▶ Play";
-                playBtn.dataset.playing = "false";
-                currentlyPlayingButton = null;
-                clearInterval(checkPlayback);
-              }
-            }, 500);
-            
-            // Safety timeout (max 10 minutes)
-            setTimeout(() => {
-              clearInterval(checkPlayback);
-              if (playBtn.dataset.playing === "true") {
-                playBtn.textContent = "▶ Play";
-                playBtn.dataset.playing = "false";
-                currentlyPlayingButton = null;
-              }
-            }, 600000);
-          }
-        }
+  let scrollFrame = null;
+  const scheduleHistoryRender = () => {
+    if (scrollFrame !== null) return;
+    scrollFrame = requestAnimationFrame(() => {
+      scrollFrame = null;
+      renderVisibleHistoryRows();
+    });
+  };
+  scrollContainer.addEventListener("scroll", scheduleHistoryRender, { passive: true });
+  window.addEventListener("resize", scheduleHistoryRender);
+
+  const loadHistory = () => {
+    const query = historySearchInput.value.trim();
+    resetHistoryList(query ? searchPageSource(query) : historyPageSource(historySortSelect.value));
+  };
+
+  historySortSelect.addEventListener("change", loadHistory);
+
+  historySearchInput.addEventListener("input", () => {
+    clearTimeout(searchTimer);
+    if (!historySearchInput.value.trim()) historySearchInfo.textContent = "";
+    searchTimer = setTimeout(loadHistory, 150);
+  });
+
+  // --- History Export / Import (background jobs) ---
+  /**
+   * Mirrors a background job's pushed progress (app:job_progress) into a status line.
+   * @param {object} job Initial job status from Python.
+   * @param {object} ui { button, cancelButton, status, describe(result) }
+   */
+  const watchJob = (job, ui) => {
+    const show = (job) => {
+      const running = job && (job.status === "queued" || job.status === "running");
+      ui.button.disabled = running;
+      ui.cancelButton.classList.toggle("hidden", !running);
+      if (!job) {
+        ui.status.textContent = "";
+      } else if (running) {
+        const pct = job.total ? Math.floor((100 * job.done) / job.total) : 0;
+        ui.status.textContent = `${job.message || "Working"}... ${pct}%`;
+      } else if (job.status === "done") {
+        ui.status.textContent = ui.describe(job.result);
+      } else if (job.status === "cancelled") {
+        ui.status.textContent = "Cancelled.";
+      } else {
+        ui.status.textContent = `Failed: ${job.error}`;
+      }
+      return running;
+    };
+    ui.cancelButton.onclick = () => eel.cancel_job(job.id)();
+    if (!show(job)) return;
+    let finished = false;
+    const onProgress = (e) => {
+      if (!finished && e.detail.id === job.id) show(e.detail);
+    };
+    window.addEventListener("app:job_progress", onProgress);
+    waitForJob(job.id).then((final) => {
+      finished = true;
+      window.removeEventListener("app:job_progress", onProgress);
+      show(final);
+    });
+  };
+
+  historyExportBtn.addEventListener("click", async () => {
+    const res = await eel.start_history_export(historyExportFormat.value, {})();
+    if (res && res.ok) {
+      watchJob(res.job, {
+        button: historyExportBtn,
+        cancelButton: historyExportCancelBtn,
+        status: historyExportStatus,
+        describe: (result) => `Exported ${result.entries} entries to ${result.path}`,
       });
+    } else {
+      historyExportStatus.textContent = `Export failed: ${res && res.error}`;
+    }
+  });
 
-      // Copy button
-      if (hasTranscript) {
-        el.querySelector(".copy-btn").addEventListener("click", async () => {
-          try {
-            await navigator.clipboard.writeText(item.transcript || "");
-            const btn = el.querySelector(".copy-btn");
-            const originalText = btn.textContent;
-            btn.textContent = "✓ Copied!";
-            setTimeout(() => {
-              btn.textContent = originalText;
-            }, 2000);
-          } catch (err) {
-            console.error("Failed to copy:", err);
-          }
-        });
+  historyImportBtn.addEventListener("click", async () => {
+    const folder = historyImportInput.value.trim();
+    if (!folder) return;
+    const options = { transcribe: historyImportTranscribe.checked };
+    const res = await eel.start_history_import(folder, options)();
+    if (res && res.ok) {
+      watchJob(res.job, {
+        button: historyImportBtn,
+        cancelButton: historyImportCancelBtn,
+        status: historyImportStatus,
+        describe: (r) => `Imported ${r.imported} of ${r.found} files (${r.skipped} already present, ${r.failed} failed)`,
+      });
+    } else {
+      historyImportStatus.textContent = `Import failed: ${res && res.error}`;
+    }
+  });
+
+  const setPlayButton = (btn, playing) => {
+    btn.textContent = playing ? "⏹ Stop" : "▶ Play";
+    btn.dataset.playing = playing ? "true" : "false";
+  };
+
+  const setPlayingFilename = (filename) => {
+    playingFilename = filename;
+    historyList.querySelectorAll(".play-btn").forEach((btn) => {
+      setPlayButton(btn, btn.dataset.filename === filename);
+    });
+  };
+
+  window.addEventListener("app:playback", (e) => {
+    if (e.detail.state === "finished" && playingFilename && e.detail.filename === playingFilename) {
+      setPlayingFilename(null);
+    }
+  });
+
+  // Recording status in the sidebar, driven by pushed state and level events
+  const appStatus = document.getElementById("appStatus");
+  const appStatusText = document.getElementById("appStatusText");
+  const appLevel = document.getElementById("appLevel");
+  const STATUS_LABELS = { recording: "Recording", transcribing: "Transcribing..." };
+  window.addEventListener("app:recording_state", (e) => {
+    const { phase, paused } = e.detail;
+    appStatus.classList.toggle("hidden", phase === "idle");
+    appStatusText.textContent = phase === "recording" && paused ? "Paused" : STATUS_LABELS[phase] || "";
+    if (phase !== "recording") appLevel.style.width = "0%";
+  });
+  window.addEventListener("app:vad_level", (e) => {
+    // Amplitudes are 16-bit; speech rarely averages above ~3000
+    const pct = Math.min(100, (100 * e.detail.level) / 3000);
+    appLevel.style.width = `${pct}%`;
+    appLevel.classList.toggle("voice", e.detail.voice);
+  });
+
+  const formatDuration = (seconds) => {
+    const total = Math.round(seconds);
+    return `${Math.floor(total / 60)}:${String(total % 60).padStart(2, "0")}`;
+  };
+
+  // Draw precomputed min/max peaks (flat list scaled to -127..127) as a waveform
+  const drawWaveThumb = (canvas, peaks) => {
+    const ctx = canvas.getContext("2d");
+    const { width, height } = canvas;
+    const mid = height / 2;
+    const buckets = peaks.length / 2;
+    const step = width / buckets;
+    ctx.clearRect(0, 0, width, height);
+    ctx.fillStyle = "#a0a0a0";
+    for (let i = 0; i < buckets; i++) {
+      const top = mid - (peaks[2 * i + 1] / 127) * mid;
+      const bottom = mid - (peaks[2 * i] / 127) * mid;
+      ctx.fillRect(i * step, top, Math.max(1, step - 0.5), Math.max(1, bottom - top));
+    }
+  };
+
+  const createHistoryRow = (item, index) => {
+    const el = document.createElement("div");
+    el.className = "history-item";
+    el.style.top = `${index * HISTORY_ROW_HEIGHT}px`;
+
+    const date = new Date(item.timestamp).toLocaleString();
+    const hasTranscript = item.transcript && item.transcript.trim().length > 0;
+    // Audio of old entries may have been evicted by the storage quota (transcript is kept)
+    const audioAttrs = item.audio_evicted ? 'disabled title="Audio removed by storage quota"' : "";
+
+    el.innerHTML = `
+      <div class="history-header">
+        <span class="history-meta">
+          <span>${date}</span>
+          ${item.meta ? `<span>${formatDuration(item.meta.duration)}</span><canvas class="history-wave" width="128" height="24"></canvas>` : ""}
+        </span>
+        <span>${item.filename}</span>
+      </div>
+      <div class="history-transcript">${item.snippet ? item.snippet : (hasTranscript ? item.transcript : "<em>No transcript</em>")}</div>
+      <div class="history-actions">
+        <button class="play-btn" data-filename="${item.filename}" ${audioAttrs}>▶ Play</button>
+        <button class="copy-btn" ${!hasTranscript ? 'style="display:none"' : ''}>📄 Copy Text</button>
+        <button class="reprocess-btn" ${audioAttrs}>🔄 Reprocess</button>
+        <button class="delete-btn">🗑 Delete</button>
+      </div>
+    `;
+
+    if (item.meta) drawWaveThumb(el.querySelector(".history-wave"), item.meta.peaks);
+
+    // Play/Stop button
+    const playBtn = el.querySelector(".play-btn");
+    setPlayButton(playBtn, playingFilename === item.filename);
+    playBtn.addEventListener("click", async () => {
+      if (playingFilename === item.filename) {
+        // Stop current playback
+        await eel.stop_audio()();
+        setPlayingFilename(null);
+        return;
+      }
+      // Stop any other playing audio first
+      if (playingFilename) {
+        await eel.stop_audio()();
+        setPlayingFilename(null);
       }
 
-      // Reprocess button (always visible)
-      el.querySelector(".reprocess-btn").addEventListener("click", async (e) => {
-        const btn = e.target;
-        const confirmMsg = hasTranscript 
-          ? "Re-transcribe this recording? This will replace the existing transcript."
-          : "Transcribe this recording?";
-        
-        if (!confirm(confirmMsg)) return;
-        
-        btn.disabled = true;
-        const originalText = btn.textContent;
-        btn.textContent = "⏳ Processing...";
+      // Start playback
+      // The button resets when Python pushes the playback "finished" event
+      const started = await eel.play_history_item(item.filename)();
+      if (started) setPlayingFilename(item.filename);
+    });
+
+    // Copy button
+    if (hasTranscript) {
+      el.querySelector(".copy-btn").addEventListener("click", async () => {
         try {
-          const newHistory = await eel.transcribe_history_item(item.filename)();
-          if (newHistory) {
-            renderHistory(newHistory);
-          } else {
-            btn.textContent = "❌ Error";
-            setTimeout(() => {
-              btn.textContent = originalText;
-              btn.disabled = false;
-            }, 2000);
-          }
+          await navigator.clipboard.writeText(item.transcript || "");
+          const btn = el.querySelector(".copy-btn");
+          const originalText = btn.textContent;
+          btn.textContent = "✓ Copied!";
+          setTimeout(() => {
+            btn.textContent = originalText;
+          }, 2000);
         } catch (err) {
-          console.error(err);
+          console.error("Failed to copy:", err);
+        }
+      });
+    }
+
+    // Reprocess button (always visible)
+    el.querySelector(".reprocess-btn").addEventListener("click", async (e) => {
+      const btn = e.target;
+      const confirmMsg = hasTranscript
+        ? "Re-transcribe this recording? This will replace the existing transcript."
+        : "Transcribe this recording?";
+
+      if (!confirm(confirmMsg)) return;
+
+      btn.disabled = true;
+      const originalText = btn.textContent;
+      btn.textContent = "⏳ Processing...";
+      try {
+        const change = await awaitJob(eel.transcribe_history_item(item.filename)());
+        if (change) {
+          applyHistoryChange(change);
+          syncHistory();
+        } else {
           btn.textContent = "❌ Error";
           setTimeout(() => {
             btn.textContent = originalText;
             btn.disabled = false;
           }, 2000);
         }
-      });
+      } catch (err) {
+        console.error(err);
+        btn.textContent = "❌ Error";
+        setTimeout(() => {
+          btn.textContent = originalText;
+          btn.disabled = false;
+        }, 2000);
+      }
+    });
 
-      // Delete button
-      el.querySelector(".delete-btn").addEventListener("click", async () => {
-        if (confirm(`Delete this recording?\n\n${item.filename}`)) {
-          try {
-            const newHistory = await eel.delete_history_item(item.filename)();
-            renderHistory(newHistory);
-          } catch (err) {
-            console.error("Failed to delete:", err);
-          }
+    // Delete button
+    el.querySelector(".delete-btn").addEventListener("click", async () => {
+      if (confirm(`Delete this recording?\n\n${item.filename}`)) {
+        try {
+          const change = await eel.delete_history_item(item.filename)();
+          applyHistoryChange(change);
+          syncHistory();
+        } catch (err) {
+          console.error("Failed to delete:", err);
         }
-      });
+      }
+    });
+
+    return el;
+  };
 
-      historyList.appendChild(el);
+  // --- Logs view ---
+  // Filled from the backend's in-memory log ring (src/logs.py) when the view
+  // opens or its filters change; new records then arrive as pushed "logs" events.
+  const LOG_MAX_ROWS = 1000;
+  const LOG_LEVELS = { DEBUG: 10, INFO: 20, WARNING: 30, ERROR: 40, CRITICAL: 50 };
+  const logList = document.getElementById("logList");
+  const logLevelSelect = document.getElementById("logLevelSelect");
+  const logLoggerInput = document.getElementById("logLoggerInput");
+  const logState = { lastSeq: 0, open: false, loading: false, pending: [] };
+
+  const formatLogTime = (seconds) => {
+    const d = new Date(seconds * 1000);
+    return d.toLocaleTimeString([], { hour12: false }) + "." + String(d.getMilliseconds()).padStart(3, "0");
+  };
+
+  const renderLogRecords = (records) => {
+    const atBottom = logList.scrollTop + logList.clientHeight >= logList.scrollHeight - 4;
+    const fragment = document.createDocumentFragment();
+    records.forEach((r) => {
+      const row = document.createElement("div");
+      row.className = `log-record ${r.level}`;
+      const parts = [
+        ["log-time", formatLogTime(r.time) + " "],
+        ["log-level", r.level.padEnd(8)],
+        ["log-logger", r.logger + ": "],
+        ["log-message", r.message],
+      ];
+      parts.forEach(([cls, text]) => {
+        const span = document.createElement("span");
+        span.className = cls;
+        span.textContent = text;
+        row.appendChild(span);
+      });
+      fragment.appendChild(row);
     });
+    logList.appendChild(fragment);
+    while (logList.childElementCount > LOG_MAX_ROWS) logList.firstElementChild.remove();
+    if (atBottom) logList.scrollTop = logList.scrollHeight;
   };
+
+  // Same filters as logs.recent(), for pushed records
+  const logMatches = (r) => {
+    const minimum = LOG_LEVELS[logLevelSelect.value] || 0;
+    const logger = logLoggerInput.value.trim();
+    return (LOG_LEVELS[r.level] || 0) >= minimum &&
+      (!logger || r.logger === logger || r.logger.startsWith(logger + "."));
+  };
+
+  const appendLogRecords = (records) => {
+    const fresh = records.filter((r) => r.seq > logState.lastSeq);
+    if (!fresh.length) return;
+    logState.lastSeq = fresh[fresh.length - 1].seq;
+    const shown = fresh.filter(logMatches);
+    if (shown.length) renderLogRecords(shown);
+  };
+
+  const reloadLogs = async () => {
+    logList.textContent = "";
+    logState.lastSeq = 0;
+    logState.loading = true;
+    logState.pending = [];
+    try {
+      const result = await eel.get_logs(0, 500, logLevelSelect.value, logLoggerInput.value.trim() || null)();
+      if (result) {
+        logState.lastSeq = result.last_seq;
+        if (result.records.length) renderLogRecords(result.records);
+      }
+    } catch (err) {
+      console.error("Failed to load logs:", err);
+    } finally {
+      logState.loading = false;
+      // Records pushed while the backfill was in flight (older ones are skipped by seq)
+      appendLogRecords(logState.pending);
+      logState.pending = [];
+    }
+  };
+
+  window.addEventListener("app:logs", (e) => {
+    if (!logState.open) return;
+    if (logState.loading) {
+      logState.pending.push(...e.detail.records);
+    } else {
+      appendLogRecords(e.detail.records);
+    }
+  });
+
+  function openLogView() {
+    if (logState.open) return;
+    logState.open = true;
+    reloadLogs();
+  }
+
+  function closeLogView() {
+    logState.open = false;
+  }
+
+  logLevelSelect.addEventListener("change", reloadLogs);
+  logLoggerInput.addEventListener("change", reloadLogs);
+  document.getElementById("logClearBtn").addEventListener("click", () => {
+    logList.textContent = "";
+  });
 });
 
 // ---------------- Eel <-> Python callback handlers -----------------
@@ -421,6 +864,62 @@ eel.expose(transcriptionResult);
 
 function recordingCompleted() {
   console.log("Recording completed (Python callback).");
+  // A new history entry may have been saved; let the history view resync
+  window.dispatchEvent(new Event("history-changed"));
   // Future: re-enable record button, show notification, etc.
 }
-eel.expose(recordingCompleted);
\ No newline at end of file
+eel.expose(recordingCompleted);
+
+// Batched backend events (playback, recording_state, vad_level, transcription,
+// job_progress, logs), re-dispatched as window events named "app:<type>".
+function appEvents(events) {
+  events.forEach((event) => {
+    window.dispatchEvent(new CustomEvent(`app:${event.type}`, { detail: event }));
+  });
+}
+eel.expose(appEvents);
+
+// ---------------- Background jobs -----------------
+// Blocking Python calls return {job_id} immediately; the result is pushed later
+// through jobFinished, so the UI never waits on a long eel request.
+const jobWaiters = new Map(); // job id -> resolve
+const finishedJobs = new Map(); // results that arrived before anyone waited
+
+function jobFinished(job) {
+  const resolve = jobWaiters.get(job.id);
+  if (resolve) {
+    jobWaiters.delete(job.id);
+    resolve(job);
+  } else {
+    finishedJobs.set(job.id, job);
+    // Results nobody claims (e.g. the page reloaded) must not pile up
+    if (finishedJobs.size > 50) finishedJobs.delete(finishedJobs.keys().next().value);
+  }
+}
+eel.expose(jobFinished);
+
+/**
+ * Resolves with a job's result once Python reports it finished.
+ * @param {Promise<object>} started Promise of an eel call returning {job_id}.
+ * @returns {Promise<any>} The job result; rejects if the job failed.
+ */
+async function awaitJob(started) {
+  const { job_id: id } = await started;
+  const job = await waitForJob(id);
+  if (job.status !== "done") throw new Error(job.error || job.status);
+  return job.result;
+}
+
+/**
+ * Resolves with a job's final status dict once Python reports it finished.
+ * @param {string} id Job id.
+ * @returns {Promise<object>}
+ */
+function waitForJob(id) {
+  const job = finishedJobs.get(id);
+  if (job) {
+    finishedJobs.delete(id);
+    return Promise.resolve(job);
+  }
+  return new Promise((resolve) => jobWaiters.set(id, resolve));
+}